@@ -1,9 +1,18 @@
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from app.config import Config
+from app.utils.serialization import FastJSONProvider, ApiRequest
 from app.utils.database import init_db
 from app.services.email_service import init_email_service # Importa a função de inicialização do email
+from app.services.scheduler import init_scheduler
+from app.services.events import init_events
+from app.utils.compression import init_compression
+from app.utils.idempotency import init_idempotency
+from app.utils.jwt_helper import init_token_revocation
+from app.utils.admission import init_admission
+from app.utils.storage import init_storage
+from app.utils.static_files import send_upload
 
 # Importar blueprints (rotas)
 from app.routes.auth import auth_bp
@@ -12,21 +21,40 @@ from app.routes.habit import habit_bp
 from app.routes.mood import mood_bp
 from app.routes.goal import goal_bp
 from app.routes.report import report_bp
+from app.routes.today import today_bp
+from app.routes.sync import sync_bp
+from app.routes.batch import batch_bp
+from app.routes.events import events_bp
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = FastJSONProvider(app) # JSON rápido (orjson) com suporte nativo a date/datetime/Decimal
+    app.request_class = ApiRequest # Aceita corpos em JSON ou MessagePack
     
     # Configurações
     CORS(app, supports_credentials=True) # Habilita CORS com suporte a credenciais (cookies)
     jwt = JWTManager(app)
+    init_token_revocation(app, jwt) # Tokens revogados no logout (verificados em memória)
     
     # Inicializar banco de dados
     init_db()
     
+    # Armazenamento dos uploads (disco local ou object store)
+    init_storage(app)
+    
     # Inicializar serviço de email
     init_email_service(app)
     
+    # Inicializar agendador de jobs em segundo plano (snapshots noturnos de relatórios)
+    init_scheduler(app)
+    
+    # Pub/sub de eventos para as conexões SSE (local ou via Redis entre workers)
+    init_events(app)
+    
+    # Controle de admissão: limites de concorrência por rota, rate limit no login e descarte de carga
+    init_admission(app)
+    
     # Registrar blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(user_bp, url_prefix='/api/user')
@@ -34,6 +62,16 @@ def create_app():
     app.register_blueprint(mood_bp, url_prefix='/api/mood')
     app.register_blueprint(goal_bp, url_prefix='/api/goals')
     app.register_blueprint(report_bp, url_prefix='/api/reports')
+    app.register_blueprint(today_bp, url_prefix='/api/today')
+    app.register_blueprint(sync_bp, url_prefix='/api/sync')
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
+    app.register_blueprint(events_bp, url_prefix='/api/events')
+    
+    # Cache de respostas para repetições com Idempotency-Key
+    init_idempotency(app)
+    
+    # Compressão das respostas (gzip/brotli/zstd) conforme o Accept-Encoding
+    init_compression(app)
     
     @app.route('/')
     def home():
@@ -44,11 +82,10 @@ def create_app():
         return {'status': 'healthy', 'message': 'API funcionando corretamente'}
 
     # Rota para servir arquivos estáticos de upload (e.g., fotos de perfil)
-    # APENAS PARA DESENVOLVIMENTO. Em produção, use Nginx/Apache.
+    # Em produção, UPLOAD_SERVE_MODE=x-accel (Nginx) ou x-sendfile repassa o envio ao servidor web
     @app.route(f'/{Config.UPLOAD_FOLDER}/<path:filename>')
     def uploaded_file(filename):
-        upload_dir = os.path.join(app.root_path, Config.UPLOAD_FOLDER)
-        return send_from_directory(upload_dir, filename)
+        return send_upload(filename)
             
     return app
 
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -9,6 +10,9 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-super-segura'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    JWT_REVOCATION_SYNC_SECONDS = float(os.environ.get('JWT_REVOCATION_SYNC_SECONDS') or 5) # Revogações de outros workers
+    JWT_REVOCATION_BLOOM_CAPACITY = int(os.environ.get('JWT_REVOCATION_BLOOM_CAPACITY') or 100000)
+    JWT_REVOCATION_BLOOM_ERROR_RATE = float(os.environ.get('JWT_REVOCATION_BLOOM_ERROR_RATE') or 0.001)
     
     # Database Configuration
     DB_HOST = os.environ.get('DB_HOST') or 'localhost'
@@ -16,6 +20,7 @@ class Config:
     DB_USER = os.environ.get('DB_USER') or 'root'
     DB_PASSWORD = os.environ.get('DB_PASSWORD') or ''
     DB_NAME = os.environ.get('DB_NAME') or 'habitos_db'
+    DB_STREAM_BATCH_SIZE = int(os.environ.get('DB_STREAM_BATCH_SIZE') or 1000) # Linhas lidas por vez em stream_query
     
     # Email Configuration (para recuperação de senha)
     MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.gmail.com'
@@ -25,10 +30,117 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER')
     
+    # Caixa de saída de emails (envio em segundo plano). Para testes locais, aponte
+    # MAIL_SERVER/MAIL_PORT para um SMTP de teste (ex: localhost:1025, MAIL_USE_TLS=false)
+    EMAIL_OUTBOX_ENABLED = os.environ.get('EMAIL_OUTBOX_ENABLED', 'true').lower() in ['true', 'on', '1']
+    EMAIL_SENDER_WORKERS = int(os.environ.get('EMAIL_SENDER_WORKERS') or 2) # Threads (e conexões SMTP) por processo
+    EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE') or 50) # Mensagens reservadas por vez
+    EMAIL_POLL_INTERVAL = float(os.environ.get('EMAIL_POLL_INTERVAL') or 5) # Segundos entre buscas sem novidades
+    EMAIL_CLAIM_TIMEOUT = int(os.environ.get('EMAIL_CLAIM_TIMEOUT') or 300) # Reserva de um lote antes de outro worker retomá-lo
+    EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS') or 5)
+    EMAIL_RETRY_BACKOFF = int(os.environ.get('EMAIL_RETRY_BACKOFF') or 30) # Segundos; dobra a cada tentativa
+    EMAIL_SMTP_IDLE_SECONDS = int(os.environ.get('EMAIL_SMTP_IDLE_SECONDS') or 60) # Fecha a conexão SMTP ociosa
+    EMAIL_RETENTION_DAYS = int(os.environ.get('EMAIL_RETENTION_DAYS') or 30) # Enviados/falhos mantidos para consulta
+    
+    # Resumo semanal por email
+    DIGEST_ENABLED = os.environ.get('DIGEST_ENABLED', 'true').lower() in ['true', 'on', '1']
+    DIGEST_WEEKDAY = int(os.environ.get('DIGEST_WEEKDAY') or 0) # 0 = segunda-feira (resume a semana até domingo)
+    DIGEST_HOUR = int(os.environ.get('DIGEST_HOUR') or 8)
+    DIGEST_PAGE_SIZE = int(os.environ.get('DIGEST_PAGE_SIZE') or 500) # Usuários por página
+    DIGEST_PAGE_PAUSE = float(os.environ.get('DIGEST_PAGE_PAUSE') or 0.5) # Segundos de pausa entre páginas
+    
     # Configurações de upload
     UPLOAD_FOLDER = 'uploads/profile_pics'
+    UPLOAD_STORAGE = os.environ.get('UPLOAD_STORAGE') or 'local' # 'local' ou 's3' (requer boto3)
+    UPLOAD_PUBLIC_URL = os.environ.get('UPLOAD_PUBLIC_URL') # Base das URLs (CDN/bucket); padrão: /UPLOAD_FOLDER
+    UPLOAD_S3_BUCKET = os.environ.get('UPLOAD_S3_BUCKET')
+    UPLOAD_S3_PREFIX = os.environ.get('UPLOAD_S3_PREFIX') or 'profile_pics'
+    UPLOAD_S3_ENDPOINT = os.environ.get('UPLOAD_S3_ENDPOINT') # Para object stores compatíveis (MinIO etc.)
+    UPLOAD_GC_GRACE_HOURS = int(os.environ.get('UPLOAD_GC_GRACE_HOURS') or 24) # Órfãos mais novos que isso são mantidos
+    UPLOAD_GC_BATCH_SIZE = int(os.environ.get('UPLOAD_GC_BATCH_SIZE') or 500)
+    UPLOAD_SERVE_MODE = os.environ.get('UPLOAD_SERVE_MODE') or 'direct' # 'direct', 'x-accel' (Nginx) ou 'x-sendfile'
+    UPLOAD_ACCEL_PREFIX = os.environ.get('UPLOAD_ACCEL_PREFIX') or '/protected-uploads' # location interna do Nginx
+    UPLOAD_CACHE_MAX_AGE = int(os.environ.get('UPLOAD_CACHE_MAX_AGE') or 3600) # Arquivos com nome antigo (não imutáveis)
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+    PROFILE_PICTURE_MAX_BYTES = int(os.environ.get('PROFILE_PICTURE_MAX_BYTES') or 5 * 1024 * 1024)
+    PROFILE_PICTURE_MAX_PIXELS = int(os.environ.get('PROFILE_PICTURE_MAX_PIXELS') or 40_000_000) # Largura x altura
+    PROFILE_PICTURE_SIZES = os.environ.get('PROFILE_PICTURE_SIZES') or 'thumb=64,medium=256' # Variantes quadradas (px)
+    PROFILE_PICTURE_QUALITY = int(os.environ.get('PROFILE_PICTURE_QUALITY') or 82) # WebP/JPEG
+    PROFILE_PICTURE_WORKERS = int(os.environ.get('PROFILE_PICTURE_WORKERS') or 1) # Threads de redimensionamento
+    
+    # Jobs assíncronos de relatório
+    REPORT_JOBS_FOLDER = os.environ.get('REPORT_JOBS_FOLDER') or os.path.join(tempfile.gettempdir(), 'mindtrack_report_jobs')
+    REPORT_JOB_EXECUTOR = os.environ.get('REPORT_JOB_EXECUTOR') or 'process' # 'process' (relatórios pesados em CPU) ou 'thread'
+    REPORT_JOB_WORKERS = int(os.environ.get('REPORT_JOB_WORKERS') or 2)
+    REPORT_JOB_TTL = int(os.environ.get('REPORT_JOB_TTL') or 3600) # Segundos até o resultado expirar
+    
+    # Agendador em processo e snapshots de relatórios pré-calculados
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'true').lower() in ['true', 'on', '1']
+    SNAPSHOT_HOUR = int(os.environ.get('SNAPSHOT_HOUR') or 3) # Horário (fora de pico) do pré-cálculo noturno
+    SNAPSHOT_MINUTE = int(os.environ.get('SNAPSHOT_MINUTE') or 0)
+    SNAPSHOT_BATCH_SIZE = int(os.environ.get('SNAPSHOT_BATCH_SIZE') or 200) # Usuários por lote
+    SNAPSHOT_BATCH_PAUSE = float(os.environ.get('SNAPSHOT_BATCH_PAUSE') or 1.0) # Segundos de pausa entre lotes
+    SNAPSHOT_ACTIVE_DAYS = int(os.environ.get('SNAPSHOT_ACTIVE_DAYS') or 30) # Usuário ativo = com registros nesse período
+    
+    # Hash de senhas (bcrypt) em pool dedicado
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS') or 12) # Hashes com outro custo são regravados no login
+    PASSWORD_HASH_EXECUTOR = os.environ.get('PASSWORD_HASH_EXECUTOR') or 'thread' # 'thread' ou 'process'
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2) # Hashes simultâneos por processo
+    PASSWORD_HASH_QUEUE_LIMIT = int(os.environ.get('PASSWORD_HASH_QUEUE_LIMIT') or 16) # Acima disso: 503 imediato
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT') or 5) # Segundos de espera pelo resultado
+    
+    # Registro de sessões (tabela sessoes) em fila write-behind
+    SESSION_WRITE_BEHIND = os.environ.get('SESSION_WRITE_BEHIND', 'true').lower() in ['true', 'on', '1']
+    SESSION_FLUSH_SIZE = int(os.environ.get('SESSION_FLUSH_SIZE') or 100) # Operações por lote
+    SESSION_FLUSH_INTERVAL = float(os.environ.get('SESSION_FLUSH_INTERVAL') or 1.0) # Segundos máximos na fila
+    SESSION_QUEUE_MAX = int(os.environ.get('SESSION_QUEUE_MAX') or 10000) # Acima disso, grava na própria requisição
+    SESSION_RETENTION_DAYS = int(os.environ.get('SESSION_RETENTION_DAYS') or 30) # Sessões expiradas mantidas para consulta
+    
+    # Limpeza periódica das tabelas de autenticação (tokens_recuperacao, sessoes, tokens_revogados)
+    AUTH_CLEANUP_INTERVAL = int(os.environ.get('AUTH_CLEANUP_INTERVAL') or 3600) # Segundos entre execuções
+    AUTH_CLEANUP_BATCH_SIZE = int(os.environ.get('AUTH_CLEANUP_BATCH_SIZE') or 500) # Linhas por DELETE
+    AUTH_CLEANUP_PAUSE = float(os.environ.get('AUTH_CLEANUP_PAUSE') or 0.1) # Segundos entre lotes
+    AUTH_CLEANUP_MAX_BATCHES = int(os.environ.get('AUTH_CLEANUP_MAX_BATCHES') or 200) # Por tabela, por execução
     
+    # Sincronização incremental (GET /api/sync)
+    SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS') or 90) # Cursores mais antigos exigem sincronização completa
+    
+    # Requisições em lote (POST /api/batch)
+    BATCH_MAX_REQUESTS = int(os.environ.get('BATCH_MAX_REQUESTS') or 20) # Sub-requisições por lote
+    BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS') or 4) # Threads para leituras em paralelo
+    
+    # Eventos em tempo real (SSE em /api/events/stream). Cada conexão aberta ocupa uma thread do
+    # worker (gunicorn -k gthread --threads N): o bulkhead 'events' em ADMISSION_BULKHEADS deve
+    # ficar abaixo de N, deixando threads livres para as demais rotas
+    EVENTS_HEARTBEAT_SECONDS = int(os.environ.get('EVENTS_HEARTBEAT_SECONDS') or 15) # Comentário enviado para manter a conexão viva
+    EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE') or 100) # Eventos pendentes por conexão antes de descartar
+    EVENTS_MAX_STREAMS_PER_USER = int(os.environ.get('EVENTS_MAX_STREAMS_PER_USER') or 5)
+    EVENTS_REDIS_URL = os.environ.get('EVENTS_REDIS_URL') # Ex: redis://localhost:6379/0 (entre workers); vazio = só no processo
+    
+    # Idempotency-Key nas rotas de escrita
+    IDEMPOTENCY_CACHE_SIZE = int(os.environ.get('IDEMPOTENCY_CACHE_SIZE') or 10000) # Respostas guardadas por processo
+    IDEMPOTENCY_TTL = int(os.environ.get('IDEMPOTENCY_TTL') or 24 * 3600) # Segundos
+    IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get('IDEMPOTENCY_WAIT_SECONDS') or 10) # Espera de uma repetição pela original em andamento
+    
+    # Controle de admissão (limites por processo)
+    ADMISSION_BULKHEADS = os.environ.get('ADMISSION_BULKHEADS') or 'report=4,report.export_history=2,batch=4,sync=8,events=32' # Blueprint ou rota = máximo simultâneo
+    ADMISSION_QUEUE_SIZE = int(os.environ.get('ADMISSION_QUEUE_SIZE') or 8) # Requisições aguardando vaga, por bulkhead
+    ADMISSION_QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT') or 2) # Segundos de espera antes do 503
+    ADMISSION_RETRY_AFTER = int(os.environ.get('ADMISSION_RETRY_AFTER') or 2)
+    RATE_LIMIT_ENDPOINTS = os.environ.get('RATE_LIMIT_ENDPOINTS') or 'auth.login,auth.forgot_password'
+    RATE_LIMIT_PER_IP = os.environ.get('RATE_LIMIT_PER_IP') or '20/minute'
+    RATE_LIMIT_PER_USER = os.environ.get('RATE_LIMIT_PER_USER') or '5/minute' # Por email informado no corpo
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS') or 100000)
+    
+    # Compressão de respostas (Accept-Encoding)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() in ['true', 'on', '1']
+    COMPRESSION_ALGORITHMS = (os.environ.get('COMPRESSION_ALGORITHMS') or 'br,zstd,gzip').split(',') # Ordem de preferência
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE') or 1024) # Bytes; respostas menores vão sem compressão
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL') or 6)
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY') or 5)
+    COMPRESSION_ZSTD_LEVEL = int(os.environ.get('COMPRESSION_ZSTD_LEVEL') or 3)
+    COMPRESSION_CACHE_SIZE = int(os.environ.get('COMPRESSION_CACHE_SIZE') or 256) # Corpos comprimidos mantidos em cache
+
     # URLs
     FRONTEND_URL = os.environ.get('FRONTEND_URL') or 'http://localhost:3000'
\ No newline at end of file
@@ -1,11 +1,21 @@
 from app.utils.database import execute_query
-from datetime import date, datetime
+from app.models.snapshot import ReportSnapshot
+from app.services.events import publish_change
+from app.utils.fields import select_list
+from datetime import date
 
 class Goal:
     """
     Representa uma meta personalizada definida por um usuário.
     Corresponde à tabela 'metas'.
     """
+    __slots__ = ('id', 'usuario_id', 'titulo', 'descricao', 'habito_id', 'tipo_meta', 'valor_meta',
+                 'periodo', 'data_inicio', 'data_fim', 'ativa', 'notificacoes', 'data_criacao')
+
+    # Colunas devolvidas pela API (mesmas chaves de to_dict)
+    COLUMNS = __slots__
+    FIELD_EXPRESSIONS = {c: c for c in COLUMNS} # Campos disponíveis em ?fields=
+
     def __init__(self, id, usuario_id, titulo, tipo_meta, valor_meta, descricao=None,
                  habito_id=None, periodo='diario', data_inicio=None, data_fim=None,
                  ativa=True, notificacoes=True, data_criacao=None):
@@ -49,32 +59,44 @@ class Goal:
             'descricao': self.descricao,
             'habito_id': self.habito_id,
             'tipo_meta': self.tipo_meta,
-            'valor_meta': float(self.valor_meta),
+            'valor_meta': self.valor_meta,
             'periodo': self.periodo,
-            'data_inicio': self.data_inicio.isoformat() if isinstance(self.data_inicio, (date, datetime)) else self.data_inicio,
-            'data_fim': self.data_fim.isoformat() if isinstance(self.data_fim, (date, datetime)) else self.data_fim,
+            'data_inicio': self.data_inicio,
+            'data_fim': self.data_fim,
             'ativa': bool(self.ativa),
             'notificacoes': bool(self.notificacoes),
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None
+            'data_criacao': self.data_criacao
         }
 
     @staticmethod
     def get_by_id(goal_id, user_id):
-        query = "SELECT * FROM metas WHERE id = %s AND usuario_id = %s"
+        query = f"SELECT {', '.join(Goal.COLUMNS)} FROM metas WHERE id = %s AND usuario_id = %s"
         result = execute_query(query, (goal_id, user_id), fetch=True)
         if result:
             return Goal.from_dict(result[0])
         return None
 
     @staticmethod
-    def get_all_by_user(user_id, include_inactive=False):
-        query = "SELECT * FROM metas WHERE usuario_id = %s"
+    def project_row(row):
+        """
+        Caminho rápido linha -> resposta: ajusta no próprio dict do cursor os
+        campos que to_dict converteria, sem criar objetos intermediários.
+        """
+        if 'ativa' in row:
+            row['ativa'] = bool(row['ativa'])
+        if 'notificacoes' in row:
+            row['notificacoes'] = bool(row['notificacoes'])
+        return row
+
+    @staticmethod
+    def get_all_by_user(user_id, include_inactive=False, fields=None):
+        query = f"SELECT {select_list(fields or Goal.COLUMNS, Goal.FIELD_EXPRESSIONS)} FROM metas WHERE usuario_id = %s"
         params = [user_id]
         if not include_inactive:
             query += " AND ativa = TRUE"
         query += " ORDER BY data_inicio DESC"
         results = execute_query(query, tuple(params), fetch=True)
-        return [Goal.from_dict(r).to_dict() for r in results] if results else []
+        return [Goal.project_row(r) for r in results] if results else []
 
     def save(self):
         if isinstance(self.data_inicio, str):
@@ -103,10 +125,16 @@ class Goal:
                       self.tipo_meta, self.valor_meta, self.periodo, self.data_inicio,
                       self.data_fim, self.ativa, self.notificacoes)
             self.id = execute_query(query, params)
+        ReportSnapshot.invalidate_user(self.usuario_id) # Relatórios pré-calculados ficam desatualizados
+        publish_change(self.usuario_id, 'meta', 'salvo', {
+            'id': self.id, 'titulo': self.titulo, 'valor_meta': self.valor_meta, 'ativa': bool(self.ativa)
+        })
         return self.id
 
     def delete(self):
         """Marca a meta como inativa (exclusão lógica)."""
         query = "UPDATE metas SET ativa = FALSE WHERE id = %s AND usuario_id = %s"
         execute_query(query, (self.id, self.usuario_id))
+        ReportSnapshot.invalidate_user(self.usuario_id)
+        publish_change(self.usuario_id, 'meta', 'excluido', {'id': self.id})
         return True
\ No newline at end of file
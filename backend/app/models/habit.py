@@ -1,10 +1,21 @@
-from app.utils.database import execute_query
+from app.utils.database import execute_query, execute_upsert, stream_query
+from app.models.snapshot import ReportSnapshot
+from app.models.tombstone import Tombstone
+from app.services.events import publish_change
+from app.utils.fields import select_list
+from app.utils.cache import LRUCache
+from app.models.notes import NAO_CARREGADO, LazyNotes
+
+# Categorias são dados de referência (sem rotas de escrita): mantidas em cache por processo
+_categories_cache = LRUCache(maxsize=1, ttl=300)
 
 class HabitCategory:
     """
     Representa uma categoria de hábito.
     Corresponde à tabela 'categorias_habitos'.
     """
+    __slots__ = ('id', 'nome', 'cor', 'icone')
+
     def __init__(self, id, nome, cor=None, icone=None):
         self.id = id
         self.nome = nome
@@ -34,12 +45,31 @@ class HabitCategory:
         results = execute_query(query, fetch=True)
         return [HabitCategory.from_dict(r) for r in results] if results else []
 
+    @staticmethod
+    def get_cached_categories():
+        """Lista de categorias servida do cache do processo (recarregada a cada 5 minutos)."""
+        categories = _categories_cache.get('todas')
+        if categories is None:
+            categories = HabitCategory.get_all_categories()
+            _categories_cache.set('todas', categories)
+        return categories
+
 
 class Habit:
     """
     Representa um hábito definido por um usuário.
     Corresponde à tabela 'habitos'.
     """
+    __slots__ = ('id', 'usuario_id', 'nome', 'descricao', 'categoria_id', 'tipo_medicao',
+                 'unidade', 'meta_diaria', 'ativo', 'data_criacao', 'data_atualizacao')
+
+    # Colunas devolvidas pela API (mesmas chaves de to_dict)
+    COLUMNS = __slots__
+
+    # Campos disponíveis na listagem (?fields=) e suas expressões SQL
+    FIELD_EXPRESSIONS = {**{c: f'h.{c}' for c in COLUMNS}, 'categoria_nome': 'ch.nome'}
+    LIST_FIELDS = tuple(FIELD_EXPRESSIONS)
+
     def __init__(self, id, usuario_id, nome, categoria_id, descricao=None, tipo_medicao='boolean',
                  unidade=None, meta_diaria=None, ativo=True, data_criacao=None, data_atualizacao=None):
         self.id = id
@@ -79,28 +109,29 @@ class Habit:
             'categoria_id': self.categoria_id,
             'tipo_medicao': self.tipo_medicao,
             'unidade': self.unidade,
-            'meta_diaria': float(self.meta_diaria) if self.meta_diaria is not None else None,
+            'meta_diaria': self.meta_diaria,
             'ativo': self.ativo,
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
-            'data_atualizacao': self.data_atualizacao.isoformat() if self.data_atualizacao else None
+            'data_criacao': self.data_criacao,
+            'data_atualizacao': self.data_atualizacao
         }
 
     @staticmethod
     def get_by_id(habit_id, user_id):
-        query = "SELECT * FROM habitos WHERE id = %s AND usuario_id = %s AND ativo = TRUE"
+        query = f"SELECT {', '.join(Habit.COLUMNS)} FROM habitos WHERE id = %s AND usuario_id = %s AND ativo = TRUE"
         result = execute_query(query, (habit_id, user_id), fetch=True)
         if result:
             return Habit.from_dict(result[0])
         return None
 
     @staticmethod
-    def get_all_by_user(user_id):
-        query = "SELECT h.*, ch.nome AS categoria_nome FROM habitos h JOIN categorias_habitos ch ON h.categoria_id = ch.id WHERE h.usuario_id = %s AND h.ativo = TRUE ORDER BY h.nome"
+    def get_all_by_user(user_id, fields=None):
+        # As colunas selecionadas já são as chaves da resposta (incluindo o nome da
+        # categoria): as linhas do cursor são devolvidas diretamente, sem objetos intermediários.
+        # `fields` restringe as colunas lidas (ex: sem 'descricao' para listas simples).
+        columns = select_list(fields or Habit.LIST_FIELDS, Habit.FIELD_EXPRESSIONS)
+        query = f"SELECT {columns} FROM habitos h JOIN categorias_habitos ch ON h.categoria_id = ch.id WHERE h.usuario_id = %s AND h.ativo = TRUE ORDER BY h.nome"
         results = execute_query(query, (user_id,), fetch=True)
-        # Adiciona o nome da categoria ao dicionário do hábito
-        if results:
-            return [{**Habit.from_dict(r).to_dict(), 'categoria_nome': r['categoria_nome']} for r in results]
-        return []
+        return results if results else []
 
 
     def save(self):
@@ -121,20 +152,38 @@ class Habit:
             params = (self.usuario_id, self.nome, self.descricao, self.categoria_id,
                       self.tipo_medicao, self.unidade, self.meta_diaria)
             self.id = execute_query(query, params)
+        ReportSnapshot.invalidate_user(self.usuario_id) # Relatórios pré-calculados ficam desatualizados
         return self.id
 
     def delete(self):
         """Marca o hábito como inativo (exclusão lógica)."""
         query = "UPDATE habitos SET ativo = FALSE WHERE id = %s AND usuario_id = %s"
         execute_query(query, (self.id, self.usuario_id))
+        ReportSnapshot.invalidate_user(self.usuario_id)
         return True
 
 
-class HabitRecord:
+class HabitRecord(LazyNotes):
     """
     Representa um registro diário de um hábito.
-    Corresponde à tabela 'registros_habitos'.
+    Corresponde à tabela 'registros_habitos'; as observações ficam na tabela
+    lateral 'registros_habitos_notas' e são carregadas sob demanda.
     """
+    # Colunas da tabela principal (estreita, lida pelas varreduras por período)
+    COLUMNS = ('id', 'habito_id', 'usuario_id', 'data_registro', 'valor', 'concluido', 'data_criacao')
+
+    __slots__ = COLUMNS
+    NOTES_TABLE = 'registros_habitos_notas'
+    NOTES_KEY = 'registro_id'
+
+    # Campos disponíveis nas consultas por período (?fields=) e suas expressões SQL
+    FIELD_EXPRESSIONS = {**{c: f'rh.{c}' for c in COLUMNS}, 'observacoes': 'rhn.observacoes',
+                         'habito_nome': 'h.nome', 'tipo_medicao': 'h.tipo_medicao', 'unidade': 'h.unidade',
+                         'meta_diaria': 'h.meta_diaria'}
+    LIST_FIELDS = tuple(FIELD_EXPRESSIONS)
+    # Sem ?fields=, as observações não são lidas (exigem junção com a tabela de notas)
+    DEFAULT_FIELDS = tuple(f for f in LIST_FIELDS if f != 'observacoes')
+
     def __init__(self, id, habito_id, usuario_id, data_registro, valor=0.0, concluido=False, observacoes=None, data_criacao=None):
         self.id = id
         self.habito_id = habito_id
@@ -142,7 +191,7 @@ class HabitRecord:
         self.data_registro = data_registro # Espera um objeto date ou string 'YYYY-MM-DD'
         self.valor = valor
         self.concluido = concluido
-        self.observacoes = observacoes
+        self._init_notes(observacoes)
         self.data_criacao = data_criacao
 
     @staticmethod
@@ -154,7 +203,7 @@ class HabitRecord:
             data_registro=data.get('data_registro'),
             valor=data.get('valor'),
             concluido=data.get('concluido'),
-            observacoes=data.get('observacoes'),
+            observacoes=data.get('observacoes', NAO_CARREGADO),
             data_criacao=data.get('data_criacao')
         )
 
@@ -163,16 +212,16 @@ class HabitRecord:
             'id': self.id,
             'habito_id': self.habito_id,
             'usuario_id': self.usuario_id,
-            'data_registro': self.data_registro.isoformat() if isinstance(self.data_registro, (datetime.date, datetime.datetime)) else self.data_registro,
-            'valor': float(self.valor),
+            'data_registro': self.data_registro,
+            'valor': self.valor,
             'concluido': bool(self.concluido),
             'observacoes': self.observacoes,
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None
+            'data_criacao': self.data_criacao
         }
 
     @staticmethod
     def get_by_id(record_id, user_id):
-        query = "SELECT * FROM registros_habitos WHERE id = %s AND usuario_id = %s"
+        query = f"SELECT {', '.join(HabitRecord.COLUMNS)} FROM registros_habitos WHERE id = %s AND usuario_id = %s"
         result = execute_query(query, (record_id, user_id), fetch=True)
         if result:
             return HabitRecord.from_dict(result[0])
@@ -180,32 +229,56 @@ class HabitRecord:
 
     @staticmethod
     def get_by_habit_and_date(habit_id, user_id, date_str):
-        query = "SELECT * FROM registros_habitos WHERE habito_id = %s AND usuario_id = %s AND data_registro = %s"
+        query = f"SELECT {', '.join(HabitRecord.COLUMNS)} FROM registros_habitos WHERE habito_id = %s AND usuario_id = %s AND data_registro = %s"
         result = execute_query(query, (habit_id, user_id, date_str), fetch=True)
         if result:
             return HabitRecord.from_dict(result[0])
         return None
 
+    # Registro + informações do hábito; as colunas já são as chaves da resposta
+    _DATE_RANGE_QUERY = """
+        SELECT {columns}
+        FROM registros_habitos rh
+        JOIN habitos h ON rh.habito_id = h.id{notes_join}
+        WHERE rh.usuario_id = %s AND rh.data_registro BETWEEN %s AND %s
+        ORDER BY rh.data_registro DESC, h.nome ASC
+    """
+
+    @staticmethod
+    def _date_range_query(fields=None):
+        fields = fields or HabitRecord.DEFAULT_FIELDS
+        notes_join = "\n        LEFT JOIN registros_habitos_notas rhn ON rhn.registro_id = rh.id" if 'observacoes' in fields else ""
+        return HabitRecord._DATE_RANGE_QUERY.format(
+            columns=select_list(fields, HabitRecord.FIELD_EXPRESSIONS), notes_join=notes_join)
+
     @staticmethod
-    def get_all_by_user_and_date_range(user_id, start_date, end_date):
-        query = """
-            SELECT rh.*, h.nome as habito_nome, h.tipo_medicao, h.unidade, h.meta_diaria
-            FROM registros_habitos rh
-            JOIN habitos h ON rh.habito_id = h.id
-            WHERE rh.usuario_id = %s AND rh.data_registro BETWEEN %s AND %s
-            ORDER BY rh.data_registro DESC, h.nome ASC
+    def project_row(row):
+        """
+        Caminho rápido linha -> resposta: ajusta no próprio dict do cursor os
+        campos que to_dict converteria, sem criar objetos intermediários.
         """
-        results = execute_query(query, (user_id, start_date, end_date), fetch=True)
+        if 'concluido' in row:
+            row['concluido'] = bool(row['concluido'])
+        return row
+
+    @staticmethod
+    def get_all_by_user_and_date_range(user_id, start_date, end_date, fields=None):
+        results = execute_query(HabitRecord._date_range_query(fields), (user_id, start_date, end_date), fetch=True)
         if results:
-            # Adiciona informações do hábito ao registro
-            return [{**HabitRecord.from_dict(r).to_dict(),
-                     'habito_nome': r['habito_nome'],
-                     'tipo_medicao': r['tipo_medicao'],
-                     'unidade': r['unidade'],
-                     'meta_diaria': float(r['meta_diaria']) if r['meta_diaria'] is not None else None
-                     } for r in results]
+            project_row = HabitRecord.project_row
+            return [project_row(r) for r in results]
         return []
 
+    @staticmethod
+    def iter_all_by_user_and_date_range(user_id, start_date, end_date, batch_size=None, fields=None):
+        """
+        Variante em streaming de get_all_by_user_and_date_range: produz os
+        registros um a um a partir de um cursor do lado do servidor, com
+        memória constante independentemente do tamanho do período.
+        """
+        for r in stream_query(HabitRecord._date_range_query(fields), (user_id, start_date, end_date), batch_size):
+            yield HabitRecord.project_row(r)
+
 
     def save(self):
         from datetime import date # Importação local
@@ -214,22 +287,63 @@ class HabitRecord:
 
         if self.id: # Atualizar
             query = """
-                UPDATE registros_habitos SET valor = %s, concluido = %s, observacoes = %s
+                UPDATE registros_habitos SET valor = %s, concluido = %s, data_atualizacao = CURRENT_TIMESTAMP
                 WHERE id = %s AND usuario_id = %s
             """
-            params = (self.valor, self.concluido, self.observacoes, self.id, self.usuario_id)
+            params = (self.valor, self.concluido, self.id, self.usuario_id)
             execute_query(query, params)
+            self._save_notes_after_update()
         else: # Inserir
             query = """
-                INSERT INTO registros_habitos (habito_id, usuario_id, data_registro, valor, concluido, observacoes)
-                VALUES (%s, %s, %s, %s, %s, %s)
+                INSERT INTO registros_habitos (habito_id, usuario_id, data_registro, valor, concluido)
+                VALUES (%s, %s, %s, %s, %s)
             """
-            params = (self.habito_id, self.usuario_id, self.data_registro, self.valor, self.concluido, self.observacoes)
+            params = (self.habito_id, self.usuario_id, self.data_registro, self.valor, self.concluido)
             self.id = execute_query(query, params)
+            self._save_notes_after_insert()
+        ReportSnapshot.invalidate_user(self.usuario_id) # Relatórios pré-calculados ficam desatualizados
+        self._publish_saved()
         return self.id
 
+    def _publish_saved(self):
+        publish_change(self.usuario_id, 'registro_habito', 'salvo', {
+            'id': self.id, 'habito_id': self.habito_id, 'data_registro': self.data_registro,
+            'valor': self.valor, 'concluido': bool(self.concluido)
+        })
+
+    # Insere ou atualiza o registro do dia em um único comando, pela chave natural
+    # (habito_id, data_registro). O SELECT garante que o hábito é do usuário e está ativo.
+    _UPSERT_QUERY = """
+        INSERT INTO registros_habitos (habito_id, usuario_id, data_registro, valor, concluido)
+        SELECT h.id, h.usuario_id, %s, %s, %s FROM habitos h
+        WHERE h.id = %s AND h.usuario_id = %s AND h.ativo = TRUE
+        ON DUPLICATE KEY UPDATE valor = VALUES(valor), concluido = VALUES(concluido),
+            data_atualizacao = CURRENT_TIMESTAMP, id = LAST_INSERT_ID(id)
+    """
+
+    @staticmethod
+    def upsert(habit_id, user_id, data_registro, valor=0.0, concluido=False, observacoes=NAO_CARREGADO):
+        """
+        Grava o registro de um hábito em uma data (PUT idempotente).
+        As observações só são alteradas quando informadas.
+        Retorna (registro, criado) ou (None, False) se o hábito não existe/não é do usuário.
+        """
+        record_id, created = execute_upsert(HabitRecord._UPSERT_QUERY,
+                                            (data_registro, valor, concluido, habit_id, user_id))
+        if not record_id:
+            return None, False
+        record = HabitRecord(record_id, habit_id, user_id, data_registro, valor, concluido, observacoes)
+        if observacoes is not NAO_CARREGADO:
+            record._save_notes()
+        ReportSnapshot.invalidate_user(user_id)
+        record._publish_saved()
+        return record, created
+
     def delete(self):
         """Exclui um registro de hábito."""
         query = "DELETE FROM registros_habitos WHERE id = %s AND usuario_id = %s"
         execute_query(query, (self.id, self.usuario_id))
+        Tombstone.record(self.usuario_id, 'registro_habito', self.id) # Para a sincronização incremental
+        ReportSnapshot.invalidate_user(self.usuario_id)
+        publish_change(self.usuario_id, 'registro_habito', 'excluido', {'id': self.id})
         return True
\ No newline at end of file
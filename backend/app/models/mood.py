@@ -1,17 +1,34 @@
-from app.utils.database import execute_query
-from datetime import date, datetime
+from app.utils.database import execute_query, execute_upsert, stream_query
+from app.models.snapshot import ReportSnapshot
+from app.models.tombstone import Tombstone
+from app.services.events import publish_change
+from app.utils.fields import select_list
+from app.models.notes import NAO_CARREGADO, LazyNotes
+from datetime import date
 
-class MoodAssessment:
+class MoodAssessment(LazyNotes):
     """
     Representa uma avaliação de humor diária de um usuário.
-    Corresponde à tabela 'avaliacoes_humor'.
+    Corresponde à tabela 'avaliacoes_humor'; as observações ficam na tabela
+    lateral 'avaliacoes_humor_notas' e são carregadas sob demanda.
     """
+    # Colunas da tabela principal (estreita, lida pelas varreduras por período)
+    COLUMNS = ('id', 'usuario_id', 'data_avaliacao', 'nota_humor', 'data_criacao', 'data_atualizacao')
+
+    __slots__ = COLUMNS
+    NOTES_TABLE = 'avaliacoes_humor_notas'
+    NOTES_KEY = 'avaliacao_id'
+
+    # Campos disponíveis em ?fields= e suas expressões SQL
+    FIELD_EXPRESSIONS = {**{c: f'ah.{c}' for c in COLUMNS}, 'observacoes': 'ahn.observacoes'}
+    LIST_FIELDS = tuple(FIELD_EXPRESSIONS)
+
     def __init__(self, id, usuario_id, data_avaliacao, nota_humor, observacoes=None, data_criacao=None, data_atualizacao=None):
         self.id = id
         self.usuario_id = usuario_id
         self.data_avaliacao = data_avaliacao # Espera um objeto date ou string 'YYYY-MM-DD'
         self.nota_humor = nota_humor
-        self.observacoes = observacoes
+        self._init_notes(observacoes)
         self.data_criacao = data_criacao
         self.data_atualizacao = data_atualizacao
 
@@ -22,7 +39,7 @@ class MoodAssessment:
             usuario_id=data.get('usuario_id'),
             data_avaliacao=data.get('data_avaliacao'),
             nota_humor=data.get('nota_humor'),
-            observacoes=data.get('observacoes'),
+            observacoes=data.get('observacoes', NAO_CARREGADO),
             data_criacao=data.get('data_criacao'),
             data_atualizacao=data.get('data_atualizacao')
         )
@@ -31,16 +48,16 @@ class MoodAssessment:
         return {
             'id': self.id,
             'usuario_id': self.usuario_id,
-            'data_avaliacao': self.data_avaliacao.isoformat() if isinstance(self.data_avaliacao, (date, datetime)) else self.data_avaliacao,
+            'data_avaliacao': self.data_avaliacao,
             'nota_humor': self.nota_humor,
             'observacoes': self.observacoes,
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
-            'data_atualizacao': self.data_atualizacao.isoformat() if self.data_atualizacao else None
+            'data_criacao': self.data_criacao,
+            'data_atualizacao': self.data_atualizacao
         }
 
     @staticmethod
     def get_by_id(mood_id, user_id):
-        query = "SELECT * FROM avaliacoes_humor WHERE id = %s AND usuario_id = %s"
+        query = f"SELECT {', '.join(MoodAssessment.COLUMNS)} FROM avaliacoes_humor WHERE id = %s AND usuario_id = %s"
         result = execute_query(query, (mood_id, user_id), fetch=True)
         if result:
             return MoodAssessment.from_dict(result[0])
@@ -48,21 +65,41 @@ class MoodAssessment:
 
     @staticmethod
     def get_by_user_and_date(user_id, date_str):
-        query = "SELECT * FROM avaliacoes_humor WHERE usuario_id = %s AND data_avaliacao = %s"
+        query = f"SELECT {', '.join(MoodAssessment.COLUMNS)} FROM avaliacoes_humor WHERE usuario_id = %s AND data_avaliacao = %s"
         result = execute_query(query, (user_id, date_str), fetch=True)
         if result:
             return MoodAssessment.from_dict(result[0])
         return None
 
+    # As colunas selecionadas já são as chaves da resposta: as linhas do cursor
+    # são devolvidas diretamente, sem passar por from_dict/to_dict.
+    _DATE_RANGE_QUERY = """
+        SELECT {columns} FROM avaliacoes_humor ah{notes_join}
+        WHERE ah.usuario_id = %s AND ah.data_avaliacao BETWEEN %s AND %s
+        ORDER BY ah.data_avaliacao ASC
+    """
+
+    @staticmethod
+    def _date_range_query(fields=None):
+        # Sem ?fields=, apenas as colunas da tabela principal (sem as observações)
+        fields = fields or MoodAssessment.COLUMNS
+        notes_join = "\n        LEFT JOIN avaliacoes_humor_notas ahn ON ahn.avaliacao_id = ah.id" if 'observacoes' in fields else ""
+        return MoodAssessment._DATE_RANGE_QUERY.format(
+            columns=select_list(fields, MoodAssessment.FIELD_EXPRESSIONS), notes_join=notes_join)
+
+    @staticmethod
+    def get_all_by_user_and_date_range(user_id, start_date, end_date, fields=None):
+        results = execute_query(MoodAssessment._date_range_query(fields), (user_id, start_date, end_date), fetch=True)
+        return results if results else []
+
     @staticmethod
-    def get_all_by_user_and_date_range(user_id, start_date, end_date):
-        query = """
-            SELECT * FROM avaliacoes_humor
-            WHERE usuario_id = %s AND data_avaliacao BETWEEN %s AND %s
-            ORDER BY data_avaliacao ASC
+    def iter_all_by_user_and_date_range(user_id, start_date, end_date, batch_size=None, fields=None):
         """
-        results = execute_query(query, (user_id, start_date, end_date), fetch=True)
-        return [MoodAssessment.from_dict(r).to_dict() for r in results] if results else []
+        Variante em streaming de get_all_by_user_and_date_range: produz as
+        avaliações uma a uma a partir de um cursor do lado do servidor.
+        """
+        for r in stream_query(MoodAssessment._date_range_query(fields), (user_id, start_date, end_date), batch_size):
+            yield r
 
     def save(self):
         if isinstance(self.data_avaliacao, str):
@@ -70,22 +107,55 @@ class MoodAssessment:
 
         if self.id: # Atualizar
             query = """
-                UPDATE avaliacoes_humor SET nota_humor = %s, observacoes = %s
+                UPDATE avaliacoes_humor SET nota_humor = %s, data_atualizacao = CURRENT_TIMESTAMP
                 WHERE id = %s AND usuario_id = %s
             """
-            params = (self.nota_humor, self.observacoes, self.id, self.usuario_id)
+            params = (self.nota_humor, self.id, self.usuario_id)
             execute_query(query, params)
+            self._save_notes_after_update()
         else: # Inserir
             query = """
-                INSERT INTO avaliacoes_humor (usuario_id, data_avaliacao, nota_humor, observacoes)
-                VALUES (%s, %s, %s, %s)
+                INSERT INTO avaliacoes_humor (usuario_id, data_avaliacao, nota_humor)
+                VALUES (%s, %s, %s)
             """
-            params = (self.usuario_id, self.data_avaliacao, self.nota_humor, self.observacoes)
+            params = (self.usuario_id, self.data_avaliacao, self.nota_humor)
             self.id = execute_query(query, params)
+            self._save_notes_after_insert()
+        ReportSnapshot.invalidate_user(self.usuario_id) # Relatórios pré-calculados ficam desatualizados
+        self._publish_saved()
         return self.id
 
+    def _publish_saved(self):
+        publish_change(self.usuario_id, 'avaliacao_humor', 'salvo', {
+            'id': self.id, 'data_avaliacao': self.data_avaliacao, 'nota_humor': self.nota_humor
+        })
+
+    # Insere ou atualiza a avaliação do dia em um único comando, pela chave natural (usuario_id, data_avaliacao)
+    _UPSERT_QUERY = """
+        INSERT INTO avaliacoes_humor (usuario_id, data_avaliacao, nota_humor) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE nota_humor = VALUES(nota_humor),
+            data_atualizacao = CURRENT_TIMESTAMP, id = LAST_INSERT_ID(id)
+    """
+
+    @staticmethod
+    def upsert(user_id, data_avaliacao, nota_humor, observacoes=NAO_CARREGADO):
+        """
+        Grava a avaliação de humor de uma data (PUT idempotente).
+        As observações só são alteradas quando informadas. Retorna (avaliação, criada).
+        """
+        mood_id, created = execute_upsert(MoodAssessment._UPSERT_QUERY, (user_id, data_avaliacao, nota_humor))
+        assessment = MoodAssessment(mood_id, user_id, data_avaliacao, nota_humor, observacoes)
+        if observacoes is not NAO_CARREGADO:
+            assessment._save_notes()
+        ReportSnapshot.invalidate_user(user_id)
+        assessment._publish_saved()
+        return assessment, created
+
     def delete(self):
         """Exclui uma avaliação de humor."""
         query = "DELETE FROM avaliacoes_humor WHERE id = %s AND usuario_id = %s"
         execute_query(query, (self.id, self.usuario_id))
+        Tombstone.record(self.usuario_id, 'avaliacao_humor', self.id) # Para a sincronização incremental
+        ReportSnapshot.invalidate_user(self.usuario_id)
+        publish_change(self.usuario_id, 'avaliacao_humor', 'excluido', {'id': self.id})
         return True
\ No newline at end of file
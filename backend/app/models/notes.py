@@ -0,0 +1,60 @@
+from app.utils.database import execute_query
+
+# Marca campos carregados sob demanda (ex: observações) que ainda não foram lidos do banco
+NAO_CARREGADO = object()
+
+class LazyNotes:
+    """
+    Observações guardadas em uma tabela lateral de notas (fora da tabela
+    principal, que fica estreita para as varreduras por período) e lidas sob
+    demanda, no primeiro acesso. As subclasses definem NOTES_TABLE e NOTES_KEY
+    (coluna que referencia o registro).
+    """
+    __slots__ = ('_observacoes', '_observacoes_alteradas')
+
+    NOTES_TABLE = None
+    NOTES_KEY = None
+
+    def _init_notes(self, observacoes):
+        self._observacoes = observacoes
+        self._observacoes_alteradas = False
+
+    @property
+    def observacoes(self):
+        """Observações, lidas da tabela de notas apenas no primeiro acesso."""
+        if self._observacoes is NAO_CARREGADO:
+            self._observacoes = type(self).get_notes(self.id) if self.id else None
+        return self._observacoes
+
+    @observacoes.setter
+    def observacoes(self, value):
+        self._observacoes = value
+        self._observacoes_alteradas = True
+
+    @classmethod
+    def get_notes(cls, record_id):
+        result = execute_query(f"SELECT observacoes FROM {cls.NOTES_TABLE} WHERE {cls.NOTES_KEY} = %s",
+                               (record_id,), fetch=True)
+        return result[0]['observacoes'] if result else None
+
+    def _save_notes(self):
+        """Grava (ou remove, se vazias) as observações na tabela de notas."""
+        if self._observacoes:
+            execute_query(
+                f"""INSERT INTO {self.NOTES_TABLE} ({self.NOTES_KEY}, observacoes) VALUES (%s, %s)
+                    ON DUPLICATE KEY UPDATE observacoes = VALUES(observacoes)""",
+                (self.id, self._observacoes)
+            )
+        else:
+            execute_query(f"DELETE FROM {self.NOTES_TABLE} WHERE {self.NOTES_KEY} = %s", (self.id,))
+        self._observacoes_alteradas = False
+
+    def _save_notes_after_update(self):
+        # Atualização: só regrava se as observações foram alteradas
+        if self._observacoes_alteradas:
+            self._save_notes()
+
+    def _save_notes_after_insert(self):
+        # Inserção: só grava se há observações informadas
+        if self._observacoes not in (None, '', NAO_CARREGADO):
+            self._save_notes()
@@ -0,0 +1,45 @@
+from app.utils.database import execute_query, execute_many
+from app.utils.serialization import dumps, loads
+
+class ReportSnapshot:
+    """
+    Relatório pré-calculado de um usuário para um dia de referência.
+    Corresponde à tabela 'snapshots_relatorios'.
+    """
+
+    @staticmethod
+    def get(user_id, tipo, data_referencia):
+        """Retorna os dados do snapshot (já desserializados) ou None se não existir."""
+        query = "SELECT dados FROM snapshots_relatorios WHERE usuario_id = %s AND tipo = %s AND data_referencia = %s"
+        result = execute_query(query, (user_id, tipo, data_referencia), fetch=True)
+        if result:
+            return loads(result[0]['dados'])
+        return None
+
+    @staticmethod
+    def save(user_id, tipo, data_referencia, dados):
+        query = """
+            REPLACE INTO snapshots_relatorios (usuario_id, tipo, data_referencia, dados)
+            VALUES (%s, %s, %s, %s)
+        """
+        execute_query(query, (user_id, tipo, data_referencia, dumps(dados)))
+
+    @staticmethod
+    def save_many(snapshots):
+        """Grava vários snapshots de uma vez. Recebe tuplas (usuario_id, tipo, data_referencia, dados)."""
+        if not snapshots:
+            return 0
+        query = """
+            REPLACE INTO snapshots_relatorios (usuario_id, tipo, data_referencia, dados)
+            VALUES (%s, %s, %s, %s)
+        """
+        return execute_many(query, [(u, t, d, dumps(dados)) for u, t, d, dados in snapshots])
+
+    @staticmethod
+    def invalidate_user(user_id):
+        """Remove os snapshots de um usuário (chamado quando seus dados mudam)."""
+        return execute_query("DELETE FROM snapshots_relatorios WHERE usuario_id = %s", (user_id,))
+
+    @staticmethod
+    def delete_older_than(data_referencia):
+        return execute_query("DELETE FROM snapshots_relatorios WHERE data_referencia < %s", (data_referencia,))
@@ -0,0 +1,69 @@
+from app.utils.database import execute_query, get_db_connection
+
+class StoredFile:
+    """
+    Contagem de referências dos arquivos de upload endereçados pelo conteúdo
+    (mesma imagem enviada por vários usuários = um arquivo, várias referências).
+    Corresponde à tabela 'arquivos'.
+    """
+
+    @staticmethod
+    def add_reference(chave, tamanho):
+        query = """
+            INSERT INTO arquivos (chave, referencias, tamanho) VALUES (%s, 1, %s)
+            ON DUPLICATE KEY UPDATE referencias = referencias + 1
+        """
+        execute_query(query, (chave, tamanho))
+
+    @staticmethod
+    def variants_ready(chave):
+        result = execute_query("SELECT variantes_prontas FROM arquivos WHERE chave = %s", (chave,), fetch=True)
+        return bool(result and result[0]['variantes_prontas'])
+
+    @staticmethod
+    def mark_variants_ready(chave):
+        """Registra que as variantes redimensionadas existem: as URLs passam a apontar para elas."""
+        execute_query("UPDATE arquivos SET variantes_prontas = TRUE WHERE chave = %s", (chave,))
+
+    @staticmethod
+    def release(chave):
+        """Remove uma referência. Arquivos sem referências são apagados depois, pela coleta."""
+        if chave:
+            execute_query("UPDATE arquivos SET referencias = referencias - 1 WHERE chave = %s AND referencias > 0", (chave,))
+
+    @staticmethod
+    def get_orphans(older_than, limit):
+        """Chaves sem referências desde antes de `older_than` (prazo para uploads em andamento)."""
+        query = """
+            SELECT chave FROM arquivos
+            WHERE referencias = 0 AND data_atualizacao < %s
+            ORDER BY data_atualizacao LIMIT %s
+        """
+        return [row['chave'] for row in execute_query(query, (older_than, limit), fetch=True) or []]
+
+    @staticmethod
+    def delete_if_orphan(chave, remove_files):
+        """
+        Apaga a linha e os arquivos (via `remove_files(chave)`) se ainda não há
+        referências. A linha fica bloqueada (FOR UPDATE) durante a remoção, então
+        um upload simultâneo do mesmo conteúdo espera e depois grava o arquivo de novo.
+        Retorna True se o arquivo foi removido.
+        """
+        connection = get_db_connection()
+        try:
+            connection.begin()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT referencias FROM arquivos WHERE chave = %s FOR UPDATE", (chave,))
+                row = cursor.fetchone()
+                if not row or row['referencias'] > 0:
+                    connection.rollback()
+                    return False
+                remove_files(chave)
+                cursor.execute("DELETE FROM arquivos WHERE chave = %s", (chave,))
+            connection.commit()
+            return True
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
@@ -0,0 +1,26 @@
+from app.utils.database import execute_query
+
+class Tombstone:
+    """
+    Marca de exclusão física (registros de hábitos e avaliações de humor), usada
+    pela sincronização incremental para avisar os clientes do que foi apagado.
+    Corresponde à tabela 'exclusoes'.
+    """
+
+    @staticmethod
+    def record(user_id, entidade, entidade_id):
+        query = "INSERT INTO exclusoes (usuario_id, entidade, entidade_id) VALUES (%s, %s, %s)"
+        return execute_query(query, (user_id, entidade, entidade_id))
+
+    @staticmethod
+    def get_since(user_id, since=None):
+        query = "SELECT entidade, entidade_id AS id, data_exclusao FROM exclusoes WHERE usuario_id = %s"
+        params = (user_id,)
+        if since is not None:
+            query += " AND data_exclusao >= %s"
+            params += (since,)
+        return execute_query(query + " ORDER BY data_exclusao", params, fetch=True) or []
+
+    @staticmethod
+    def delete_older_than(limit):
+        return execute_query("DELETE FROM exclusoes WHERE data_exclusao < %s", (limit,))
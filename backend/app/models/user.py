@@ -3,12 +3,17 @@ class User:
     Representa um usuário no sistema.
     Corresponde à tabela 'usuarios' no banco de dados.
     """
-    def __init__(self, id, nome, email, senha, tipo_usuario='usuario', foto_perfil=None, ativo=True, data_criacao=None, data_atualizacao=None):
+
+    # Colunas lidas nas buscas; a situação das variantes da foto vem de 'arquivos' (LEFT JOIN a)
+    SELECT_COLUMNS = ("u.id, u.nome, u.email, u.senha, u.tipo_usuario, u.foto_perfil, u.ativo, "
+                      "u.data_criacao, u.data_atualizacao, a.variantes_prontas AS foto_variantes_prontas")
+    def __init__(self, id, nome, email, senha, tipo_usuario='usuario', foto_perfil=None, ativo=True, data_criacao=None, data_atualizacao=None, foto_variantes_prontas=False):
         self.id = id
         self.nome = nome
         self.email = email
         self.senha = senha  # A senha aqui já deve ser o hash
         self.foto_perfil = foto_perfil
+        self.foto_variantes_prontas = bool(foto_variantes_prontas) # De arquivos.variantes_prontas (não é gravado em usuarios)
         self.tipo_usuario = tipo_usuario
         self.ativo = ativo
         self.data_criacao = data_criacao
@@ -26,27 +31,30 @@ class User:
             foto_perfil=data.get('foto_perfil'),
             ativo=data.get('ativo', True),
             data_criacao=data.get('data_criacao'),
-            data_atualizacao=data.get('data_atualizacao')
+            data_atualizacao=data.get('data_atualizacao'),
+            foto_variantes_prontas=data.get('foto_variantes_prontas')
         )
 
     def to_dict(self):
         """Converte a instância de User para um dicionário (útil para jsonify)."""
+        from app.utils.uploads import get_profile_picture_urls # Importação local para evitar circular
         return {
             'id': self.id,
             'nome': self.nome,
             'email': self.email,
             'foto_perfil': self.foto_perfil,
+            'foto_perfil_urls': get_profile_picture_urls(self.foto_perfil, self.foto_variantes_prontas), # Variantes redimensionadas por tamanho
             'tipo_usuario': self.tipo_usuario,
             'ativo': self.ativo,
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
-            'data_atualizacao': self.data_atualizacao.isoformat() if self.data_atualizacao else None
+            'data_criacao': self.data_criacao,
+            'data_atualizacao': self.data_atualizacao
         }
 
     @staticmethod
     def get_by_id(user_id):
         """Busca um usuário pelo ID no banco de dados."""
         from app.utils.database import execute_query # Importação local para evitar circular
-        query = "SELECT id, nome, email, senha, tipo_usuario, foto_perfil, ativo, data_criacao, data_atualizacao FROM usuarios WHERE id = %s"
+        query = f"SELECT {User.SELECT_COLUMNS} FROM usuarios u LEFT JOIN arquivos a ON a.chave = u.foto_perfil WHERE u.id = %s"
         result = execute_query(query, (user_id,), fetch=True)
         if result:
             return User.from_dict(result[0])
@@ -56,7 +64,7 @@ class User:
     def get_by_email(email):
         """Busca um usuário pelo email no banco de dados."""
         from app.utils.database import execute_query # Importação local para evitar circular
-        query = "SELECT id, nome, email, senha, tipo_usuario, foto_perfil, ativo, data_criacao, data_atualizacao FROM usuarios WHERE email = %s"
+        query = f"SELECT {User.SELECT_COLUMNS} FROM usuarios u LEFT JOIN arquivos a ON a.chave = u.foto_perfil WHERE u.email = %s"
         result = execute_query(query, (email,), fetch=True)
         if result:
             return User.from_dict(result[0])
@@ -1,10 +1,12 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, unset_jwt_cookies, set_access_cookies
-import bcrypt
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity, unset_jwt_cookies, set_access_cookies
 import uuid
 from datetime import datetime, timedelta
 from app.utils.database import execute_query
 from app.services.email_service import send_password_reset_email
+from app.services.auth_service import PasswordService, PasswordHasherBusy
+from app.services.session_service import SessionService
+from app.utils.jwt_helper import revoke_token
 from app.models.user import User # Importa o modelo User
 from app.config import Config
 import re
@@ -20,6 +22,10 @@ def validate_password(password):
     """Valida se a senha tem pelo menos 6 caracteres."""
     return len(password) >= 6
 
+def busy_response():
+    """Resposta rápida quando o pool de hashing de senhas está cheio."""
+    return jsonify({'error': 'Servidor ocupado. Tente novamente em instantes.'}), 503, {'Retry-After': '1'}
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """HU01 - Cadastro de Usuários."""
@@ -54,15 +60,15 @@ def register():
         if existing_user:
             return jsonify({'error': 'Email já cadastrado'}), 400
 
-        # Hash da senha
-        hashed_password = bcrypt.hashpw(senha.encode('utf-8'), bcrypt.gensalt(rounds=12)) # Aumentar rounds para segurança
+        # Hash da senha (no pool dedicado, com o custo de BCRYPT_ROUNDS)
+        hashed_password = PasswordService.hash_password(senha)
         
         # Criar instância do modelo User
         new_user = User(
             id=None, # ID será gerado pelo BD
             nome=nome,
             email=email,
-            senha=hashed_password.decode('utf-8'),
+            senha=hashed_password,
             tipo_usuario='usuario'
         )
         
@@ -79,6 +85,8 @@ def register():
         set_access_cookies(response, access_token) # Define cookie HTTP-only
         return response, 201
 
+    except PasswordHasherBusy:
+        return busy_response()
     except Exception as e:
         print(f"Erro no registro: {e}") # Para depuração
         return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
@@ -106,24 +114,24 @@ def login():
             return jsonify({'error': 'Usuário desativado. Contate o administrador.'}), 401
 
         # Verificar senha
-        if not bcrypt.checkpw(senha.encode('utf-8'), user.senha.encode('utf-8')):
+        if not PasswordService.check_password(senha, user.senha):
             return jsonify({'error': 'Email ou senha inválidos'}), 401
 
+        # Hash com custo diferente do configurado: regrava em segundo plano
+        if PasswordService.needs_rehash(user.senha):
+            PasswordService.rehash_in_background(user.id, senha)
+
         # Criar token de acesso
         access_token = create_access_token(identity=user.id)
         
         # Registrar sessão (opcional, pode ser feito com JWT)
-        # Este trecho é útil se você quer rastrear sessões ativas no DB
-        execute_query(
-            """INSERT INTO sessoes (usuario_id, token, ip_address, user_agent, data_expiracao)
-                VALUES (%s, %s, %s, %s, %s)""",
-            (
-                user.id,
-                access_token[:50],  # Apenas parte do token para identificação
-                request.remote_addr,
-                request.headers.get('User-Agent', ''),
-                datetime.now() + Config.JWT_ACCESS_TOKEN_EXPIRES # Usa o tempo de expiração do JWT
-            )
+        # Gravada em segundo plano (fila write-behind), sem atrasar a resposta
+        SessionService.record_login(
+            user.id,
+            access_token[:50],  # Apenas parte do token para identificação
+            request.remote_addr,
+            request.headers.get('User-Agent', ''),
+            datetime.now() + Config.JWT_ACCESS_TOKEN_EXPIRES # Usa o tempo de expiração do JWT
         )
 
         response = jsonify({
@@ -134,6 +142,8 @@ def login():
         set_access_cookies(response, access_token) # Define cookie HTTP-only
         return response, 200
 
+    except PasswordHasherBusy:
+        return busy_response()
     except Exception as e:
         print(f"Erro no login: {e}") # Para depuração
         return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
@@ -141,11 +151,19 @@ def login():
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required() # Requer token JWT válido
 def logout():
-    """Desloga o usuário, invalidando a sessão no backend (se houver) e removendo cookies."""
+    """Desloga o usuário, revogando o token atual, invalidando a sessão no backend (se houver) e removendo cookies."""
     current_user_id = get_jwt_identity()
 
-    # Opcional: invalidar a sessão no banco de dados se estiver sendo rastreada
-    execute_query("UPDATE sessoes SET ativa = FALSE WHERE usuario_id = %s AND ativa = TRUE", (current_user_id,))
+    try:
+        # O token deixa de ser aceito mesmo antes de expirar
+        revoke_token(get_jwt(), current_user_id)
+    except Exception as e:
+        # Banco indisponível, por exemplo: o logout continua e o cookie é removido mesmo assim
+        # (o token só deixa de valer ao expirar)
+        print(f"Erro ao revogar token no logout: {e}") # Para depuração
+
+    # Opcional: invalidar a sessão no banco de dados se estiver sendo rastreada (em segundo plano)
+    SessionService.record_logout(current_user_id)
 
     response = jsonify({'message': 'Logout bem-sucedido!'})
     unset_jwt_cookies(response) # Remove o cookie JWT
@@ -210,7 +228,7 @@ def reset_password():
 
         # Buscar token no banco de dados
         reset_token_record = execute_query(
-            "SELECT * FROM tokens_recuperacao WHERE token = %s AND usado = FALSE AND data_expiracao > NOW()",
+            "SELECT id, usuario_id FROM tokens_recuperacao WHERE token = %s AND usado = FALSE AND data_expiracao > NOW()",
             (token,),
             fetch=True
         )
@@ -222,14 +240,16 @@ def reset_password():
         user_id = reset_token_record['usuario_id']
 
         # Atualizar a senha do usuário
-        hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt(rounds=12))
-        execute_query("UPDATE usuarios SET senha = %s WHERE id = %s", (hashed_password.decode('utf-8'), user_id))
+        hashed_password = PasswordService.hash_password(new_password)
+        execute_query("UPDATE usuarios SET senha = %s WHERE id = %s", (hashed_password, user_id))
 
         # Marcar token como usado
         execute_query("UPDATE tokens_recuperacao SET usado = TRUE WHERE id = %s", (reset_token_record['id'],))
 
         return jsonify({'message': 'Senha redefinida com sucesso!'}), 200
 
+    except PasswordHasherBusy:
+        return busy_response()
     except Exception as e:
         print(f"Erro na redefinição de senha: {e}") # Para depuração
         return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
@@ -0,0 +1,33 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from app.services.batch_service import BatchService, FORWARDED_HEADERS
+
+batch_bp = Blueprint('batch', __name__)
+
+@batch_bp.route('', methods=['POST'])
+@jwt_required()
+def execute_batch():
+    """
+    Executa várias requisições da API de uma vez. Corpo:
+    {"requests": [{"id": "habitos", "method": "GET", "path": "/api/habits/", "query": "...", "body": {...}}],
+     "parallel": true}
+    Responde com {"responses": [{"id", "status", "body"}]} na mesma ordem.
+    """
+    data = request.get_json() or {}
+    items = data.get('requests')
+    config = current_app.config
+
+    try:
+        BatchService.validate(items, config['BATCH_MAX_REQUESTS'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+    try:
+        responses = BatchService.execute(current_app._get_current_object(), items, headers,
+                                         parallel=bool(data.get('parallel')),
+                                         max_workers=config['BATCH_MAX_WORKERS'])
+        return jsonify({'responses': responses}), 200
+    except Exception as e:
+        print(f"Erro ao executar lote de requisições: {e}")
+        return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
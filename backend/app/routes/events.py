@@ -0,0 +1,41 @@
+from flask import Blueprint, Response, jsonify, current_app, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.events import events, OVERFLOW
+from app.utils.serialization import dumps
+
+events_bp = Blueprint('events', __name__)
+
+@events_bp.route('/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'cookies']) # EventSource não envia cabeçalhos: usa o cookie HTTP-only do login
+def stream_events():
+    """
+    Server-Sent Events: envia ao cliente as alterações de registros de hábitos,
+    avaliações de humor e metas do usuário assim que acontecem.
+    Cada conexão aberta ocupa uma thread do worker enquanto durar; o total por
+    processo é limitado pelo bulkhead 'events' do controle de admissão.
+    """
+    current_user_id = str(get_jwt_identity())
+    subscription = events.subscribe(current_user_id)
+    if subscription is None:
+        return jsonify({'error': 'Limite de conexões de eventos atingido para este usuário.'}), 429
+    heartbeat = current_app.config['EVENTS_HEARTBEAT_SECONDS']
+
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                event = subscription.get(timeout=heartbeat)
+                if event is None:
+                    yield ': heartbeat\n\n' # Mantém a conexão viva e detecta clientes desconectados
+                elif event is OVERFLOW:
+                    yield 'event: resync\ndata: {}\n\n'
+                    return
+                else:
+                    yield f"event: {event['entidade']}\ndata: {dumps(event)}\n\n"
+        finally:
+            events.unsubscribe(subscription)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no', # Nginx: não bufferizar o stream
+    })
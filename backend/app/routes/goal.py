@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.goal import Goal
+from app.utils.fields import parse_fields
 from datetime import date
 
 goal_bp = Blueprint('goal', __name__)
@@ -57,7 +58,11 @@ def get_user_goals():
     current_user_id = get_jwt_identity()
     include_inactive = request.args.get('include_inactive', 'false').lower() == 'true'
     try:
-        goals = Goal.get_all_by_user(current_user_id, include_inactive)
+        fields = parse_fields(request.args.get('fields'), Goal.COLUMNS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        goals = Goal.get_all_by_user(current_user_id, include_inactive, fields)
         return jsonify(goals), 200
     except Exception as e:
         return jsonify({'error': f'Erro ao listar metas: {str(e)}'}), 500
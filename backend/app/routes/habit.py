@@ -1,16 +1,29 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.habit import Habit, HabitRecord, HabitCategory
+from app.utils.fields import parse_fields
+from app.utils.idempotency import idempotent
 from datetime import date
+import math
 
 habit_bp = Blueprint('habit', __name__)
 
+def _parse_valor(value):
+    """Valor numérico de um registro (número ou texto numérico), ou None se inválido."""
+    if isinstance(value, bool): # bool é subclasse de int
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
 @habit_bp.route('/categories', methods=['GET'])
 @jwt_required()
 def get_habit_categories():
     """Obter todas as categorias de hábitos."""
     try:
-        categories = HabitCategory.get_all_categories()
+        categories = HabitCategory.get_cached_categories()
         return jsonify([c.to_dict() for c in categories]), 200
     except Exception as e:
         return jsonify({'error': f'Erro ao buscar categorias: {str(e)}'}), 500
@@ -46,7 +59,7 @@ def create_habit():
         
         # Recuperar o hábito salvo com nome da categoria para o frontend
         from app.utils.database import execute_query
-        query = "SELECT h.*, ch.nome AS categoria_nome FROM habitos h JOIN categorias_habitos ch ON h.categoria_id = ch.id WHERE h.id = %s"
+        query = "SELECT ch.nome AS categoria_nome FROM habitos h JOIN categorias_habitos ch ON h.categoria_id = ch.id WHERE h.id = %s"
         saved_habit_data = execute_query(query, (new_habit.id,), fetch=True)
         
         if saved_habit_data:
@@ -68,7 +81,11 @@ def get_user_habits():
     """HU06 - Listar todos os hábitos do usuário autenticado."""
     current_user_id = get_jwt_identity()
     try:
-        habits = Habit.get_all_by_user(current_user_id)
+        fields = parse_fields(request.args.get('fields'), Habit.LIST_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        habits = Habit.get_all_by_user(current_user_id, fields)
         return jsonify(habits), 200
     except Exception as e:
         return jsonify({'error': f'Erro ao listar hábitos: {str(e)}'}), 500
@@ -104,7 +121,7 @@ def update_habit(habit_id):
         habit.save()
         # Recuperar o hábito salvo com nome da categoria para o frontend
         from app.utils.database import execute_query
-        query = "SELECT h.*, ch.nome AS categoria_nome FROM habitos h JOIN categorias_habitos ch ON h.categoria_id = ch.id WHERE h.id = %s"
+        query = "SELECT ch.nome AS categoria_nome FROM habitos h JOIN categorias_habitos ch ON h.categoria_id = ch.id WHERE h.id = %s"
         updated_habit_data = execute_query(query, (habit.id,), fetch=True)
         
         if updated_habit_data:
@@ -141,6 +158,7 @@ def delete_habit(habit_id):
 # Rotas para Registros de Hábitos (HU06, HU11, HU12)
 @habit_bp.route('/<int:habit_id>/records', methods=['POST'])
 @jwt_required()
+@idempotent
 def add_habit_record(habit_id):
     """HU06 - Adicionar um registro para um hábito específico."""
     current_user_id = get_jwt_identity()
@@ -181,6 +199,48 @@ def add_habit_record(habit_id):
         return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
 
 
+@habit_bp.route('/<int:habit_id>/records/<date_str>', methods=['PUT'])
+@jwt_required()
+@idempotent
+def put_habit_record(habit_id, date_str):
+    """Grava (cria ou atualiza) o registro de um hábito em uma data, em um único comando."""
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+
+    try:
+        record_date = date.fromisoformat(date_str)
+    except ValueError:
+        return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD.'}), 400
+
+    valor = _parse_valor(data.get('valor', 0.0))
+    if valor is None:
+        return jsonify({'error': 'Valor deve ser numérico.'}), 400
+
+    # Observações só são alteradas quando enviadas
+    notes = {'observacoes': data['observacoes']} if 'observacoes' in data else {}
+    try:
+        record, created = HabitRecord.upsert(habit_id, current_user_id, record_date,
+                                             valor, bool(data.get('concluido', False)), **notes)
+        if not record:
+            return jsonify({'error': 'Hábito não encontrado ou não pertence ao usuário.'}), 404
+        return jsonify({
+            'message': 'Registro de hábito salvo com sucesso!',
+            'record': record.to_dict()
+        }), 201 if created else 200
+    except Exception as e:
+        print(f"Erro ao salvar registro de hábito: {e}")
+        return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
+
+@habit_bp.route('/records/<int:record_id>', methods=['GET'])
+@jwt_required()
+def get_habit_record(record_id):
+    """Detalhe de um registro de hábito, incluindo as observações."""
+    current_user_id = get_jwt_identity()
+    record = HabitRecord.get_by_id(record_id, current_user_id)
+    if not record:
+        return jsonify({'error': 'Registro de hábito não encontrado ou não pertence ao usuário.'}), 404
+    return jsonify(record.to_dict()), 200
+
 @habit_bp.route('/records/<int:record_id>', methods=['PUT'])
 @jwt_required()
 def update_habit_record(record_id):
@@ -237,13 +297,18 @@ def get_records_by_date_range():
 
     if not start_date_str or not end_date_str:
         return jsonify({'error': 'Parâmetros start_date e end_date são obrigatórios.'}), 400
+
+    try:
+        fields = parse_fields(request.args.get('fields'), HabitRecord.LIST_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     try:
         # Valida as datas
         start_date = date.fromisoformat(start_date_str)
         end_date = date.fromisoformat(end_date_str)
         
-        records = HabitRecord.get_all_by_user_and_date_range(current_user_id, start_date, end_date)
+        records = HabitRecord.get_all_by_user_and_date_range(current_user_id, start_date, end_date, fields)
         return jsonify(records), 200
     except ValueError:
         return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD.'}), 400
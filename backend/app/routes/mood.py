@@ -1,12 +1,15 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.mood import MoodAssessment
+from app.utils.fields import parse_fields
+from app.utils.idempotency import idempotent
 from datetime import date
 
 mood_bp = Blueprint('mood', __name__)
 
 @mood_bp.route('/', methods=['POST'])
 @jwt_required()
+@idempotent
 def add_mood_assessment():
     """HU07 - Avaliar o humor diário."""
     current_user_id = get_jwt_identity()
@@ -47,6 +50,46 @@ def add_mood_assessment():
         print(f"Erro ao adicionar avaliação de humor: {e}")
         return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
 
+@mood_bp.route('/<date_str>', methods=['PUT'])
+@jwt_required()
+@idempotent
+def put_mood_assessment(date_str):
+    """Grava (cria ou atualiza) a avaliação de humor de uma data, em um único comando."""
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+
+    try:
+        assessment_date = date.fromisoformat(date_str)
+    except ValueError:
+        return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD.'}), 400
+
+    nota_humor = data.get('nota_humor')
+    # bool é subclasse de int: true/false não são notas
+    if not isinstance(nota_humor, int) or isinstance(nota_humor, bool) or not (1 <= nota_humor <= 5):
+        return jsonify({'error': 'Nota de humor deve ser entre 1 e 5.'}), 400
+
+    # Observações só são alteradas quando enviadas
+    notes = {'observacoes': data['observacoes']} if 'observacoes' in data else {}
+    try:
+        assessment, created = MoodAssessment.upsert(current_user_id, assessment_date, nota_humor, **notes)
+        return jsonify({
+            'message': 'Avaliação de humor salva com sucesso!',
+            'assessment': assessment.to_dict()
+        }), 201 if created else 200
+    except Exception as e:
+        print(f"Erro ao salvar avaliação de humor: {e}")
+        return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
+
+@mood_bp.route('/<int:assessment_id>', methods=['GET'])
+@jwt_required()
+def get_mood_assessment(assessment_id):
+    """Detalhe de uma avaliação de humor, incluindo as observações."""
+    current_user_id = get_jwt_identity()
+    assessment = MoodAssessment.get_by_id(assessment_id, current_user_id)
+    if not assessment:
+        return jsonify({'error': 'Avaliação de humor não encontrada ou não pertence ao usuário.'}), 404
+    return jsonify(assessment.to_dict()), 200
+
 @mood_bp.route('/<int:assessment_id>', methods=['PUT'])
 @jwt_required()
 def update_mood_assessment(assessment_id):
@@ -104,12 +147,17 @@ def get_mood_by_date_range():
 
     if not start_date_str or not end_date_str:
         return jsonify({'error': 'Parâmetros start_date e end_date são obrigatórios.'}), 400
+
+    try:
+        fields = parse_fields(request.args.get('fields'), MoodAssessment.LIST_FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
     try:
         start_date = date.fromisoformat(start_date_str)
         end_date = date.fromisoformat(end_date_str)
         
-        mood_assessments = MoodAssessment.get_all_by_user_and_date_range(current_user_id, start_date, end_date)
+        mood_assessments = MoodAssessment.get_all_by_user_and_date_range(current_user_id, start_date, end_date, fields)
         return jsonify(mood_assessments), 200
     except ValueError:
         return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD.'}), 400
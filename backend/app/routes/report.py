@@ -1,11 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context, send_file, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.report_service import ReportService
+from app.services.export_service import ExportService, EXPORT_FORMATS
+from app.services.job_service import ReportJobService, JOB_TYPES
+from app.services.snapshot_service import SnapshotService, SNAPSHOT_DASHBOARD, SNAPSHOT_WEEKLY_SUMMARY, SNAPSHOT_GOAL_PROGRESS
+from app.utils.decorators import admin_required
+from app.utils.compression import cache_compressed
+from app.models.user import User
 from datetime import date, timedelta
 
 report_bp = Blueprint('report', __name__)
 
 @report_bp.route('/dashboard_summary', methods=['GET'])
+@cache_compressed
 @jwt_required()
 def get_dashboard_summary():
     """HU08 - Resumo semanal de hábitos e humor para o dashboard."""
@@ -22,6 +29,10 @@ def get_dashboard_summary():
         start_date = date.fromisoformat(start_date_str)
         end_date = date.fromisoformat(end_date_str)
         
+        # Período padrão (omitido ou enviado explicitamente pelo dashboard): snapshot pré-calculado
+        if (start_date, end_date) == (one_week_ago, today):
+            return jsonify(SnapshotService.get_or_build(current_user_id, SNAPSHOT_DASHBOARD, today)), 200
+        
         summary = ReportService.get_dashboard_summary(current_user_id, start_date, end_date)
         return jsonify(summary), 200
     except ValueError:
@@ -30,6 +41,30 @@ def get_dashboard_summary():
         print(f"Erro ao gerar resumo do dashboard: {e}")
         return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
 
+@report_bp.route('/weekly_summary', methods=['GET'])
+@cache_compressed
+@jwt_required()
+def get_weekly_summary():
+    """HU08 - Resumo numérico dos últimos 7 dias (média de humor, taxa de conclusão)."""
+    current_user_id = get_jwt_identity()
+    try:
+        return jsonify(SnapshotService.get_or_build(current_user_id, SNAPSHOT_WEEKLY_SUMMARY)), 200
+    except Exception as e:
+        print(f"Erro ao gerar resumo semanal: {e}")
+        return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
+
+@report_bp.route('/goal_progress', methods=['GET'])
+@cache_compressed
+@jwt_required()
+def get_goal_progress():
+    """HU09 - Progresso das metas ativas no período corrente."""
+    current_user_id = get_jwt_identity()
+    try:
+        return jsonify(SnapshotService.get_or_build(current_user_id, SNAPSHOT_GOAL_PROGRESS)), 200
+    except Exception as e:
+        print(f"Erro ao calcular progresso das metas: {e}")
+        return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
+
 @report_bp.route('/correlation_report', methods=['GET'])
 @jwt_required()
 def get_correlation_report():
@@ -79,4 +114,123 @@ def get_daily_data():
         return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD.'}), 400
     except Exception as e:
         print(f"Erro ao buscar dados diários consolidados: {e}")
-        return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
+
+def _export_response(user_id):
+    """Monta a resposta em streaming da exportação do histórico de um usuário."""
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': 'Formato inválido. Use "csv" ou "ndjson".'}), 400
+    compress = request.args.get('gzip', 'false').lower() == 'true'
+
+    try:
+        start_date_str = request.args.get('start_date')
+        end_date_str = request.args.get('end_date')
+        start_date = date.fromisoformat(start_date_str) if start_date_str else None
+        end_date = date.fromisoformat(end_date_str) if end_date_str else None
+    except ValueError:
+        return jsonify({'error': 'Formato de data inválido. Use YYYY-MM-DD.'}), 400
+
+    filename = f"mindtrack_usuario_{user_id}_{date.today().isoformat()}.{export_format}"
+    # Comprimido: o arquivo baixado é o .gz em si (sem Content-Encoding, que faria o
+    # navegador descomprimir e salvar o CSV/NDJSON com o nome .gz)
+    mimetype = 'application/gzip' if compress else EXPORT_FORMATS[export_format]
+    headers = {'Content-Disposition': f'attachment; filename="{filename}{".gz" if compress else ""}"'}
+
+    chunks = ExportService.generate_export(user_id, export_format, compress, start_date, end_date)
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+@report_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_history():
+    """Exportar todo o histórico do usuário (hábitos, registros, humor e metas) em CSV ou NDJSON."""
+    current_user_id = get_jwt_identity()
+    return _export_response(current_user_id)
+
+@report_bp.route('/admin/export/<int:user_id>', methods=['GET'])
+@jwt_required()
+@admin_required # Requer que o usuário logado seja admin
+def export_user_history_admin(user_id):
+    """HU05 - Exportar o histórico de um usuário em nome dele (apenas para administradores)."""
+    if not User.get_by_id(user_id):
+        return jsonify({'error': 'Usuário não encontrado.'}), 404
+    return _export_response(user_id)
+
+# Jobs assíncronos para relatórios pesados (correlações de vários anos, exportações completas)
+@report_bp.route('/jobs', methods=['POST'])
+@jwt_required()
+def create_report_job():
+    """Agenda a geração de um relatório em segundo plano e retorna 202 com o ID do job."""
+    current_user_id = get_jwt_identity()
+    data = request.get_json() or {}
+
+    job_type = data.get('tipo')
+    if job_type not in JOB_TYPES:
+        return jsonify({'error': f'Tipo de job inválido. Use um de: {", ".join(JOB_TYPES)}.'}), 400
+
+    try:
+        params = {}
+        for field in ('start_date', 'end_date'):
+            if data.get(field):
+                params[field] = date.fromisoformat(data[field]).isoformat()
+        if job_type in ('dashboard', 'correlation', 'daily_data') and not all(k in params for k in ('start_date', 'end_date')):
+            return jsonify({'error': 'Parâmetros start_date e end_date são obrigatórios.'}), 400
+        if job_type == 'correlation':
+            habit_ids = data.get('habit_ids')
+            if not habit_ids:
+                return jsonify({'error': 'Parâmetro habit_ids é obrigatório.'}), 400
+            params['habit_ids'] = [int(hid) for hid in habit_ids]
+        if job_type == 'export':
+            params['format'] = data.get('format', 'ndjson')
+            if params['format'] not in EXPORT_FORMATS:
+                return jsonify({'error': 'Formato inválido. Use "csv" ou "ndjson".'}), 400
+            params['gzip'] = bool(data.get('gzip', False))
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Formato de data ou IDs de hábitos inválidos.'}), 400
+
+    try:
+        job = ReportJobService.submit(current_user_id, job_type, params)
+        status_url = url_for('report.get_report_job', job_id=job['id'])
+        response = jsonify({
+            'message': 'Relatório agendado.',
+            'job_id': job['id'],
+            'status': job['status'],
+            'status_url': status_url
+        })
+        response.headers['Location'] = status_url
+        return response, 202
+    except Exception as e:
+        print(f"Erro ao agendar job de relatório: {e}")
+        return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
+
+@report_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_report_job(job_id):
+    """Consultar o status de um job de relatório."""
+    current_user_id = get_jwt_identity()
+    job = ReportJobService.get(job_id, current_user_id)
+    if not job:
+        return jsonify({'error': 'Job não encontrado ou expirado.'}), 404
+
+    response = {key: job.get(key) for key in ('id', 'tipo', 'status', 'criado_em', 'concluido_em', 'expira_em', 'erro')}
+    if job['status'] == 'concluido':
+        response['result_url'] = url_for('report.get_report_job_result', job_id=job_id)
+    return jsonify(response), 200
+
+@report_bp.route('/jobs/<job_id>/result', methods=['GET'])
+@jwt_required()
+def get_report_job_result(job_id):
+    """Baixar o resultado de um job de relatório concluído."""
+    current_user_id = get_jwt_identity()
+    job = ReportJobService.get(job_id, current_user_id)
+    if not job:
+        return jsonify({'error': 'Job não encontrado ou expirado.'}), 404
+    if job['status'] == 'erro':
+        return jsonify({'error': f'Falha ao gerar relatório: {job.get("erro")}'}), 500
+    if job['status'] != 'concluido':
+        response = jsonify({'status': job['status'], 'message': 'Relatório ainda em processamento.'})
+        response.headers['Retry-After'] = '5'
+        return response, 202
+
+    return send_file(ReportJobService.get_result_path(job), mimetype=job['content_type'],
+                     as_attachment=job['tipo'] == 'export', download_name=job['arquivo'])
\ No newline at end of file
@@ -0,0 +1,22 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.sync_service import SyncService
+
+sync_bp = Blueprint('sync', __name__)
+
+@sync_bp.route('', methods=['GET'])
+@jwt_required()
+def get_changes():
+    """
+    Sincronização incremental: hábitos, registros, avaliações de humor e metas
+    alterados desde ?since=<cursor>, mais as exclusões. A resposta traz o
+    próximo cursor a ser enviado.
+    """
+    current_user_id = get_jwt_identity()
+    try:
+        return jsonify(SyncService.get_changes(current_user_id, request.args.get('since'))), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Erro ao sincronizar: {e}")
+        return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
@@ -0,0 +1,16 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.today_service import TodayService
+
+today_bp = Blueprint('today', __name__)
+
+@today_bp.route('', methods=['GET'])
+@jwt_required()
+def get_today():
+    """Tela inicial: hábitos ativos com registro do dia, humor do dia e progresso das metas."""
+    current_user_id = get_jwt_identity()
+    try:
+        return jsonify(TodayService.get_today(current_user_id)), 200
+    except Exception as e:
+        print(f"Erro ao montar a tela de hoje: {e}")
+        return jsonify({'error': f'Erro interno do servidor: {str(e)}'}), 500
@@ -2,7 +2,7 @@ from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.user import User
 from app.utils.decorators import admin_required, permission_required
-from app.utils.uploads import allowed_file, save_profile_picture
+from app.utils.uploads import allowed_file, save_profile_picture, release_profile_picture
 import os
 
 user_bp = Blueprint('user', __name__)
@@ -47,13 +47,18 @@ def update_user_profile():
             user.email = new_email
 
     # Lidar com upload de foto de perfil
+    previous_picture = user.foto_perfil
+    new_key = None # Chave com uma referência nova, a liberar se o perfil não for salvo
     if 'foto_perfil' in request.files:
         file = request.files['foto_perfil']
         if file and allowed_file(file.filename):
             try:
                 # Salva a nova foto e atualiza o caminho no perfil do usuário
-                filename = save_profile_picture(file, user.id)
-                user.foto_perfil = filename
+                new_key = save_profile_picture(file, user.id)
+                user.foto_perfil = new_key
+                user.foto_variantes_prontas = False # Variantes geradas em segundo plano; até lá, o original
+            except ValueError as e: # Imagem inválida, corrompida ou grande demais
+                return jsonify({'error': str(e)}), 400
             except Exception as e:
                 return jsonify({'error': f'Erro ao salvar foto de perfil: {str(e)}'}), 500
         else:
@@ -61,11 +66,17 @@ def update_user_profile():
     
     try:
         user.save() # Salva as alterações no banco de dados
+        if new_key:
+            # Libera a referência da foto anterior (mesmo se for a mesma imagem enviada de novo,
+            # que acabou de ganhar outra); sem referências, é apagada pela coleta
+            release_profile_picture(previous_picture)
         return jsonify({
             'message': 'Perfil atualizado com sucesso!',
             'user': user.to_dict()
         }), 200
     except Exception as e:
+        if new_key:
+            release_profile_picture(new_key)
         print(f"Erro ao atualizar perfil: {e}")
         return jsonify({'error': f'Erro interno do servidor ao salvar perfil: {str(e)}'}), 500
 
@@ -77,7 +88,11 @@ def get_all_users_admin():
     # Esta função está no service, mas podemos fazer a query direta aqui se preferir simplicidade
     # Ou criar um User.get_all() no modelo
     from app.utils.database import execute_query
-    users_data = execute_query("SELECT id, nome, email, tipo_usuario, ativo, foto_perfil FROM usuarios", fetch=True)
+    users_data = execute_query(
+        """SELECT u.id, u.nome, u.email, u.tipo_usuario, u.ativo, u.foto_perfil, a.variantes_prontas AS foto_variantes_prontas
+           FROM usuarios u LEFT JOIN arquivos a ON a.chave = u.foto_perfil""",
+        fetch=True
+    )
     users = [User.from_dict(u).to_dict() for u in users_data] if users_data else []
     return jsonify(users), 200
 
@@ -1,8 +1,105 @@
 # mindtrack/backend/app/services/auth_service.py
 
-# Este serviço pode conter lógica de negócios complexa relacionada à autenticação
-# que não esteja diretamente ligada às rotas HTTP.
-# Exemplo: Gerenciamento de token de refresh, auditoria de login, etc.
+from app.config import Config
+from app.utils.database import execute_query
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+import logging
+import multiprocessing
+import threading
 
-# No momento, a maior parte da lógica de autenticação está diretamente em app.routes.auth
-# para simplicidade em uma API REST.
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = None # Limita tarefas em execução + na fila do pool
+
+
+class PasswordHasherBusy(Exception):
+    """O pool de hashing está cheio (ou demorou demais): a rota responde 503 na hora."""
+
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+def _checkpw(password, hashed):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def _get_executor():
+    """Cria (uma única vez por processo) o pool dedicado ao bcrypt."""
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is None:
+            if Config.PASSWORD_HASH_EXECUTOR == 'process':
+                # 'spawn' evita herdar threads e conexões abertas do worker web via fork
+                _executor = ProcessPoolExecutor(
+                    max_workers=Config.PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                # O bcrypt libera o GIL durante o hash: threads já usam vários núcleos
+                _executor = ThreadPoolExecutor(max_workers=Config.PASSWORD_HASH_WORKERS,
+                                               thread_name_prefix='password-hash')
+            _slots = threading.BoundedSemaphore(Config.PASSWORD_HASH_WORKERS + Config.PASSWORD_HASH_QUEUE_LIMIT)
+        return _executor
+
+
+class PasswordService:
+    """
+    Hash e verificação de senhas (bcrypt) fora da thread da requisição, em um
+    pool limitado: uma rajada de logins ocupa no máximo PASSWORD_HASH_WORKERS
+    núcleos, e acima de PASSWORD_HASH_QUEUE_LIMIT tarefas na fila as novas
+    requisições recebem 503 imediatamente, sem derrubar as rotas baratas.
+    """
+
+    @staticmethod
+    def _submit(fn, *args, wait=True):
+        executor = _get_executor()
+        if not _slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            _slots.release()
+            raise
+        future.add_done_callback(lambda _: _slots.release())
+        if not wait:
+            return future
+        try:
+            return future.result(timeout=Config.PASSWORD_HASH_TIMEOUT)
+        except FutureTimeoutError:
+            raise PasswordHasherBusy()
+
+    @staticmethod
+    def hash_password(password):
+        return PasswordService._submit(_hashpw, password, Config.BCRYPT_ROUNDS)
+
+    @staticmethod
+    def check_password(password, hashed):
+        return PasswordService._submit(_checkpw, password, hashed)
+
+    @staticmethod
+    def needs_rehash(hashed):
+        """True se o hash foi gerado com um custo diferente de BCRYPT_ROUNDS (formato $2b$<custo>$...)."""
+        try:
+            return int(hashed.split('$')[2]) != Config.BCRYPT_ROUNDS
+        except (IndexError, ValueError):
+            return False
+
+    @staticmethod
+    def rehash_in_background(user_id, password):
+        """
+        Regrava a senha com o custo configurado após um login bem-sucedido, sem
+        atrasar a resposta. Se o pool estiver cheio, tenta de novo no próximo login.
+        """
+        def save(future):
+            try:
+                execute_query("UPDATE usuarios SET senha = %s WHERE id = %s", (future.result(), user_id))
+            except Exception as e:
+                logger.error(f"Erro ao atualizar o hash da senha do usuário {user_id}: {e}")
+
+        try:
+            PasswordService._submit(_hashpw, password, Config.BCRYPT_ROUNDS, wait=False).add_done_callback(save)
+        except PasswordHasherBusy:
+            pass
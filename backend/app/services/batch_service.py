@@ -0,0 +1,103 @@
+from app.utils.database import shared_connection
+from concurrent.futures import ThreadPoolExecutor
+from flask import request
+from werkzeug.test import EnvironBuilder
+import threading
+
+BATCH_METHODS = ('GET', 'POST', 'PUT', 'DELETE')
+
+# Cabeçalhos repassados da requisição do lote para cada sub-requisição. Cada uma
+# valida o token de novo pelos decoradores da rota (assinatura HMAC e revogação
+# em memória, sem ida ao banco), para que as regras de acesso sejam as mesmas
+FORWARDED_HEADERS = ('Authorization', 'Cookie', 'X-CSRF-TOKEN', 'User-Agent', 'X-Forwarded-For')
+
+# Rotas que respondem em stream (SSE, exportações, downloads de arquivos): não cabem
+# no corpo de uma resposta de lote e prenderiam o worker até o fim do stream
+STREAMING_ENDPOINTS = frozenset({
+    'events.stream_events',
+    'report.export_history',
+    'report.export_user_history_admin',
+    'report.get_report_job_result',
+})
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor(max_workers):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='mindtrack-batch')
+        return _executor
+
+
+class BatchService:
+    """
+    Executa várias requisições da API em uma só chamada HTTP: cada sub-requisição
+    passa pelas rotas existentes (mesmas validações, autenticação e respostas),
+    reaproveitando uma única conexão com o banco. Apenas rotas com resposta JSON
+    comum são aceitas; rotas em stream recebem 400 no item correspondente.
+    """
+
+    @staticmethod
+    def validate(items, max_requests):
+        """Valida a lista de sub-requisições. Lança ValueError com a mensagem de erro."""
+        if not isinstance(items, list) or not items:
+            raise ValueError('Campo requests deve ser uma lista não vazia.')
+        if len(items) > max_requests:
+            raise ValueError(f'Máximo de {max_requests} requisições por lote.')
+        for item in items:
+            if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+                raise ValueError('Cada requisição deve ter o campo path.')
+            if item.get('method', 'GET').upper() not in BATCH_METHODS:
+                raise ValueError(f"Método não suportado: {item.get('method')}.")
+            if not item['path'].startswith('/api/') or item['path'].startswith('/api/batch'):
+                raise ValueError(f"Caminho inválido: {item['path']}.")
+
+    @staticmethod
+    def dispatch(app, item, headers):
+        """Executa uma sub-requisição dentro de um contexto de requisição próprio."""
+        builder = EnvironBuilder(
+            path=item['path'],
+            method=item.get('method', 'GET').upper(),
+            query_string=item.get('query'),
+            json=item.get('body'),
+            headers=headers,
+        )
+        try:
+            with app.request_context(builder.get_environ()):
+                if request.url_rule is not None and request.url_rule.endpoint in STREAMING_ENDPOINTS:
+                    return BatchService._streaming_error(item)
+                response = app.full_dispatch_request()
+                if response.is_streamed or response.direct_passthrough:
+                    response.close() # Encerra o gerador sem consumi-lo
+                    return BatchService._streaming_error(item)
+        finally:
+            builder.close()
+        body = response.get_json(silent=True) if response.is_json else response.get_data(as_text=True)
+        return {'id': item.get('id'), 'status': response.status_code, 'body': body}
+
+    @staticmethod
+    def _streaming_error(item):
+        return {'id': item.get('id'), 'status': 400,
+                'body': {'error': f"Rota com resposta em stream não permitida em lote: {item['path']}."}}
+
+    @staticmethod
+    def _dispatch_with_connection(app, item, headers):
+        with shared_connection():
+            return BatchService.dispatch(app, item, headers)
+
+    @staticmethod
+    def execute(app, items, headers, parallel=False, max_workers=4):
+        """
+        Executa as sub-requisições. Em ordem, na thread atual, com a conexão do lote;
+        se `parallel` for pedido e todas forem leituras (GET), elas são distribuídas
+        em um pool de threads, cada uma com sua conexão.
+        """
+        if parallel and all(item.get('method', 'GET').upper() == 'GET' for item in items):
+            executor = _get_executor(max_workers)
+            futures = [executor.submit(BatchService._dispatch_with_connection, app, item, headers) for item in items]
+            return [f.result() for f in futures]
+
+        with shared_connection():
+            return [BatchService.dispatch(app, item, headers) for item in items]
@@ -0,0 +1,206 @@
+from app.config import Config
+from app.utils.database import execute_query, shared_connection
+from app.services.email_outbox import outbox
+from app.services.report_service import ReportService
+from flask import current_app
+from datetime import date, timedelta
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SUBJECT = "Seu resumo semanal - Sistema de Hábitos e Humor"
+
+# Compilado uma vez por execução do job (Jinja com autoescape)
+DIGEST_TEMPLATE = """
+<html>
+<head></head>
+<body>
+    <p>Olá, {{ nome }},</p>
+    <p>Este é o seu resumo da semana de {{ inicio }} a {{ fim }}:</p>
+    <ul>
+        {% if media_humor is not none %}
+        <li>Humor médio: {{ media_humor }}{% if tendencia %} ({{ tendencia }} em relação à semana anterior){% endif %}</li>
+        {% endif %}
+        <li>Hábitos concluídos: {{ concluidos }} de {{ total }} registros ({{ taxa_conclusao }}%)</li>
+    </ul>
+    {% if metas %}
+    <p>Suas metas:</p>
+    <ul>
+        {% for meta in metas %}
+        <li>{{ meta.titulo }}: {% if meta.percentual is not none %}{{ meta.percentual }}%{% else %}sem medição{% endif %}</li>
+        {% endfor %}
+    </ul>
+    {% endif %}
+    <p>Atenciosamente,</p>
+    <p>Equipe do Sistema de Hábitos e Humor</p>
+</body>
+</html>
+"""
+
+
+def _in_list(values):
+    return ', '.join(['%s'] * len(values))
+
+class DigestService:
+    """
+    Resumo semanal por email para todos os usuários ativos, em um job em lotes:
+    os usuários são lidos em páginas (paginação por chave) e, para cada página,
+    humor, taxa de conclusão e progresso de metas vêm de poucas consultas
+    agregadas (GROUP BY usuario_id / meta) sobre todos os usuários da página,
+    em vez de um relatório por usuário. As mensagens da página vão para a
+    caixa de saída em um único INSERT e são enviadas pelo pool de envio.
+    """
+
+    @staticmethod
+    def iter_user_pages(page_size):
+        last_id = 0
+        while True:
+            rows = execute_query(
+                """SELECT id, nome, email FROM usuarios
+                   WHERE id > %s AND ativo = TRUE ORDER BY id LIMIT %s""",
+                (last_id, page_size), fetch=True
+            )
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1]['id']
+
+    @staticmethod
+    def _mood_by_user(user_ids, start_date, reference_date):
+        previous_start = start_date - timedelta(days=7)
+        rows = execute_query(
+            f"""SELECT usuario_id,
+                       AVG(CASE WHEN data_avaliacao >= %s THEN nota_humor END) AS media_atual,
+                       AVG(CASE WHEN data_avaliacao < %s THEN nota_humor END) AS media_anterior
+                FROM avaliacoes_humor
+                WHERE usuario_id IN ({_in_list(user_ids)}) AND data_avaliacao BETWEEN %s AND %s
+                GROUP BY usuario_id""",
+            (start_date, start_date, *user_ids, previous_start, reference_date), fetch=True
+        ) or []
+        return {row['usuario_id']: row for row in rows}
+
+    @staticmethod
+    def _completion_by_user(user_ids, start_date, reference_date):
+        rows = execute_query(
+            f"""SELECT usuario_id, COUNT(*) AS total, SUM(concluido) AS concluidos
+                FROM registros_habitos
+                WHERE usuario_id IN ({_in_list(user_ids)}) AND data_registro BETWEEN %s AND %s
+                GROUP BY usuario_id""",
+            (*user_ids, start_date, reference_date), fetch=True
+        ) or []
+        return {row['usuario_id']: row for row in rows}
+
+    @staticmethod
+    def _goals_by_user(user_ids, reference_date):
+        """Progresso das metas ativas de todos os usuários da página, em três consultas."""
+        period_start, period_params = ReportService.goal_period_start_sql(reference_date)
+        active = f"""m.usuario_id IN ({_in_list(user_ids)}) AND m.ativa = TRUE AND m.data_inicio <= %s
+                     AND (m.data_fim IS NULL OR m.data_fim >= %s)"""
+        active_params = (*user_ids, reference_date, reference_date)
+
+        goals = execute_query(
+            f"""SELECT m.id, m.usuario_id, m.titulo, m.tipo_meta, m.valor_meta, h.tipo_medicao
+                FROM metas m LEFT JOIN habitos h ON m.habito_id = h.id
+                WHERE {active} ORDER BY m.usuario_id, m.data_inicio DESC""",
+            active_params, fetch=True
+        ) or []
+        if not goals:
+            return {}
+
+        habit_values = execute_query(
+            f"""SELECT m.id, SUM(rh.valor) AS soma, SUM(rh.concluido) AS concluidos
+                FROM metas m
+                JOIN registros_habitos rh ON rh.habito_id = m.habito_id AND rh.usuario_id = m.usuario_id
+                     AND rh.data_registro BETWEEN {period_start} AND %s
+                WHERE {active} AND m.tipo_meta = 'habito'
+                GROUP BY m.id""",
+            (*period_params, reference_date, *active_params), fetch=True
+        ) or []
+        mood_values = execute_query(
+            f"""SELECT m.id, AVG(ah.nota_humor) AS media
+                FROM metas m
+                JOIN avaliacoes_humor ah ON ah.usuario_id = m.usuario_id
+                     AND ah.data_avaliacao BETWEEN {period_start} AND %s
+                WHERE {active} AND m.tipo_meta = 'humor'
+                GROUP BY m.id""",
+            (*period_params, reference_date, *active_params), fetch=True
+        ) or []
+        habit_values = {row['id']: row for row in habit_values}
+        mood_values = {row['id']: row['media'] for row in mood_values}
+
+        by_user = {}
+        for goal in goals:
+            current_value = None
+            if goal['tipo_meta'] == 'habito':
+                row = habit_values.get(goal['id'], {})
+                column = 'soma' if goal['tipo_medicao'] == 'quantitativo' else 'concluidos'
+                current_value = float(row.get(column) or 0)
+            elif goal['tipo_meta'] == 'humor' and mood_values.get(goal['id']) is not None:
+                current_value = round(float(mood_values[goal['id']]), 2)
+            target = float(goal['valor_meta'])
+            by_user.setdefault(goal['usuario_id'], []).append({
+                'titulo': goal['titulo'],
+                'percentual': round(min(current_value / target * 100, 100), 2) if current_value is not None and target else None
+            })
+        return by_user
+
+    @staticmethod
+    def build_page(users, start_date, reference_date):
+        """Calcula os resumos de uma página de usuários. Usuários sem nenhuma atividade ou meta são omitidos."""
+        user_ids = [user['id'] for user in users]
+        with shared_connection():
+            moods = DigestService._mood_by_user(user_ids, start_date, reference_date)
+            completion = DigestService._completion_by_user(user_ids, start_date, reference_date)
+            goals = DigestService._goals_by_user(user_ids, reference_date)
+
+        digests = []
+        for user in users:
+            mood = moods.get(user['id'])
+            habits = completion.get(user['id'])
+            user_goals = goals.get(user['id'], [])
+            if not (mood or habits or user_goals):
+                continue
+            current = mood and mood['media_atual']
+            previous = mood and mood['media_anterior']
+            trend = None
+            if current is not None and previous is not None:
+                trend = 'em alta' if current > previous else 'em baixa' if current < previous else 'estável'
+            total = habits['total'] if habits else 0
+            completed = int(habits['concluidos'] or 0) if habits else 0
+            digests.append((user, {
+                'nome': user['nome'],
+                'inicio': start_date.strftime('%d/%m'),
+                'fim': reference_date.strftime('%d/%m'),
+                'media_humor': round(float(current), 2) if current is not None else None,
+                'tendencia': trend,
+                'total': total,
+                'concluidos': completed,
+                'taxa_conclusao': round(completed / total * 100, 2) if total else 0,
+                'metas': user_goals,
+            }))
+        return digests
+
+    @staticmethod
+    def send_weekly_digests(reference_date=None):
+        """
+        Job semanal: gera e enfileira o resumo dos 7 dias até reference_date
+        (por padrão, ontem) para todos os usuários ativos, página a página,
+        com uma pausa entre páginas. Retorna quantos emails foram enfileirados.
+        """
+        reference_date = reference_date or date.today() - timedelta(days=1)
+        start_date = reference_date - timedelta(days=6)
+        template = current_app.jinja_env.from_string(DIGEST_TEMPLATE)
+        queued = 0
+
+        for users in DigestService.iter_user_pages(Config.DIGEST_PAGE_SIZE):
+            try:
+                digests = DigestService.build_page(users, start_date, reference_date)
+                outbox.enqueue_many([
+                    (user['email'], DIGEST_SUBJECT, template.render(**context)) for user, context in digests
+                ])
+                queued += len(digests)
+            except Exception as e:
+                logger.error(f"Erro ao gerar resumos semanais (usuários {users[0]['id']}-{users[-1]['id']}): {e}")
+            time.sleep(Config.DIGEST_PAGE_PAUSE)
+        return {'resumos_enfileirados': queued}
@@ -0,0 +1,185 @@
+from app.utils.database import execute_query, execute_many
+from flask_mail import Message
+import logging
+import smtplib
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutbox:
+    """
+    Caixa de saída de emails: as rotas apenas gravam a mensagem na tabela
+    'emails_pendentes' e respondem. Um pool de threads de envio reivindica lotes
+    de mensagens (com um prazo de reserva, para que outro worker as retome se
+    este processo cair) e os envia por conexões SMTP persistentes - uma por
+    thread, reaproveitada entre lotes enquanto não ficar ociosa demais.
+    Falhas são reagendadas com backoff exponencial até EMAIL_MAX_ATTEMPTS; uma
+    reserva vencida (envio travado ou worker que caiu) também conta como tentativa.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._mail = None
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app, mail):
+        self._app = app
+        self._mail = mail
+        if app.config['EMAIL_OUTBOX_ENABLED']:
+            self._ensure_started()
+
+    @property
+    def _config(self):
+        return self._app.config
+
+    def _ensure_started(self):
+        # Também recria as threads depois do fork dos workers do gunicorn
+        if self._threads and all(thread.is_alive() for thread in self._threads):
+            return
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for i in range(len(self._threads), self._config['EMAIL_SENDER_WORKERS']):
+                thread = threading.Thread(target=self._run, name=f'mindtrack-email-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def enqueue(self, recipient, subject, html):
+        """Grava a mensagem na caixa de saída e acorda os remetentes. Retorna o id."""
+        email_id = execute_query(
+            """INSERT INTO emails_pendentes (destinatario, assunto, corpo_html, proxima_tentativa)
+               VALUES (%s, %s, %s, NOW())""",
+            (recipient, subject, html)
+        )
+        self._ensure_started()
+        self._wakeup.set()
+        return email_id
+
+    def enqueue_many(self, messages):
+        """Grava várias mensagens (destinatário, assunto, html) em um único INSERT e acorda os remetentes."""
+        if not messages:
+            return
+        execute_many(
+            """INSERT INTO emails_pendentes (destinatario, assunto, corpo_html)
+               VALUES (%s, %s, %s)""",
+            messages
+        )
+        self._ensure_started()
+        self._wakeup.set()
+
+    def _claim_batch(self):
+        """
+        Reserva até EMAIL_BATCH_SIZE mensagens devidas (pendentes ou com reserva
+        vencida). Retomar uma reserva vencida conta uma tentativa; as que já
+        esgotaram EMAIL_MAX_ATTEMPTS são marcadas como 'falhou' em vez de retomadas.
+        """
+        config = self._config
+        execute_query(
+            """UPDATE emails_pendentes
+               SET status = 'falhou', lote = NULL, tentativas = tentativas + 1,
+                   ultimo_erro = 'Reserva vencida sem confirmação do envio.'
+               WHERE status = 'enviando' AND proxima_tentativa <= NOW() AND tentativas + 1 >= %s""",
+            (config['EMAIL_MAX_ATTEMPTS'],)
+        )
+        batch_id = str(uuid.uuid4())
+        # tentativas é atribuída antes de status: no UPDATE do MySQL, as atribuições seguintes já veem os novos valores
+        claimed = execute_query(
+            """UPDATE emails_pendentes
+               SET tentativas = tentativas + (status = 'enviando'),
+                   status = 'enviando', lote = %s, proxima_tentativa = NOW() + INTERVAL %s SECOND
+               WHERE status IN ('pendente', 'enviando') AND proxima_tentativa <= NOW()
+               ORDER BY proxima_tentativa LIMIT %s""",
+            (batch_id, config['EMAIL_CLAIM_TIMEOUT'], config['EMAIL_BATCH_SIZE'])
+        )
+        if not claimed:
+            return []
+        return execute_query(
+            "SELECT id, destinatario, assunto, corpo_html, tentativas FROM emails_pendentes WHERE lote = %s",
+            (batch_id,), fetch=True
+        )
+
+    def _run(self):
+        connection = None
+        last_used = 0
+        with self._app.app_context():
+            while True:
+                try:
+                    batch = self._claim_batch()
+                except Exception as e:
+                    logger.error(f"Erro ao buscar emails pendentes: {e}")
+                    batch = []
+
+                if not batch:
+                    if connection is not None and time.monotonic() - last_used > self._config['EMAIL_SMTP_IDLE_SECONDS']:
+                        connection = self._close(connection)
+                    self._wakeup.wait(self._config['EMAIL_POLL_INTERVAL'])
+                    self._wakeup.clear()
+                    continue
+
+                sent, failed = [], []
+                for email in batch:
+                    try:
+                        connection = self._send(connection, email)
+                        sent.append(email['id'])
+                    except Exception as e:
+                        connection = self._close(connection)
+                        failed.append((email, e))
+                last_used = time.monotonic()
+                self._mark_results(sent, failed)
+
+    def _send(self, connection, email):
+        """Envia pela conexão persistente; se o servidor a fechou, reconecta e tenta uma vez mais."""
+        message = Message(subject=email['assunto'], sender=self._config['MAIL_DEFAULT_SENDER'],
+                          recipients=[email['destinatario']], html=email['corpo_html'])
+        if connection is None:
+            connection = self._mail.connect().__enter__()
+        try:
+            connection.send(message)
+        except smtplib.SMTPServerDisconnected:
+            self._close(connection)
+            connection = self._mail.connect().__enter__()
+            connection.send(message)
+        return connection
+
+    @staticmethod
+    def _close(connection):
+        if connection is not None:
+            try:
+                connection.__exit__(None, None, None)
+            except Exception:
+                pass # Conexão já encerrada pelo servidor
+        return None
+
+    def _mark_results(self, sent, failed):
+        config = self._config
+        try:
+            if sent:
+                placeholders = ', '.join(['%s'] * len(sent))
+                execute_query(
+                    f"""UPDATE emails_pendentes SET status = 'enviado', lote = NULL, data_envio = NOW()
+                        WHERE id IN ({placeholders})""",
+                    tuple(sent)
+                )
+            for email, error in failed:
+                attempts = email['tentativas'] + 1
+                status = 'falhou' if attempts >= config['EMAIL_MAX_ATTEMPTS'] else 'pendente'
+                delay = config['EMAIL_RETRY_BACKOFF'] * (2 ** (attempts - 1))
+                execute_query(
+                    """UPDATE emails_pendentes
+                       SET status = %s, lote = NULL, tentativas = %s, ultimo_erro = %s,
+                           proxima_tentativa = NOW() + INTERVAL %s SECOND
+                       WHERE id = %s""",
+                    (status, attempts, str(error)[:1000], delay, email['id'])
+                )
+                logger.error(f"Erro ao enviar email {email['id']} para {email['destinatario']} "
+                             f"(tentativa {attempts}): {error}")
+        except Exception as e:
+            # As mensagens continuam reservadas e voltam a ser enviadas quando a reserva vencer
+            logger.error(f"Erro ao atualizar a caixa de saída de emails: {e}")
+
+
+outbox = EmailOutbox()
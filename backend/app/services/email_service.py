@@ -1,5 +1,6 @@
 from flask_mail import Mail, Message
 from flask import current_app
+from app.services.email_outbox import outbox
 import os
 
 mail = Mail() # Instancia o objeto Mail
@@ -7,6 +8,31 @@ mail = Mail() # Instancia o objeto Mail
 def init_email_service(app):
     """Inicializa o serviço de email com a aplicação Flask."""
     mail.init_app(app)
+    outbox.init_app(app, mail) # Threads de envio da caixa de saída (EMAIL_OUTBOX_ENABLED)
+
+def send_email(recipient, subject, html):
+    """
+    Envia um email. Com EMAIL_OUTBOX_ENABLED, apenas grava a mensagem na caixa
+    de saída (envio em segundo plano, com novas tentativas) e retorna na hora;
+    caso contrário, envia de forma síncrona pelo SMTP.
+    """
+    if current_app.config['EMAIL_OUTBOX_ENABLED']:
+        try:
+            outbox.enqueue(recipient, subject, html)
+            return True
+        except Exception as e:
+            current_app.logger.error(f"Erro ao enfileirar email para {recipient}: {e}")
+            return False
+
+    msg = Message(subject=subject, sender=current_app.config['MAIL_DEFAULT_SENDER'], recipients=[recipient])
+    msg.html = html
+    try:
+        mail.send(msg)
+        current_app.logger.info(f"Email enviado para {recipient}")
+        return True
+    except Exception as e:
+        current_app.logger.error(f"Erro ao enviar email para {recipient}: {e}")
+        return False
 
 def send_password_reset_email(user_email, reset_link, user_name="Usuário"):
     """
@@ -14,12 +40,7 @@ def send_password_reset_email(user_email, reset_link, user_name="Usuário"):
     HU03 - Recuperação de Senha.
     """
     with current_app.app_context(): # Garante que estamos no contexto da aplicação
-        msg = Message(
-            subject="Redefinição de Senha - Sistema de Hábitos e Humor",
-            sender=current_app.config['MAIL_DEFAULT_SENDER'],
-            recipients=[user_email]
-        )
-        msg.html = f"""
+        html = f"""
         <html>
         <head></head>
         <body>
@@ -34,10 +55,4 @@ def send_password_reset_email(user_email, reset_link, user_name="Usuário"):
         </body>
         </html>
         """
-        try:
-            mail.send(msg)
-            current_app.logger.info(f"Email de redefinição enviado para {user_email}")
-            return True
-        except Exception as e:
-            current_app.logger.error(f"Erro ao enviar email para {user_email}: {e}")
-            return False
\ No newline at end of file
+        return send_email(user_email, "Redefinição de Senha - Sistema de Hábitos e Humor", html)
\ No newline at end of file
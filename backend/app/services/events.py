@@ -0,0 +1,133 @@
+from app.utils.serialization import dumps, loads
+import logging
+import queue
+import threading
+
+try:
+    import redis # Opcional: distribui os eventos entre os workers/instâncias via Redis Pub/Sub
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Enviado ao assinante cuja fila encheu: o cliente deve recarregar os dados e reconectar
+OVERFLOW = object()
+
+REDIS_CHANNEL = 'mindtrack:eventos'
+
+
+class Subscription:
+    """Uma conexão SSE aberta: fila limitada de eventos de um usuário."""
+
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # Cliente lento: em vez de bloquear quem publica ou acumular memória,
+            # descarta a fila e avisa o cliente para sincronizar de novo
+            self.overflowed = True
+            with self.queue.mutex:
+                self.queue.queue.clear()
+            self.queue.put_nowait(OVERFLOW)
+
+    def get(self, timeout):
+        """Próximo evento, ou None se nada chegou dentro de `timeout` segundos."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """
+    Pub/sub em memória por usuário. Cada evento publicado é entregue às
+    conexões SSE abertas do usuário neste processo. Com um backend Redis
+    configurado, a publicação passa pelo Redis e cada worker repassa os
+    eventos recebidos aos seus assinantes locais.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._queue_size = 100
+        self._max_per_user = 5
+        self._redis = None
+
+    def configure(self, queue_size, max_per_user, redis_url=None):
+        self._queue_size = queue_size
+        self._max_per_user = max_per_user
+        if redis_url and self._redis is None:
+            if redis is None:
+                logger.warning("EVENTS_REDIS_URL definido, mas o pacote redis não está instalado; usando eventos locais.")
+                return
+            self._redis = redis.Redis.from_url(redis_url)
+            threading.Thread(target=self._listen_redis, name='mindtrack-eventos', daemon=True).start()
+
+    def subscribe(self, user_id):
+        """Registra uma conexão do usuário. Retorna None se o limite de conexões foi atingido."""
+        with self._lock:
+            subscriptions = self._subscribers.setdefault(user_id, set())
+            if len(subscriptions) >= self._max_per_user:
+                return None
+            subscription = Subscription(user_id, self._queue_size)
+            subscriptions.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id, event):
+        if self._redis is not None:
+            try:
+                self._redis.publish(REDIS_CHANNEL, dumps({'usuario_id': user_id, 'evento': event}))
+                return
+            except Exception as e:
+                logger.error(f"Erro ao publicar evento no Redis; entregando apenas localmente: {e}")
+        self._deliver(user_id, event)
+
+    def _deliver(self, user_id, event):
+        with self._lock:
+            subscriptions = list(self._subscribers.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def _listen_redis(self):
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(REDIS_CHANNEL)
+        for message in pubsub.listen():
+            try:
+                payload = loads(message['data'])
+                self._deliver(str(payload['usuario_id']), payload['evento'])
+            except Exception as e:
+                logger.error(f"Evento inválido recebido do Redis: {e}")
+
+
+events = EventBroker()
+
+def publish_change(user_id, entidade, acao, dados):
+    """
+    Publica uma alteração (delta) para as conexões SSE do usuário.
+    `acao` é 'salvo' ou 'excluido'; `dados` traz os campos principais do item.
+    Falhas aqui nunca interrompem a escrita que originou o evento.
+    """
+    try:
+        events.publish(str(user_id), {'entidade': entidade, 'acao': acao, 'dados': dados})
+    except Exception as e:
+        logger.error(f"Erro ao publicar evento de {entidade}: {e}")
+
+def init_events(app):
+    config = app.config
+    events.configure(config['EVENTS_QUEUE_SIZE'], config['EVENTS_MAX_STREAMS_PER_USER'], config.get('EVENTS_REDIS_URL'))
+    return events
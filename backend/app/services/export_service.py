@@ -0,0 +1,131 @@
+from app.utils.database import stream_query
+from app.models.habit import HabitRecord
+from app.models.mood import MoodAssessment
+from app.utils.serialization import dumps
+from datetime import date
+import csv
+import io
+import zlib
+
+# Limites de data aceitos pelo MySQL: usados quando o período não é informado
+EXPORT_MIN_DATE = date(1000, 1, 1)
+EXPORT_MAX_DATE = date(9999, 12, 31)
+
+# Tamanho aproximado (em bytes) acumulado antes de enviar um pedaço da resposta
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Colunas exportadas por entidade (na ordem em que aparecem no CSV)
+EXPORT_FIELDS = {
+    'habito': ['id', 'nome', 'descricao', 'categoria_id', 'categoria_nome', 'tipo_medicao',
+               'unidade', 'meta_diaria', 'ativo', 'data_criacao', 'data_atualizacao'],
+    'registro_habito': ['id', 'habito_id', 'habito_nome', 'data_registro', 'valor', 'concluido',
+                        'observacoes', 'tipo_medicao', 'unidade', 'meta_diaria', 'data_criacao'],
+    'avaliacao_humor': ['id', 'data_avaliacao', 'nota_humor', 'observacoes', 'data_criacao',
+                        'data_atualizacao'],
+    'meta': ['id', 'titulo', 'descricao', 'habito_id', 'tipo_meta', 'valor_meta', 'periodo',
+             'data_inicio', 'data_fim', 'ativa', 'notificacoes', 'data_criacao'],
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class ExportService:
+    """
+    Serviço de exportação do histórico completo de um usuário.
+    Os dados são lidos com cursores do lado do servidor e convertidos em
+    pedaços de CSV/NDJSON sob demanda, sem materializar o histórico na memória.
+    """
+
+    @staticmethod
+    def iter_user_history(user_id, start_date=None, end_date=None):
+        """
+        Percorre hábitos, registros, avaliações de humor e metas do usuário.
+        Produz tuplas (entidade, linha) na ordem em que são lidas do banco.
+        """
+        start_date = start_date or EXPORT_MIN_DATE
+        end_date = end_date or EXPORT_MAX_DATE
+
+        habits = stream_query(
+            """SELECT h.*, ch.nome AS categoria_nome FROM habitos h
+               LEFT JOIN categorias_habitos ch ON h.categoria_id = ch.id
+               WHERE h.usuario_id = %s ORDER BY h.id""",
+            (user_id,)
+        )
+        for row in habits:
+            yield 'habito', row
+
+        # As observações ficam em tabelas laterais: só a exportação (e o detalhe) as pede
+        for row in HabitRecord.iter_all_by_user_and_date_range(user_id, start_date, end_date,
+                                                               fields=tuple(EXPORT_FIELDS['registro_habito'])):
+            yield 'registro_habito', row
+
+        for row in MoodAssessment.iter_all_by_user_and_date_range(user_id, start_date, end_date,
+                                                                  fields=tuple(EXPORT_FIELDS['avaliacao_humor'])):
+            yield 'avaliacao_humor', row
+
+        goals = stream_query("SELECT * FROM metas WHERE usuario_id = %s ORDER BY id", (user_id,))
+        for row in goals:
+            yield 'meta', row
+
+    @staticmethod
+    def _iter_ndjson(rows):
+        for entity, row in rows:
+            record = {'tipo': entity}
+            record.update((field, row.get(field)) for field in EXPORT_FIELDS[entity])
+            yield dumps(record) + '\n'
+
+    @staticmethod
+    def _iter_csv(rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        current_entity = None
+        for entity, row in rows:
+            if entity != current_entity:
+                # Cada entidade começa uma nova seção com seu próprio cabeçalho
+                if current_entity is not None:
+                    writer.writerow([])
+                writer.writerow(['tipo'] + EXPORT_FIELDS[entity])
+                current_entity = entity
+            writer.writerow([entity] + [row.get(field) for field in EXPORT_FIELDS[entity]])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    @staticmethod
+    def generate_export(user_id, export_format='ndjson', compress=False, start_date=None, end_date=None):
+        """
+        Gera o conteúdo da exportação em pedaços de bytes, prontos para uma
+        resposta HTTP chunked. Opcionalmente comprime em gzip durante o envio.
+        """
+        rows = ExportService.iter_user_history(user_id, start_date, end_date)
+        if export_format == 'csv':
+            lines = ExportService._iter_csv(rows)
+        else:
+            lines = ExportService._iter_ndjson(rows)
+
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None # wbits=31 -> formato gzip
+        pending = []
+        pending_size = 0
+        first_chunk = True
+        for line in lines:
+            data = line.encode('utf-8')
+            pending.append(data)
+            pending_size += len(data)
+            # O primeiro pedaço sai imediatamente; os demais são agrupados
+            if first_chunk or pending_size >= EXPORT_CHUNK_SIZE:
+                chunk = b''.join(pending)
+                pending = []
+                pending_size = 0
+                if compressor:
+                    chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                first_chunk = False
+                yield chunk
+
+        chunk = b''.join(pending)
+        if compressor:
+            chunk = compressor.compress(chunk) + compressor.flush()
+        if chunk:
+            yield chunk
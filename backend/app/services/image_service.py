@@ -0,0 +1,117 @@
+from app.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Formatos aceitos após a decodificação (independente da extensão enviada)
+ALLOWED_IMAGE_FORMATS = {'PNG': 'png', 'JPEG': 'jpg', 'GIF': 'gif', 'WEBP': 'webp'}
+
+# Formatos das variantes: extensão -> (formato do Pillow, opções de gravação)
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'method': 4}),
+    'jpg': ('JPEG', {'optimize': True, 'progressive': True}),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Config.PROFILE_PICTURE_WORKERS,
+                                           thread_name_prefix='mindtrack-imagens')
+        return _executor
+
+
+class InvalidImage(ValueError):
+    """O arquivo enviado não é uma imagem válida (ou é grande demais para decodificar)."""
+
+
+def parse_sizes(value):
+    """'thumb=64,medium=256' -> {'thumb': 64, 'medium': 256}"""
+    sizes = {}
+    for item in filter(None, (part.strip() for part in value.split(','))):
+        name, _, pixels = item.partition('=')
+        sizes[name.strip()] = int(pixels)
+    return sizes
+
+
+class ImageService:
+    """
+    Verificação e redimensionamento de fotos de perfil. A verificação roda na
+    requisição (só lê o cabeçalho e a estrutura do arquivo); as variantes em
+    tamanhos fixos (PROFILE_PICTURE_SIZES, em WebP e JPEG) são geradas em um
+    pool de threads de fundo, para a resposta do upload não esperar o resize.
+    """
+
+    @staticmethod
+    def verify(path):
+        """Decodifica o cabeçalho e valida a imagem. Retorna a extensão do formato real."""
+        try:
+            with Image.open(path) as image:
+                image_format = image.format
+                width, height = image.size
+                image.verify() # Detecta arquivos truncados ou corrompidos sem decodificar os pixels
+        except Exception as e:
+            logger.info(f"Upload de imagem rejeitado: {e}")
+            raise InvalidImage("Arquivo de imagem inválido ou corrompido.")
+        if image_format not in ALLOWED_IMAGE_FORMATS:
+            raise InvalidImage(f"Formato de imagem não suportado: {image_format}.")
+        if width * height > Config.PROFILE_PICTURE_MAX_PIXELS:
+            raise InvalidImage("Imagem com dimensões grandes demais.")
+        return ALLOWED_IMAGE_FORMATS[image_format]
+
+    @staticmethod
+    def variant_key(key, size_name, extension):
+        """Chave de uma variante, ao lado do original ('ab/cd/<hash>_thumb.webp')."""
+        base = os.path.splitext(key)[0]
+        return f"{base}_{size_name}.{extension}"
+
+    @staticmethod
+    def variant_keys(key):
+        return [ImageService.variant_key(key, size_name, extension)
+                for size_name in parse_sizes(Config.PROFILE_PICTURE_SIZES) for extension in VARIANT_FORMATS]
+
+    @staticmethod
+    def build_variants(key, storage):
+        """Gera todas as variantes de uma imagem já verificada e as grava no armazenamento."""
+        sizes = parse_sizes(Config.PROFILE_PICTURE_SIZES)
+        with storage.open(key) as source, Image.open(source) as image:
+            image.seek(0) # GIF animado: usa o primeiro quadro
+            image = ImageOps.exif_transpose(image) # Aplica a rotação da câmera antes de recortar
+            has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+            # Reduz primeiro para o maior tamanho; os menores partem desse resultado
+            for size_name, pixels in sorted(sizes.items(), key=lambda item: -item[1]):
+                image = ImageOps.fit(image, (pixels, pixels), Image.LANCZOS)
+                for extension, (image_format, options) in VARIANT_FORMATS.items():
+                    variant = image
+                    if image_format == 'JPEG' and has_alpha:
+                        variant = Image.new('RGB', image.size, (255, 255, 255))
+                        variant.paste(image, mask=image.getchannel('A'))
+                    fd, tmp_path = tempfile.mkstemp(suffix=f'.{extension}', dir=storage.temp_dir)
+                    try:
+                        with os.fdopen(fd, 'wb') as out:
+                            variant.save(out, image_format, quality=Config.PROFILE_PICTURE_QUALITY, **options)
+                        storage.put(ImageService.variant_key(key, size_name, extension), tmp_path)
+                    finally:
+                        if os.path.exists(tmp_path):
+                            os.remove(tmp_path)
+
+    @staticmethod
+    def build_variants_in_background(key, storage, on_done=None):
+        """Gera as variantes em uma thread de fundo e chama `on_done(key)` quando todas foram gravadas."""
+        def run():
+            try:
+                ImageService.build_variants(key, storage)
+                if on_done is not None:
+                    on_done(key)
+            except Exception as e:
+                logger.error(f"Erro ao gerar variantes de {key}: {e}")
+        return _get_executor().submit(run)
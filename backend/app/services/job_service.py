@@ -0,0 +1,183 @@
+from app.config import Config
+from app.services.report_service import ReportService
+from app.services.export_service import ExportService, EXPORT_FORMATS
+from app.utils.serialization import dumps
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import json
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPES = ('dashboard', 'correlation', 'daily_data', 'export')
+
+JOB_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+_executor = None
+_executor_lock = threading.Lock()
+_last_purge = 0
+
+
+def _get_executor():
+    """Cria (uma única vez por processo) o pool que executa os jobs de relatório."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if Config.REPORT_JOB_EXECUTOR == 'process':
+                # 'spawn' evita herdar threads e conexões abertas do worker web via fork
+                _executor = ProcessPoolExecutor(
+                    max_workers=Config.REPORT_JOB_WORKERS,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                _executor = ThreadPoolExecutor(max_workers=Config.REPORT_JOB_WORKERS,
+                                               thread_name_prefix='report-job')
+        return _executor
+
+
+def _meta_path(job_id):
+    return os.path.join(Config.REPORT_JOBS_FOLDER, f"{job_id}.json")
+
+
+def _read_meta(job_id):
+    try:
+        with open(_meta_path(job_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_meta(meta):
+    # Escrita atômica: outros workers nunca leem um JSON pela metade
+    path = _meta_path(meta['id'])
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(dumps(meta))
+    os.replace(tmp_path, path)
+
+
+def _update_meta(job_id, **fields):
+    meta = _read_meta(job_id)
+    if meta is None:
+        return None
+    meta.update(fields)
+    _write_meta(meta)
+    return meta
+
+
+def _run_job(job_id, user_id, job_type, params):
+    """
+    Executa um job de relatório (no pool de processos/threads) e grava o
+    artefato resultante no diretório de resultados.
+    """
+    _update_meta(job_id, status='processando', iniciado_em=datetime.now().isoformat())
+    try:
+        start_date = date.fromisoformat(params['start_date']) if params.get('start_date') else None
+        end_date = date.fromisoformat(params['end_date']) if params.get('end_date') else None
+
+        if job_type == 'export':
+            export_format = params.get('format', 'ndjson')
+            compress = bool(params.get('gzip'))
+            filename = f"{job_id}.{export_format}{'.gz' if compress else ''}"
+            content_type = 'application/gzip' if compress else EXPORT_FORMATS[export_format]
+            with open(os.path.join(Config.REPORT_JOBS_FOLDER, filename), 'wb') as f:
+                for chunk in ExportService.generate_export(user_id, export_format, compress, start_date, end_date):
+                    f.write(chunk)
+        else:
+            if job_type == 'dashboard':
+                result = ReportService.get_dashboard_summary(user_id, start_date, end_date)
+            elif job_type == 'correlation':
+                result = ReportService.get_correlation_report(user_id, start_date, end_date, params['habit_ids'])
+            else:
+                result = ReportService.get_daily_consolidated_data(user_id, start_date, end_date)
+            filename = f"{job_id}.result.json"
+            content_type = 'application/json'
+            with open(os.path.join(Config.REPORT_JOBS_FOLDER, filename), 'w', encoding='utf-8') as f:
+                f.write(dumps(result))
+
+        _update_meta(job_id, status='concluido', arquivo=filename, content_type=content_type,
+                     concluido_em=datetime.now().isoformat())
+    except Exception as e:
+        logger.error(f"Erro ao executar job de relatório {job_id}: {e}")
+        _update_meta(job_id, status='erro', erro=str(e), concluido_em=datetime.now().isoformat())
+
+
+class ReportJobService:
+    """
+    Jobs assíncronos de relatório: a requisição apenas agenda o cálculo e
+    o resultado é gravado em um armazenamento local com expiração, liberando
+    os workers web para o tráfego interativo.
+    """
+
+    @staticmethod
+    def submit(user_id, job_type, params):
+        """Agenda um job e retorna seus metadados iniciais (status 'pendente')."""
+        os.makedirs(Config.REPORT_JOBS_FOLDER, exist_ok=True)
+        ReportJobService.purge_expired()
+
+        now = datetime.now()
+        meta = {
+            'id': uuid.uuid4().hex,
+            'usuario_id': user_id,
+            'tipo': job_type,
+            'parametros': params,
+            'status': 'pendente',
+            'criado_em': now.isoformat(),
+            'expira_em': (now + timedelta(seconds=Config.REPORT_JOB_TTL)).isoformat(),
+        }
+        _write_meta(meta)
+        _get_executor().submit(_run_job, meta['id'], user_id, job_type, params)
+        return meta
+
+    @staticmethod
+    def get(job_id, user_id):
+        """Retorna os metadados de um job do usuário, ou None se não existir ou estiver expirado."""
+        if not JOB_ID_PATTERN.match(job_id):
+            return None
+        meta = _read_meta(job_id)
+        if not meta or meta['usuario_id'] != user_id:
+            return None
+        if datetime.fromisoformat(meta['expira_em']) < datetime.now():
+            return None
+        return meta
+
+    @staticmethod
+    def get_result_path(meta):
+        """Caminho do artefato de um job concluído."""
+        return os.path.join(Config.REPORT_JOBS_FOLDER, meta['arquivo'])
+
+    @staticmethod
+    def purge_expired(force=False):
+        """
+        Remove metadados e artefatos de jobs expirados.
+        Executado no máximo uma vez por minuto por processo, a menos que force=True.
+        """
+        global _last_purge
+        if not force and time.monotonic() - _last_purge < 60:
+            return 0
+        _last_purge = time.monotonic()
+
+        removed = 0
+        now = datetime.now()
+        try:
+            entries = os.listdir(Config.REPORT_JOBS_FOLDER)
+        except FileNotFoundError:
+            return 0
+        for name in entries:
+            if not name.endswith('.json') or name.endswith('.result.json'):
+                continue
+            job_id = name[:-len('.json')]
+            meta = _read_meta(job_id)
+            if not meta or datetime.fromisoformat(meta['expira_em']) >= now:
+                continue
+            for path in (_meta_path(job_id), os.path.join(Config.REPORT_JOBS_FOLDER, meta.get('arquivo') or '')):
+                if os.path.isfile(path):
+                    os.remove(path)
+            removed += 1
+        return removed
@@ -0,0 +1,79 @@
+from app.config import Config
+from app.utils.database import execute_query, shared_connection
+from datetime import datetime, timedelta
+import time
+
+def delete_in_batches(table, condition, params, batch_size, pause, max_batches, order_by='data_expiracao'):
+    """
+    Remove as linhas de `table` que atendem `condition` em lotes de `batch_size`.
+
+    Cada lote primeiro lê os ids pelo índice da condição e depois apaga pela
+    chave primária, em uma transação curta (autocommit): só as linhas do lote
+    ficam bloqueadas, e a pausa entre lotes deixa o banco atender as
+    requisições. Para após `max_batches` lotes; o restante fica para a próxima
+    execução. `order_by` é a coluna indexada usada na condição. Retorna o
+    número de linhas removidas.
+    """
+    removed = 0
+    for _ in range(max_batches):
+        rows = execute_query(
+            f"SELECT id FROM {table} WHERE {condition} ORDER BY {order_by} LIMIT %s",
+            params + (batch_size,), fetch=True
+        )
+        if not rows:
+            break
+        ids = [row['id'] for row in rows]
+        placeholders = ', '.join(['%s'] * len(ids))
+        removed += execute_query(f"DELETE FROM {table} WHERE id IN ({placeholders})", tuple(ids))
+        if len(ids) < batch_size:
+            break
+        time.sleep(pause)
+    return removed
+
+
+class MaintenanceService:
+    """Jobs de manutenção das tabelas que só crescem."""
+
+    @staticmethod
+    def cleanup_auth_tables():
+        """
+        Job periódico: apaga tokens de recuperação expirados (usados ou não),
+        sessões expiradas há mais de SESSION_RETENTION_DAYS e revogações de
+        tokens que já expiraram. Retorna as linhas removidas por tabela.
+        """
+        now = datetime.now()
+        # (tabela, condição, parâmetros) - todas as condições usam o índice em data_expiracao
+        targets = (
+            ('tokens_recuperacao', "data_expiracao < %s", (now,)),
+            ('sessoes', "data_expiracao < %s", (now - timedelta(days=Config.SESSION_RETENTION_DAYS),)),
+            ('tokens_revogados', "data_expiracao < UTC_TIMESTAMP()", ()), # Expiração gravada em UTC (ver jwt_helper)
+        )
+        result = {}
+        with shared_connection():
+            for table, condition, params in targets:
+                result[f'{table}_removidos'] = delete_in_batches(
+                    table, condition, params,
+                    Config.AUTH_CLEANUP_BATCH_SIZE,
+                    Config.AUTH_CLEANUP_PAUSE,
+                    Config.AUTH_CLEANUP_MAX_BATCHES
+                )
+        return result
+
+    @staticmethod
+    def cleanup_email_outbox():
+        """
+        Job diário: apaga da caixa de saída os emails já enviados ou que
+        esgotaram as tentativas há mais de EMAIL_RETENTION_DAYS. Retorna as
+        linhas removidas.
+        """
+        limit = datetime.now() - timedelta(days=Config.EMAIL_RETENTION_DAYS)
+        # proxima_tentativa guarda o fim da última reserva ou tentativa (índice status, proxima_tentativa)
+        with shared_connection():
+            removed = delete_in_batches(
+                'emails_pendentes', "status IN ('enviado', 'falhou') AND proxima_tentativa < %s", (limit,),
+                Config.AUTH_CLEANUP_BATCH_SIZE,
+                Config.AUTH_CLEANUP_PAUSE,
+                Config.AUTH_CLEANUP_MAX_BATCHES,
+                order_by='proxima_tentativa'
+            )
+        return {'emails_removidos': removed}
@@ -1,7 +1,12 @@
 from app.utils.database import execute_query
 from app.models.habit import HabitRecord
 from app.models.mood import MoodAssessment
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
+
+# Colunas usadas pelos gráficos: evitam ler as observações (TEXT) de cada linha
+DASHBOARD_MOOD_FIELDS = ('id', 'data_avaliacao', 'nota_humor')
+DASHBOARD_RECORD_FIELDS = ('id', 'habito_id', 'habito_nome', 'data_registro', 'valor', 'concluido')
+DAILY_RECORD_FIELDS = DASHBOARD_RECORD_FIELDS + ('tipo_medicao', 'unidade', 'meta_diaria')
 
 class ReportService:
     """
@@ -17,10 +22,10 @@ class ReportService:
         """
         
         # 1. Dados de Humor Diário
-        mood_data = MoodAssessment.get_all_by_user_and_date_range(user_id, start_date, end_date)
+        mood_data = MoodAssessment.get_all_by_user_and_date_range(user_id, start_date, end_date, DASHBOARD_MOOD_FIELDS)
         
         # 2. Dados de Hábitos Diários
-        habit_records = HabitRecord.get_all_by_user_and_date_range(user_id, start_date, end_date)
+        habit_records = HabitRecord.get_all_by_user_and_date_range(user_id, start_date, end_date, DASHBOARD_RECORD_FIELDS)
 
         # Agregação de dados para os gráficos
         daily_mood_scores = {}
@@ -246,14 +251,14 @@ class ReportService:
             current_date += timedelta(days=1)
         
         # 2. Inserir dados de humor
-        mood_assessments = MoodAssessment.get_all_by_user_and_date_range(user_id, start_date, end_date)
+        mood_assessments = MoodAssessment.get_all_by_user_and_date_range(user_id, start_date, end_date, DASHBOARD_MOOD_FIELDS)
         for mood in mood_assessments:
             dt_str = mood['data_avaliacao'].isoformat() if isinstance(mood['data_avaliacao'], (date, datetime)) else mood['data_avaliacao']
             if dt_str in daily_data:
                 daily_data[dt_str]['mood'] = mood['nota_humor']
         
         # 3. Inserir dados de hábitos
-        habit_records = HabitRecord.get_all_by_user_and_date_range(user_id, start_date, end_date)
+        habit_records = HabitRecord.get_all_by_user_and_date_range(user_id, start_date, end_date, DAILY_RECORD_FIELDS)
         for record in habit_records:
             dt_str = record['data_registro'].isoformat() if isinstance(record['data_registro'], (date, datetime)) else record['data_registro']
             if dt_str in daily_data:
@@ -269,4 +274,116 @@ class ReportService:
         
         # Converter o dicionário de volta para uma lista ordenada por data
         sorted_daily_data = sorted(daily_data.values(), key=lambda x: x['date'])
-        return sorted_daily_data
\ No newline at end of file
+        return sorted_daily_data
+
+    @staticmethod
+    def get_weekly_summary(user_id, reference_date):
+        """
+        Resumo numérico dos últimos 7 dias (incluindo reference_date):
+        média de humor, taxa de conclusão de hábitos e hábito mais concluído.
+        """
+        start_date = reference_date - timedelta(days=6)
+
+        mood = execute_query(
+            """SELECT AVG(nota_humor) AS media_humor, COUNT(*) AS dias_com_humor
+               FROM avaliacoes_humor
+               WHERE usuario_id = %s AND data_avaliacao BETWEEN %s AND %s""",
+            (user_id, start_date, reference_date), fetch=True
+        )[0]
+
+        habits = execute_query(
+            """SELECT h.id, h.nome, COUNT(*) AS total, SUM(rh.concluido) AS concluidos
+               FROM registros_habitos rh
+               JOIN habitos h ON rh.habito_id = h.id
+               WHERE rh.usuario_id = %s AND rh.data_registro BETWEEN %s AND %s
+               GROUP BY h.id, h.nome
+               ORDER BY concluidos DESC, h.nome ASC""",
+            (user_id, start_date, reference_date), fetch=True
+        ) or []
+
+        total_records = sum(h['total'] for h in habits)
+        completed_records = sum(int(h['concluidos'] or 0) for h in habits)
+
+        return {
+            'period_start': start_date.isoformat(),
+            'period_end': reference_date.isoformat(),
+            'media_humor': round(float(mood['media_humor']), 2) if mood['media_humor'] is not None else None,
+            'dias_com_humor': mood['dias_com_humor'],
+            'total_registros': total_records,
+            'registros_concluidos': completed_records,
+            'taxa_conclusao': round(completed_records / total_records * 100, 2) if total_records else 0,
+            'habito_destaque': habits[0]['nome'] if habits and habits[0]['concluidos'] else None
+        }
+
+    @staticmethod
+    def get_goal_period(periodo, reference_date):
+        """Retorna o intervalo (inicio, fim) do período corrente de uma meta."""
+        if periodo == 'semanal':
+            return reference_date - timedelta(days=reference_date.weekday()), reference_date
+        if periodo == 'mensal':
+            return reference_date.replace(day=1), reference_date
+        if periodo == 'anual':
+            return reference_date.replace(month=1, day=1), reference_date
+        return reference_date, reference_date # diario
+
+    @staticmethod
+    def goal_period_start_sql(reference_date, alias='m'):
+        """
+        Expressão SQL do início do período corrente de cada meta (mesma regra de
+        get_goal_period; o fim é sempre reference_date) e os seus parâmetros.
+        """
+        params = tuple(ReportService.get_goal_period(periodo, reference_date)[0]
+                       for periodo in ('semanal', 'mensal', 'anual', 'diario'))
+        sql = f"""CASE {alias}.periodo WHEN 'semanal' THEN %s WHEN 'mensal' THEN %s
+                  WHEN 'anual' THEN %s ELSE %s END"""
+        return sql, params
+
+    @staticmethod
+    def get_goal_progress(user_id, reference_date):
+        """
+        HU09 - Progresso das metas ativas no período corrente de cada uma.
+        Metas de hábito somam os valores (ou conclusões, para hábitos binários);
+        metas de humor usam a média das notas; metas 'custom' não têm medição automática.
+        Uma única consulta: o valor de cada meta vem de subconsultas agregadas.
+        """
+        period_start, period_params = ReportService.goal_period_start_sql(reference_date)
+        goals = execute_query(
+            f"""SELECT m.id, m.titulo, m.tipo_meta, m.valor_meta, m.periodo, m.habito_id,
+                       (SELECT SUM(CASE WHEN h.tipo_medicao = 'quantitativo' THEN rh.valor ELSE rh.concluido END)
+                        FROM registros_habitos rh
+                        WHERE m.tipo_meta = 'habito' AND rh.habito_id = m.habito_id AND rh.usuario_id = m.usuario_id
+                        AND rh.data_registro BETWEEN {period_start} AND %s) AS valor_habito,
+                       (SELECT AVG(ah.nota_humor) FROM avaliacoes_humor ah
+                        WHERE m.tipo_meta = 'humor' AND ah.usuario_id = m.usuario_id
+                        AND ah.data_avaliacao BETWEEN {period_start} AND %s) AS media_humor
+                FROM metas m
+                LEFT JOIN habitos h ON m.habito_id = h.id
+                WHERE m.usuario_id = %s AND m.ativa = TRUE AND m.data_inicio <= %s
+                AND (m.data_fim IS NULL OR m.data_fim >= %s)
+                ORDER BY m.data_inicio DESC""",
+            (*period_params, reference_date, *period_params, reference_date, user_id, reference_date, reference_date),
+            fetch=True
+        ) or []
+
+        progress = []
+        for goal in goals:
+            period_start_date, period_end_date = ReportService.get_goal_period(goal['periodo'], reference_date)
+            current_value = None
+            if goal['tipo_meta'] == 'habito' and goal['habito_id']:
+                current_value = float(goal['valor_habito'] or 0)
+            elif goal['tipo_meta'] == 'humor':
+                current_value = round(float(goal['media_humor']), 2) if goal['media_humor'] is not None else None
+
+            target = float(goal['valor_meta'])
+            progress.append({
+                'meta_id': goal['id'],
+                'titulo': goal['titulo'],
+                'tipo_meta': goal['tipo_meta'],
+                'periodo': goal['periodo'],
+                'periodo_inicio': period_start_date.isoformat(),
+                'periodo_fim': period_end_date.isoformat(),
+                'valor_meta': target,
+                'valor_atual': current_value,
+                'percentual': round(min(current_value / target * 100, 100), 2) if current_value is not None and target else None
+            })
+        return progress
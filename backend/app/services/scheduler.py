@@ -0,0 +1,173 @@
+from app.utils.database import get_db_connection
+from datetime import datetime, timedelta
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class ScheduledJob:
+    """Um job agendado: diário (hora/minuto, opcionalmente num dia da semana) ou por intervalo."""
+
+    def __init__(self, name, func, hour=None, minute=0, weekday=None, interval=None):
+        self.name = name
+        self.func = func
+        self.hour = hour
+        self.minute = minute
+        self.weekday = weekday # 0 = segunda-feira ... 6 = domingo
+        self.interval = interval # Segundos, para jobs periódicos
+        self.next_run = None
+
+    def period_key(self, scheduled_for):
+        """
+        Identifica a rodada agendada: o horário previsto para jobs diários/semanais
+        (o mesmo em todos os workers) ou a janela de `interval` segundos.
+        """
+        if self.interval:
+            return f"i{int(scheduled_for.timestamp()) // self.interval}"
+        return scheduled_for.strftime('%Y-%m-%d %H:%M')
+
+    def compute_next_run(self, now):
+        if self.interval:
+            return now + timedelta(seconds=self.interval)
+        candidate = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        while candidate <= now or (self.weekday is not None and candidate.weekday() != self.weekday):
+            candidate += timedelta(days=1)
+        return candidate
+
+
+class Scheduler:
+    """
+    Agendador simples executado em uma thread do próprio processo.
+
+    Cada worker do gunicorn inicia o seu agendador. Cada rodada é reivindicada
+    na tabela 'execucoes_jobs' (job + período, com INSERT IGNORE): só o primeiro
+    worker a reivindicá-la executa o job, mesmo que o timer dos outros dispare
+    depois de ele terminar. Um lock nomeado do MySQL (GET_LOCK) impede ainda
+    que duas rodadas do mesmo job se sobreponham.
+    """
+
+    # Marcas de rodadas mais antigas que isso são apagadas
+    RUN_RETENTION_DAYS = 30
+
+    def __init__(self):
+        self._jobs = []
+        self._stop = threading.Event()
+        self._thread = None
+        self._app = None
+
+    def add_daily_job(self, name, func, hour, minute=0, weekday=None):
+        self._jobs.append(ScheduledJob(name, func, hour=hour, minute=minute, weekday=weekday))
+
+    def add_interval_job(self, name, func, seconds):
+        self._jobs.append(ScheduledJob(name, func, interval=seconds))
+
+    def start(self, app):
+        if self.running:
+            return
+        self._app = app
+        self._stop.clear()
+        now = datetime.now()
+        for job in self._jobs:
+            job.next_run = job.compute_next_run(now)
+        self._thread = threading.Thread(target=self._loop, name='mindtrack-scheduler', daemon=True)
+        self._thread.start()
+        logger.info(f"Agendador iniciado com {len(self._jobs)} job(s).")
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def _loop(self):
+        while not self._stop.is_set():
+            now = datetime.now()
+            for job in self._jobs:
+                if job.next_run <= now:
+                    self.run_job(job, job.next_run)
+                    job.next_run = job.compute_next_run(datetime.now())
+            if not self._jobs:
+                self._stop.wait(60)
+                continue
+            wait_seconds = (min(job.next_run for job in self._jobs) - datetime.now()).total_seconds()
+            self._stop.wait(max(1, min(wait_seconds, 60)))
+
+    def run_job(self, job, scheduled_for=None):
+        """
+        Executa a rodada de um job, se nenhum outro processo já a reivindicou,
+        sob o lock nomeado do MySQL e dentro do contexto da aplicação.
+        """
+        connection = get_db_connection()
+        lock_name = f"mindtrack_job_{job.name}"
+        period = job.period_key(scheduled_for or datetime.now())
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT GET_LOCK(%s, 0) AS obtido", (lock_name,))
+                if not cursor.fetchone()['obtido']:
+                    logger.info(f"Job '{job.name}' já está em execução em outro processo; pulando.")
+                    return None
+            try:
+                if not self._claim_run(connection, job, period):
+                    logger.info(f"Job '{job.name}' ({period}) já executado por outro processo; pulando.")
+                    return None
+                try:
+                    with self._app.app_context():
+                        result = job.func()
+                except Exception:
+                    # Libera a rodada para que outro worker (ou a próxima tentativa) a execute
+                    with connection.cursor() as cursor:
+                        cursor.execute("DELETE FROM execucoes_jobs WHERE job = %s AND periodo = %s", (job.name, period))
+                    raise
+                logger.info(f"Job '{job.name}' concluído: {result}")
+                return result
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", (lock_name,))
+        except Exception as e:
+            logger.error(f"Erro ao executar job '{job.name}': {e}")
+            return None
+        finally:
+            connection.close()
+
+    def _claim_run(self, connection, job, period):
+        """Reivindica a rodada (job, período). Retorna False se ela já foi reivindicada."""
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT IGNORE INTO execucoes_jobs (job, periodo) VALUES (%s, %s)", (job.name, period))
+            claimed = cursor.rowcount == 1
+            if claimed:
+                cursor.execute(
+                    "DELETE FROM execucoes_jobs WHERE job = %s AND data_execucao < NOW() - INTERVAL %s DAY",
+                    (job.name, self.RUN_RETENTION_DAYS)
+                )
+        return claimed
+
+
+scheduler = Scheduler()
+
+def init_scheduler(app):
+    """Registra os jobs de manutenção/pré-cálculo e inicia o agendador (se habilitado)."""
+    from app.services.snapshot_service import SnapshotService # Importações locais para evitar circular
+    from app.services.sync_service import SyncService
+    from app.services.maintenance_service import MaintenanceService
+    from app.services.digest_service import DigestService
+    from app.utils.uploads import collect_orphan_files
+
+    config = app.config
+    if not config.get('SCHEDULER_ENABLED') or scheduler.running:
+        return scheduler
+
+    scheduler.add_daily_job('snapshots_relatorios', SnapshotService.precompute_all,
+                            hour=config['SNAPSHOT_HOUR'], minute=config['SNAPSHOT_MINUTE'])
+    scheduler.add_daily_job('limpeza_exclusoes', SyncService.purge_tombstones,
+                            hour=config['SNAPSHOT_HOUR'], minute=30)
+    scheduler.add_interval_job('limpeza_autenticacao', MaintenanceService.cleanup_auth_tables,
+                               seconds=config['AUTH_CLEANUP_INTERVAL'])
+    scheduler.add_daily_job('limpeza_uploads', collect_orphan_files, hour=config['SNAPSHOT_HOUR'], minute=45)
+    scheduler.add_daily_job('limpeza_emails', MaintenanceService.cleanup_email_outbox,
+                            hour=config['SNAPSHOT_HOUR'], minute=50)
+    if config.get('DIGEST_ENABLED'):
+        scheduler.add_daily_job('resumo_semanal_email', DigestService.send_weekly_digests,
+                                hour=config['DIGEST_HOUR'], weekday=config['DIGEST_WEEKDAY'])
+    scheduler.start(app)
+    return scheduler
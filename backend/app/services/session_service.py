@@ -0,0 +1,126 @@
+from app.config import Config
+from app.utils.database import execute_query, execute_many
+import atexit
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_INSERT_SESSION = """
+    INSERT INTO sessoes (usuario_id, token, ip_address, user_agent, data_expiracao)
+    VALUES (%s, %s, %s, %s, %s)
+"""
+
+_STOP = object()
+
+
+class SessionWriter:
+    """
+    Fila write-behind para a tabela 'sessoes': login e logout apenas enfileiram
+    a escrita e respondem; uma thread de fundo grava em lotes (INSERT de várias
+    linhas e um UPDATE ... IN para vários logouts) quando o lote atinge
+    SESSION_FLUSH_SIZE itens ou a cada SESSION_FLUSH_INTERVAL segundos.
+    A ordem entre logins e logouts de um mesmo usuário é preservada.
+    """
+
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+
+    def _ensure_started(self):
+        # Inicia a thread na primeira escrita (depois do fork dos workers do gunicorn)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._queue = self._queue or queue.Queue(maxsize=Config.SESSION_QUEUE_MAX)
+                self._thread = threading.Thread(target=self._run, name='mindtrack-sessoes', daemon=True)
+                self._thread.start()
+                if not self._atexit_registered: # Drena a fila no encerramento do worker
+                    atexit.register(self.stop)
+                    self._atexit_registered = True
+
+    def enqueue(self, operation, params):
+        if not Config.SESSION_WRITE_BEHIND:
+            return self._write([(operation, params)])
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((operation, params))
+        except queue.Full:
+            # Fila cheia (banco lento ou fora): grava na própria requisição em vez de perder a sessão
+            logger.warning("Fila de sessões cheia; gravando de forma síncrona.")
+            self._write([(operation, params)])
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + Config.SESSION_FLUSH_INTERVAL
+        while True:
+            timeout = max(0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._flush(batch)
+                return
+            if item is not None:
+                batch.append(item)
+            if len(batch) >= Config.SESSION_FLUSH_SIZE or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + Config.SESSION_FLUSH_INTERVAL
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        try:
+            self._write(batch)
+        except Exception as e:
+            logger.error(f"Erro ao gravar {len(batch)} operação(ões) de sessão: {e}")
+
+    @staticmethod
+    def _write(batch):
+        """Grava as operações agrupando sequências consecutivas do mesmo tipo."""
+        start = 0
+        while start < len(batch):
+            operation = batch[start][0]
+            end = start
+            while end < len(batch) and batch[end][0] == operation:
+                end += 1
+            run = [params for _, params in batch[start:end]]
+            if operation == 'login':
+                execute_many(_INSERT_SESSION, run) # PyMySQL envia um único INSERT com várias linhas
+            else:
+                user_ids = list(dict.fromkeys(run))
+                placeholders = ', '.join(['%s'] * len(user_ids))
+                execute_query(
+                    f"UPDATE sessoes SET ativa = FALSE WHERE ativa = TRUE AND usuario_id IN ({placeholders})",
+                    tuple(user_ids)
+                )
+            start = end
+
+    def stop(self, timeout=10):
+        """Drena a fila (gravando o que estiver pendente) e encerra a thread."""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+session_writer = SessionWriter()
+
+
+class SessionService:
+    """Registro de sessões (login/logout) na tabela 'sessoes', fora do caminho da resposta."""
+
+    @staticmethod
+    def record_login(user_id, token, ip_address, user_agent, expires_at):
+        session_writer.enqueue('login', (user_id, token, ip_address, user_agent, expires_at))
+
+    @staticmethod
+    def record_logout(user_id):
+        session_writer.enqueue('logout', user_id)
@@ -0,0 +1,92 @@
+from app.config import Config
+from app.utils.database import execute_query
+from app.models.snapshot import ReportSnapshot
+from app.services.report_service import ReportService
+from datetime import date, timedelta
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Tipos de snapshot pré-calculados para cada usuário ativo
+SNAPSHOT_DASHBOARD = 'dashboard'
+SNAPSHOT_WEEKLY_SUMMARY = 'resumo_semanal'
+SNAPSHOT_GOAL_PROGRESS = 'progresso_metas'
+
+class SnapshotService:
+    """
+    Pré-cálculo dos relatórios padrão (dashboard dos últimos 7 dias, resumo
+    semanal e progresso de metas) fora do horário de pico, para que o pico
+    da manhã seja atendido a partir da tabela de snapshots.
+    """
+
+    @staticmethod
+    def build(user_id, tipo, reference_date):
+        """Calcula um relatório padrão do usuário para o dia de referência."""
+        if tipo == SNAPSHOT_DASHBOARD:
+            return ReportService.get_dashboard_summary(user_id, reference_date - timedelta(days=6), reference_date)
+        if tipo == SNAPSHOT_WEEKLY_SUMMARY:
+            return ReportService.get_weekly_summary(user_id, reference_date)
+        if tipo == SNAPSHOT_GOAL_PROGRESS:
+            return ReportService.get_goal_progress(user_id, reference_date)
+        raise ValueError(f"Tipo de snapshot desconhecido: {tipo}")
+
+    @staticmethod
+    def get_or_build(user_id, tipo, reference_date=None):
+        """
+        Retorna o snapshot do dia se existir; caso contrário calcula o relatório
+        e o grava, para que as próximas requisições do dia o reaproveitem.
+        """
+        reference_date = reference_date or date.today()
+        data = ReportSnapshot.get(user_id, tipo, reference_date)
+        if data is not None:
+            return data
+        data = SnapshotService.build(user_id, tipo, reference_date)
+        ReportSnapshot.save(user_id, tipo, reference_date, data)
+        return data
+
+    @staticmethod
+    def iter_active_user_batches(batch_size, active_since):
+        """Percorre os usuários ativos em lotes, com paginação por chave (id > último id)."""
+        last_id = 0
+        while True:
+            rows = execute_query(
+                """SELECT u.id FROM usuarios u
+                   WHERE u.id > %s AND u.ativo = TRUE
+                   AND (EXISTS (SELECT 1 FROM registros_habitos rh WHERE rh.usuario_id = u.id AND rh.data_registro >= %s)
+                        OR EXISTS (SELECT 1 FROM avaliacoes_humor ah WHERE ah.usuario_id = u.id AND ah.data_avaliacao >= %s))
+                   ORDER BY u.id
+                   LIMIT %s""",
+                (last_id, active_since, active_since, batch_size), fetch=True
+            )
+            if not rows:
+                return
+            yield [r['id'] for r in rows]
+            last_id = rows[-1]['id']
+
+    @staticmethod
+    def precompute_all(reference_date=None):
+        """
+        Job noturno: calcula os snapshots de todos os usuários ativos em lotes,
+        com uma pausa entre lotes para limitar a carga no banco.
+        Retorna quantos usuários foram processados.
+        """
+        reference_date = reference_date or date.today()
+        active_since = reference_date - timedelta(days=Config.SNAPSHOT_ACTIVE_DAYS)
+        processed = 0
+
+        for user_ids in SnapshotService.iter_active_user_batches(Config.SNAPSHOT_BATCH_SIZE, active_since):
+            snapshots = []
+            for user_id in user_ids:
+                try:
+                    for tipo in (SNAPSHOT_DASHBOARD, SNAPSHOT_WEEKLY_SUMMARY, SNAPSHOT_GOAL_PROGRESS):
+                        snapshots.append((user_id, tipo, reference_date, SnapshotService.build(user_id, tipo, reference_date)))
+                    processed += 1
+                except Exception as e:
+                    logger.error(f"Erro ao pré-calcular relatórios do usuário {user_id}: {e}")
+            ReportSnapshot.save_many(snapshots)
+            time.sleep(Config.SNAPSHOT_BATCH_PAUSE)
+
+        # Snapshots de dias anteriores não são mais servidos
+        ReportSnapshot.delete_older_than(reference_date)
+        return {'usuarios_processados': processed}
@@ -0,0 +1,76 @@
+from app.config import Config
+from app.utils.database import execute_query
+from app.utils.fields import select_list
+from app.models.habit import Habit, HabitRecord
+from app.models.mood import MoodAssessment
+from app.models.goal import Goal
+from app.models.tombstone import Tombstone
+from datetime import datetime, timedelta
+import base64
+
+class SyncService:
+    """
+    Sincronização incremental para clientes offline: devolve apenas o que mudou
+    desde um cursor, a partir dos índices (usuario_id, data_atualizacao).
+
+    O cursor é o horário do banco no início da sincronização anterior. A comparação
+    é inclusiva (>=), de modo que alterações no mesmo segundo do cursor são
+    reenviadas em vez de perdidas; aplicar uma mudança repetida não tem efeito.
+    """
+
+    # (chave da resposta, tabela com alias, colunas, junções extras, alias da tabela)
+    _ENTITIES = (
+        ('habitos', 'habitos h', select_list(Habit.COLUMNS, Habit.FIELD_EXPRESSIONS), '', 'h'),
+        ('registros_habitos', 'registros_habitos rh',
+         select_list(HabitRecord.COLUMNS + ('observacoes',), HabitRecord.FIELD_EXPRESSIONS),
+         ' LEFT JOIN registros_habitos_notas rhn ON rhn.registro_id = rh.id', 'rh'),
+        ('avaliacoes_humor', 'avaliacoes_humor ah',
+         select_list(MoodAssessment.COLUMNS + ('observacoes',), MoodAssessment.FIELD_EXPRESSIONS),
+         ' LEFT JOIN avaliacoes_humor_notas ahn ON ahn.avaliacao_id = ah.id', 'ah'),
+        ('metas', 'metas m', ', '.join(f'm.{c}' for c in Goal.COLUMNS), '', 'm'),
+    )
+
+    @staticmethod
+    def encode_cursor(timestamp):
+        return base64.urlsafe_b64encode(timestamp.isoformat().encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Converte o cursor opaco em datetime. Lança ValueError se for inválido."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            return datetime.fromisoformat(base64.urlsafe_b64decode(padded).decode())
+        except Exception:
+            raise ValueError('Cursor de sincronização inválido.')
+
+    @staticmethod
+    def get_changes(user_id, cursor=None):
+        """
+        Retorna as alterações desde o cursor. Sem cursor (ou com um cursor mais
+        antigo que a retenção das marcas de exclusão), devolve o estado completo
+        com 'completo': True, e o cliente deve substituir seus dados locais.
+        """
+        since = SyncService.decode_cursor(cursor) if cursor else None
+        now = execute_query("SELECT NOW() AS agora", fetch=True)[0]['agora']
+        if since is not None and since < now - timedelta(days=Config.SYNC_TOMBSTONE_RETENTION_DAYS):
+            since = None
+
+        changes = {'cursor': SyncService.encode_cursor(now), 'completo': since is None}
+        for key, table, columns, joins, alias in SyncService._ENTITIES:
+            query = f"SELECT {columns} FROM {table}{joins} WHERE {alias}.usuario_id = %s"
+            params = (user_id,)
+            if since is not None:
+                query += f" AND {alias}.data_atualizacao >= %s"
+                params += (since,)
+            changes[key] = execute_query(query, params, fetch=True) or []
+
+        changes['registros_habitos'] = [HabitRecord.project_row(r) for r in changes['registros_habitos']]
+        changes['metas'] = [Goal.project_row(r) for r in changes['metas']]
+        changes['exclusoes'] = Tombstone.get_since(user_id, since) if since is not None else []
+        return changes
+
+    @staticmethod
+    def purge_tombstones():
+        """Job diário: remove marcas de exclusão mais antigas que a retenção."""
+        limit = datetime.now() - timedelta(days=Config.SYNC_TOMBSTONE_RETENTION_DAYS)
+        return {'exclusoes_removidas': Tombstone.delete_older_than(limit)}
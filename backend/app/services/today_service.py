@@ -0,0 +1,68 @@
+from app.utils.database import execute_query, shared_connection
+from app.models.habit import HabitCategory
+from app.services.report_service import ReportService
+from datetime import date
+
+class TodayService:
+    """
+    Dados da tela inicial ("hoje") em uma única chamada: hábitos ativos com
+    categoria e registro do dia, humor do dia e situação das metas - duas
+    consultas na mesma conexão, com as categorias vindas do cache.
+    """
+
+    # Uma consulta para hábitos, registros e humor do dia; partindo de usuarios,
+    # o humor volta mesmo para quem ainda não tem hábitos ativos.
+    _TODAY_QUERY = """
+        SELECT h.id, h.nome, h.descricao, h.categoria_id, h.tipo_medicao, h.unidade, h.meta_diaria,
+               rh.id AS registro_id, rh.valor AS registro_valor, rh.concluido AS registro_concluido,
+               ah.id AS humor_id, ah.nota_humor
+        FROM usuarios u
+        LEFT JOIN habitos h ON h.usuario_id = u.id AND h.ativo = TRUE
+        LEFT JOIN registros_habitos rh ON rh.habito_id = h.id AND rh.data_registro = %s
+        LEFT JOIN avaliacoes_humor ah ON ah.usuario_id = u.id AND ah.data_avaliacao = %s
+        WHERE u.id = %s
+        ORDER BY h.nome ASC
+    """
+
+    @staticmethod
+    def get_today(user_id, today=None):
+        today = today or date.today()
+        # As metas ficam em consulta própria: juntá-las à de hábitos multiplicaria as linhas
+        with shared_connection():
+            rows = execute_query(TodayService._TODAY_QUERY, (today, today, user_id), fetch=True) or []
+            goals = ReportService.get_goal_progress(user_id, today)
+        categories = {c.id: c for c in HabitCategory.get_cached_categories()}
+
+        habits = []
+        for row in rows:
+            if row['id'] is None: # Usuário sem hábitos ativos (linha só com o humor)
+                continue
+            category = categories.get(row['categoria_id'])
+            habits.append({
+                'id': row['id'],
+                'nome': row['nome'],
+                'descricao': row['descricao'],
+                'categoria_id': row['categoria_id'],
+                'categoria_nome': category.nome if category else None,
+                'categoria_cor': category.cor if category else None,
+                'categoria_icone': category.icone if category else None,
+                'tipo_medicao': row['tipo_medicao'],
+                'unidade': row['unidade'],
+                'meta_diaria': row['meta_diaria'],
+                'registro': {
+                    'id': row['registro_id'],
+                    'valor': row['registro_valor'],
+                    'concluido': bool(row['registro_concluido'])
+                } if row['registro_id'] else None
+            })
+
+        mood = None
+        if rows and rows[0]['humor_id']:
+            mood = {'id': rows[0]['humor_id'], 'nota_humor': rows[0]['nota_humor']}
+
+        return {
+            'data': today,
+            'habitos': habits,
+            'humor': mood,
+            'metas': goals
+        }
@@ -0,0 +1,166 @@
+from flask import jsonify, request
+from app.utils.cache import LRUCache
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600}
+
+BULKHEAD_ENVIRON_KEY = 'mindtrack.admission_bulkhead'
+
+
+def parse_limits(value):
+    """'report=4,batch=4' -> {'report': 4, 'batch': 4}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        key, _, limit = item.partition('=')
+        limits[key.strip()] = int(limit)
+    return limits
+
+def parse_rate(value):
+    """'5/minute' -> (capacidade, fichas por segundo); vazio ou '0/...' desativa o limite."""
+    if not value:
+        return None
+    count, _, period = value.partition('/')
+    count = int(count)
+    if count <= 0:
+        return None
+    return count, count / PERIODS[period.strip() or 'minute']
+
+
+class Bulkhead:
+    """
+    Limite de requisições simultâneas para um grupo de rotas. Acima do limite,
+    até `max_waiting` requisições esperam por uma vaga por no máximo `timeout`
+    segundos; as demais são recusadas na hora.
+    """
+
+    def __init__(self, name, limit, max_waiting, timeout):
+        self.name = name
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(limit)
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self._slots.acquire(blocking=False):
+            return True
+        with self._lock:
+            if self._waiting >= self.max_waiting:
+                return False
+            self._waiting += 1
+        try:
+            return self._slots.acquire(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def release(self):
+        self._slots.release()
+
+
+class RateLimiter:
+    """Token bucket por chave (ex: rota + IP), com número limitado de chaves em memória."""
+
+    def __init__(self, max_keys=100000):
+        self._buckets = LRUCache(maxsize=max_keys)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate):
+        """Consome uma ficha. Retorna 0 se permitido, ou os segundos até a próxima ficha."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets.set(key, (tokens - 1, now))
+                return 0
+            self._buckets.set(key, (tokens, now))
+            return (1 - tokens) / rate
+
+
+class AdmissionController:
+    """
+    Controle de admissão por blueprint/rota, aplicado antes da rota:
+    - bulkheads: rotas caras (relatórios, lotes, sincronização) têm um número
+      máximo de execuções simultâneas por processo, de modo que não esgotam
+      as conexões do banco e as rotas baratas (login, check-ins) seguem rápidas;
+    - rate limits (token bucket) por IP e por usuário (email) em rotas sensíveis
+      como login e forgot_password;
+    - descarte de carga: o que não cabe recebe 503 (ou 429) com Retry-After.
+    """
+
+    def __init__(self):
+        self._bulkheads = {}
+        self._rate_endpoints = frozenset()
+        self._ip_rate = None
+        self._user_rate = None
+        self._limiter = RateLimiter()
+        self._retry_after = 1
+
+    def configure(self, config):
+        self._bulkheads = {
+            key: Bulkhead(key, limit, config['ADMISSION_QUEUE_SIZE'], config['ADMISSION_QUEUE_TIMEOUT'])
+            for key, limit in parse_limits(config['ADMISSION_BULKHEADS']).items() if limit > 0
+        }
+        self._rate_endpoints = frozenset(filter(None, (e.strip() for e in config['RATE_LIMIT_ENDPOINTS'].split(','))))
+        self._ip_rate = parse_rate(config['RATE_LIMIT_PER_IP'])
+        self._user_rate = parse_rate(config['RATE_LIMIT_PER_USER'])
+        self._limiter = RateLimiter(config['RATE_LIMIT_MAX_KEYS'])
+        self._retry_after = config['ADMISSION_RETRY_AFTER']
+
+    def _bulkhead_for(self, endpoint, blueprint):
+        # Uma regra para a rota ('report.export_history') tem precedência sobre a do blueprint ('report')
+        return self._bulkheads.get(endpoint) or self._bulkheads.get(blueprint)
+
+    def _rate_limit_keys(self, endpoint):
+        if self._ip_rate:
+            yield ('ip', endpoint, request.remote_addr), self._ip_rate
+        if self._user_rate:
+            data = request.get_json(silent=True)
+            email = data.get('email') if isinstance(data, dict) else None
+            if isinstance(email, str) and email.strip():
+                yield ('usuario', endpoint, email.strip().lower()), self._user_rate
+
+    def before_request(self):
+        endpoint = request.endpoint
+        if endpoint is None or request.method == 'OPTIONS':
+            return None
+
+        if endpoint in self._rate_endpoints:
+            for key, (capacity, rate) in self._rate_limit_keys(endpoint):
+                wait = self._limiter.take(key, capacity, rate)
+                if wait:
+                    return jsonify({'error': 'Muitas tentativas. Tente novamente mais tarde.'}), 429, \
+                        {'Retry-After': str(math.ceil(wait))}
+
+        bulkhead = self._bulkhead_for(endpoint, request.blueprint)
+        if bulkhead is not None:
+            if not bulkhead.acquire():
+                logger.warning(f"Requisição descartada: limite de concorrência de '{bulkhead.name}' atingido.")
+                return jsonify({'error': 'Servidor ocupado. Tente novamente em instantes.'}), 503, \
+                    {'Retry-After': str(self._retry_after)}
+            # Guardado no environ da própria requisição, não em `g`: as sub-requisições de
+            # /api/batch rodam no mesmo contexto de aplicação e compartilham o `g` do lote
+            request.environ[BULKHEAD_ENVIRON_KEY] = bulkhead
+        return None
+
+    def teardown_request(self, exc=None):
+        # Em respostas em stream (stream_with_context) roda só ao fim do stream
+        bulkhead = request.environ.pop(BULKHEAD_ENVIRON_KEY, None)
+        if bulkhead is not None:
+            bulkhead.release()
+
+
+admission = AdmissionController()
+
+def init_admission(app):
+    admission.configure(app.config)
+    app.before_request(admission.before_request)
+    app.teardown_request(admission.teardown_request)
+    return admission
@@ -0,0 +1,148 @@
+from flask import current_app, request
+from app.utils.cache import LRUCache
+import hashlib
+import zlib
+
+try:
+    import brotli # Opcional: habilita Content-Encoding 'br'
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard # Opcional: habilita Content-Encoding 'zstd'
+except ImportError:
+    zstandard = None
+
+# Tipos de conteúdo que valem a pena comprimir (texto/JSON repetitivo)
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'application/x-ndjson', 'application/msgpack', 'text/csv', 'text/plain', 'text/html',
+}
+
+# Corpos já comprimidos de respostas marcadas com @cache_compressed (relatórios pré-calculados)
+_compressed_cache = LRUCache(maxsize=256)
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31) # wbits 31 = formato gzip
+
+    def compress(self, chunk):
+        # Z_SYNC_FLUSH: cada pedaço chega ao cliente sem esperar o fim do stream
+        return self._obj.compress(chunk) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk):
+        return self._obj.process(chunk) + self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk):
+        return self._obj.compress(chunk) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+def available_encodings(config):
+    """Codificações habilitadas na configuração e com a biblioteca instalada, em ordem de preferência."""
+    installed = {'gzip': True, 'br': brotli is not None, 'zstd': zstandard is not None}
+    return [e for e in config['COMPRESSION_ALGORITHMS'] if installed.get(e)]
+
+def compress_body(body, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(body, quality=config['COMPRESSION_BROTLI_QUALITY'])
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=config['COMPRESSION_ZSTD_LEVEL']).compress(body)
+    obj = zlib.compressobj(config['COMPRESSION_GZIP_LEVEL'], zlib.DEFLATED, 31)
+    return obj.compress(body) + obj.flush()
+
+def _stream_compressor(encoding, config):
+    if encoding == 'br':
+        return _BrotliStream(config['COMPRESSION_BROTLI_QUALITY'])
+    if encoding == 'zstd':
+        return _ZstdStream(config['COMPRESSION_ZSTD_LEVEL'])
+    return _GzipStream(config['COMPRESSION_GZIP_LEVEL'])
+
+def _iter_compressed(chunks, encoding, config):
+    """Comprime uma resposta em streaming pedaço a pedaço, sem acumulá-la na memória."""
+    compressor = _stream_compressor(encoding, config)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def cache_compressed(fn):
+    """
+    Marca uma rota cujo corpo se repete entre requisições (ex: relatórios servidos
+    de snapshots): o corpo comprimido é guardado em cache e reaproveitado.
+    """
+    fn.cache_compressed = True
+    return fn
+
+def _is_cacheable():
+    view = current_app.view_functions.get(request.endpoint)
+    return bool(view is not None and getattr(view, 'cache_compressed', False))
+
+def compress_response(response):
+    """Hook after_request: comprime a resposta conforme o Accept-Encoding do cliente."""
+    config = current_app.config
+    if (not config['COMPRESSION_ENABLED']
+            or request.method == 'HEAD'
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough # Arquivos enviados com send_file
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = request.accept_encodings.best_match(available_encodings(config))
+    if not encoding:
+        return response
+
+    if response.is_streamed:
+        response.response = _iter_compressed(response.response, encoding, config)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < config['COMPRESSION_MIN_SIZE']:
+            return response
+        if _is_cacheable():
+            key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+            compressed = _compressed_cache.get(key)
+            if compressed is None:
+                compressed = compress_body(body, encoding, config)
+                _compressed_cache.set(key, compressed)
+        else:
+            compressed = compress_body(body, encoding, config)
+        response.set_data(compressed)
+
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag: # A representação comprimida é outra: o ETag não pode ser o mesmo
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
+
+def init_compression(app):
+    """Registra a compressão de respostas (gzip/brotli/zstd) na aplicação."""
+    _compressed_cache.maxsize = app.config['COMPRESSION_CACHE_SIZE']
+    app.after_request(compress_response)
@@ -1,11 +1,16 @@
 import pymysql
 from app.config import Config
+from contextlib import contextmanager
 import logging
+import threading
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Conexão compartilhada pela thread atual (ver shared_connection)
+_local = threading.local()
+
 def get_db_connection():
     """Retorna uma conexão com o banco de dados MySQL"""
     try:
@@ -24,6 +29,33 @@ def get_db_connection():
         logger.error(f"Erro ao conectar com o banco de dados: {e}")
         raise
 
+@contextmanager
+def shared_connection():
+    """
+    Faz com que todas as queries executadas no bloco (na mesma thread) usem uma
+    única conexão, em vez de abrir uma por query. Blocos aninhados reaproveitam
+    a conexão do bloco externo. stream_query continua usando conexão própria,
+    pois o cursor do lado do servidor ocupa a conexão até o fim da leitura.
+    """
+    connection = getattr(_local, 'connection', None)
+    if connection is not None:
+        yield connection
+        return
+    connection = get_db_connection()
+    _local.connection = connection
+    try:
+        yield connection
+    finally:
+        _local.connection = None
+        connection.close()
+
+def _acquire_connection():
+    """Retorna (conexão, própria): a conexão compartilhada da thread, se houver, ou uma nova."""
+    connection = getattr(_local, 'connection', None)
+    if connection is not None:
+        return connection, False
+    return get_db_connection(), True
+
 def init_db():
     """Inicializa o banco de dados e verifica a conexão"""
     try:
@@ -50,7 +82,7 @@ def execute_query(query, params=None, fetch=False):
     Returns:
         list|int: Resultados da query ou ID do último insert
     """
-    connection = get_db_connection()
+    connection, owned = _acquire_connection()
     try:
         with connection.cursor() as cursor:
             cursor.execute(query, params)
@@ -68,6 +100,67 @@ def execute_query(query, params=None, fetch=False):
     except Exception as e:
         logger.error(f"Erro ao executar query: {e}")
         raise
+    finally:
+        if owned:
+            connection.close()
+
+def execute_upsert(query, params=None):
+    """
+    Executa um INSERT ... ON DUPLICATE KEY UPDATE.
+
+    Para obter o id também quando a linha já existia, a query deve incluir
+    `id = LAST_INSERT_ID(id)` na cláusula de atualização.
+
+    Returns:
+        tuple: (id da linha, criado) - id 0 quando nenhuma linha foi inserida
+        ou atualizada (ex: INSERT ... SELECT sem resultado)
+    """
+    connection, owned = _acquire_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(query, params)
+            # rowcount: 1 = inserida, 2 = atualizada, 0 = já existia com os mesmos valores
+            return cursor.lastrowid, cursor.rowcount == 1
+    except Exception as e:
+        logger.error(f"Erro ao executar upsert: {e}")
+        raise
+    finally:
+        if owned:
+            connection.close()
+
+def stream_query(query, params=None, batch_size=None):
+    """
+    Executa uma query SELECT e retorna os resultados sob demanda (generator).
+
+    Usa um cursor do lado do servidor (SSDictCursor), sem bufferizar o
+    resultado inteiro na memória: as linhas são lidas do socket em lotes
+    de `batch_size`, mantendo o consumo de memória constante mesmo para
+    resultados muito grandes.
+
+    Args:
+        query (str): Query SQL a ser executada
+        params (tuple): Parâmetros para a query
+        batch_size (int): Quantidade de linhas lidas por vez
+
+    Yields:
+        dict: Cada linha do resultado
+    """
+    batch_size = batch_size or Config.DB_STREAM_BATCH_SIZE
+    connection = get_db_connection()
+    try:
+        # Não usamos `with connection.cursor()`: o close() do SSCursor lê
+        # todas as linhas restantes, o que anularia o ganho quando o consumidor
+        # interrompe a iteração (ex: cliente desconectou no meio do download).
+        cursor = connection.cursor(pymysql.cursors.SSDictCursor)
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+    except Exception as e:
+        logger.error(f"Erro ao executar query em streaming: {e}")
+        raise
     finally:
         connection.close()
 
@@ -82,7 +175,7 @@ def execute_many(query, params_list):
     Returns:
         int: Número de linhas afetadas
     """
-    connection = get_db_connection()
+    connection, owned = _acquire_connection()
     try:
         with connection.cursor() as cursor:
             cursor.executemany(query, params_list)
@@ -91,4 +184,5 @@ def execute_many(query, params_list):
         logger.error(f"Erro ao executar múltiplas queries: {e}")
         raise
     finally:
-        connection.close()
\ No newline at end of file
+        if owned:
+            connection.close()
\ No newline at end of file
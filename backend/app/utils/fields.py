@@ -0,0 +1,23 @@
+def parse_fields(raw_fields, allowed_fields):
+    """
+    Interpreta o parâmetro `?fields=a,b,c` (sparse fieldsets).
+    Retorna None quando não informado (todas as colunas) ou uma tupla com os
+    campos pedidos, sempre incluindo 'id'. Lança ValueError para campos desconhecidos.
+    """
+    if not raw_fields:
+        return None
+    fields = [f.strip() for f in raw_fields.split(',') if f.strip()]
+    invalid = [f for f in fields if f not in allowed_fields]
+    if invalid:
+        raise ValueError(f"Campos inválidos: {', '.join(invalid)}. Permitidos: {', '.join(allowed_fields)}.")
+    return tuple(dict.fromkeys(['id'] + fields)) # Remove duplicados preservando a ordem
+
+def select_list(fields, expressions):
+    """
+    Monta a lista de colunas de um SELECT a partir dos campos pedidos.
+    `expressions` mapeia cada campo da resposta para sua expressão SQL (ex: 'h.nome').
+    """
+    return ', '.join(
+        expressions[f] if expressions[f].endswith(f'.{f}') or expressions[f] == f else f"{expressions[f]} AS {f}"
+        for f in fields
+    )
@@ -0,0 +1,80 @@
+from functools import wraps
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from app.utils.cache import LRUCache
+import hashlib
+import threading
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+# Respostas de escritas já executadas, por (usuário, método, caminho, chave)
+_responses = LRUCache(maxsize=10000, ttl=24 * 3600)
+
+# Escritas em andamento: cache_key -> Event sinalizado quando a resposta estiver guardada
+_pending = {}
+_pending_lock = threading.Lock()
+_wait_seconds = 10
+
+def _replay(cached, fingerprint):
+    cached_fingerprint, status, mimetype, body = cached
+    if cached_fingerprint != fingerprint:
+        return jsonify({'error': f'{IDEMPOTENCY_HEADER} já utilizada com outro conteúdo.'}), 422
+    response = current_app.response_class(body, status=status, mimetype=mimetype)
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+def idempotent(fn):
+    """
+    Decorator para rotas de escrita: quando o cliente envia o cabeçalho
+    Idempotency-Key, a primeira resposta (status < 500) é guardada e as
+    repetições com a mesma chave a recebem de volta sem executar a escrita.
+    Reusar a chave com outro corpo é um erro (422). Deve ficar abaixo de @jwt_required.
+    Uma repetição que chega enquanto a original ainda executa (ex: timeout do
+    cliente móvel) espera até IDEMPOTENCY_WAIT_SECONDS pela resposta dela, e
+    recebe 409 se a original ainda não terminou ou falhou com erro 5xx.
+    O cache é por processo: uma repetição atendida por outro worker executa a
+    escrita de novo.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return fn(*args, **kwargs)
+        if len(key) > 255:
+            return jsonify({'error': f'{IDEMPOTENCY_HEADER} deve ter no máximo 255 caracteres.'}), 400
+
+        cache_key = (str(get_jwt_identity()), request.method, request.path, key, request.headers.get('Accept'))
+        fingerprint = hashlib.blake2b(request.get_data(), digest_size=16).digest()
+        with _pending_lock:
+            cached = _responses.get(cache_key)
+            pending = _pending.get(cache_key) if cached is None else None
+            owner = cached is None and pending is None
+            if owner: # Reserva a chave antes de executar a escrita
+                pending = _pending[cache_key] = threading.Event()
+
+        if not owner and cached is None:
+            pending.wait(_wait_seconds)
+            cached = _responses.get(cache_key)
+            if cached is None:
+                response = jsonify({'error': f'Requisição com esta {IDEMPOTENCY_HEADER} ainda em andamento.'})
+                response.headers['Retry-After'] = '1'
+                return response, 409
+        if cached is not None:
+            return _replay(cached, fingerprint)
+
+        try:
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code < 500 and not response.is_streamed:
+                _responses.set(cache_key, (fingerprint, response.status_code, response.mimetype, response.get_data()))
+            return response
+        finally:
+            with _pending_lock:
+                del _pending[cache_key]
+            pending.set()
+    return wrapper
+
+def init_idempotency(app):
+    global _wait_seconds
+    _responses.maxsize = app.config['IDEMPOTENCY_CACHE_SIZE']
+    _responses.ttl = app.config['IDEMPOTENCY_TTL']
+    _wait_seconds = app.config['IDEMPOTENCY_WAIT_SECONDS']
@@ -1,9 +1,161 @@
 # A maioria das funcionalidades JWT é tratada diretamente por flask_jwt_extended.
-# Este arquivo pode ser usado para funções auxiliares se a complexidade aumentar,
-# por exemplo:
-# - Gerenciar tokens de refresh
-# - Adicionar claims customizados aos tokens
-# - Implementar um mecanismo de blacklist de tokens
-
-# Por enquanto, a funcionalidade básica de JWT é coberta pelas rotas de autenticação
-# e pelos decorators de jwt_required.
\ No newline at end of file
+# Este arquivo reúne as funções auxiliares, por enquanto a revogação de tokens
+# (blacklist por jti) usada no logout.
+
+from app.utils.database import execute_query
+from datetime import datetime, timezone
+import hashlib
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom em um bytearray. `in` responde "talvez" (pode haver falso
+    positivo, na taxa configurada) ou "com certeza não" - o caso comum de um
+    token válido é decidido sem lock e sem consultar nenhuma estrutura maior.
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        # Double hashing (Kirsch-Mitzenmacher): k posições a partir de um único digest
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class TokenRevocationList:
+    """
+    Lista de tokens revogados (por jti) mantida em memória em cada processo:
+    um filtro de Bloom decide a maioria das verificações e só os "talvez"
+    consultam o conjunto exato. A tabela 'tokens_revogados' é a fonte da
+    verdade; uma thread de fundo traz as revogações feitas por outros workers
+    a cada JWT_REVOCATION_SYNC_SECONDS, então nenhuma requisição autenticada
+    faz ida ao banco para checar revogação.
+    """
+
+    def __init__(self):
+        self._revoked = {} # jti -> expiração (timestamp UTC)
+        self._bloom = None
+        self._cursor = 0 # Último id de tokens_revogados já carregado
+        self._lock = threading.RLock()
+        self._thread = None
+        self._sync_seconds = 5
+        self._capacity = 100000
+        self._error_rate = 0.001
+
+    def configure(self, sync_seconds, capacity, error_rate):
+        self._sync_seconds = sync_seconds
+        self._capacity = capacity
+        self._error_rate = error_rate
+
+    def _ensure_started(self):
+        # Carga inicial e thread de sincronização na primeira verificação (depois do fork dos workers)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._bloom is None:
+                    self._rebuild()
+                    self._sync()
+                self._thread = threading.Thread(target=self._run, name='mindtrack-revogacoes', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self._sync_seconds)
+            self._sync()
+
+    def _sync(self):
+        """Traz as revogações novas do banco e descarta as de tokens já expirados."""
+        try:
+            rows = execute_query(
+                """SELECT id, jti, data_expiracao FROM tokens_revogados
+                   WHERE id > %s AND data_expiracao > UTC_TIMESTAMP() ORDER BY id""",
+                (self._cursor,), fetch=True
+            )
+        except Exception as e:
+            logger.error(f"Erro ao sincronizar tokens revogados: {e}")
+            return
+        with self._lock:
+            for row in rows:
+                self._add(row['jti'], row['data_expiracao'].replace(tzinfo=timezone.utc).timestamp())
+                self._cursor = max(self._cursor, row['id'])
+
+            now = time.time()
+            expired = [jti for jti, expires_at in self._revoked.items() if expires_at <= now]
+            if expired:
+                for jti in expired:
+                    del self._revoked[jti]
+                self._rebuild() # Bloom não remove itens: recria só com os que ainda valem
+
+    def _rebuild(self):
+        bloom = BloomFilter(max(self._capacity, len(self._revoked) * 2), self._error_rate)
+        for jti in self._revoked:
+            bloom.add(jti)
+        self._bloom = bloom
+
+    def _add(self, jti, expires_at):
+        self._revoked[jti] = expires_at
+        self._bloom.add(jti)
+        if len(self._revoked) > self._capacity:
+            # Mais itens que o dimensionado: recria o filtro maior para manter a taxa de erro
+            self._capacity = len(self._revoked) * 2
+            self._rebuild()
+
+    def is_revoked(self, jti):
+        self._ensure_started()
+        if jti not in self._bloom:
+            return False
+        with self._lock:
+            return jti in self._revoked
+
+    def revoke(self, jti, user_id, expires_at):
+        """Revoga o token: vale na hora neste processo e, nos demais, após a próxima sincronização."""
+        self._ensure_started()
+        execute_query(
+            """INSERT IGNORE INTO tokens_revogados (jti, usuario_id, data_expiracao)
+               VALUES (%s, %s, %s)""",
+            (jti, user_id, datetime.fromtimestamp(expires_at, timezone.utc).replace(tzinfo=None))
+        )
+        with self._lock:
+            self._add(jti, expires_at)
+
+
+revoked_tokens = TokenRevocationList()
+
+def revoke_token(jwt_payload, user_id):
+    """Revoga o token descrito por `jwt_payload` (claims de get_jwt())."""
+    revoked_tokens.revoke(jwt_payload['jti'], user_id, jwt_payload.get('exp') or time.time())
+
+def init_token_revocation(app, jwt):
+    config = app.config
+    revoked_tokens.configure(
+        config['JWT_REVOCATION_SYNC_SECONDS'],
+        config['JWT_REVOCATION_BLOOM_CAPACITY'],
+        config['JWT_REVOCATION_BLOOM_ERROR_RATE']
+    )
+
+    @jwt.token_in_blocklist_loader
+    def check_if_token_revoked(jwt_header, jwt_payload):
+        return revoked_tokens.is_revoked(jwt_payload['jti'])
+
+    return revoked_tokens
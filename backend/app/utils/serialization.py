@@ -0,0 +1,124 @@
+from flask import Request, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from datetime import date, datetime
+from decimal import Decimal
+import json
+
+try:
+    import orjson # Opcional: serialização JSON bem mais rápida (com suporte nativo a date/datetime)
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack # Opcional: habilita respostas/corpos em MessagePack (Accept/Content-Type application/msgpack)
+except ImportError:
+    msgpack = None
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_MIMETYPES = (MSGPACK_MIMETYPE, 'application/x-msgpack')
+
+def json_default(value):
+    """Serializa tipos vindos do banco (datas e DECIMAL) que o módulo json não conhece."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+def dumps_bytes(obj, default=json_default):
+    """Converte um objeto (dicts/listas com linhas do banco) em JSON codificado em UTF-8."""
+    if orjson:
+        return orjson.dumps(obj, default=default, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def dumps(obj):
+    """Converte um objeto (dicts/listas com linhas do banco) em uma string JSON."""
+    return dumps_bytes(obj).decode('utf-8')
+
+def loads(data):
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def msgpack_default(value):
+    """
+    Tipos do banco em MessagePack: datetime vira o tipo Timestamp nativo do formato
+    (extensão -1), date vira 'YYYY-MM-DD' e Decimal vira float.
+    """
+    if isinstance(value, datetime):
+        return msgpack.Timestamp.from_unix(value.timestamp())
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+def dumps_msgpack(obj):
+    return msgpack.packb(obj, default=msgpack_default, use_bin_type=True, datetime=False)
+
+def loads_msgpack(data):
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+def wants_msgpack():
+    """True quando o cliente prefere MessagePack a JSON no cabeçalho Accept."""
+    if msgpack is None or not has_request_context():
+        return False
+    return request.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES) in MSGPACK_MIMETYPES
+
+
+class ApiRequest(Request):
+    """
+    Request da aplicação: get_json() também aceita corpos em MessagePack, de modo
+    que as rotas tratam JSON e MessagePack da mesma forma.
+    """
+
+    def get_json(self, force=False, silent=False, cache=True):
+        if msgpack is None or self.mimetype not in MSGPACK_MIMETYPES:
+            return super().get_json(force=force, silent=silent, cache=cache)
+        try:
+            return loads_msgpack(self.get_data(cache=cache))
+        except Exception as e:
+            if silent:
+                return None
+            return self.on_json_loading_failed(e)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Provider JSON da aplicação: usa orjson quando instalado e trata nativamente
+    date/datetime (ISO 8601) e Decimal (float), de modo que os modelos podem
+    entregar os valores do banco sem conversões campo a campo.
+    Sem orjson, recai no json da stdlib com as mesmas regras de conversão.
+    """
+
+    @staticmethod
+    def default(value):
+        if isinstance(value, (date, datetime, Decimal)):
+            return json_default(value)
+        return DefaultJSONProvider.default(value)
+
+    def dumps(self, obj, **kwargs):
+        if orjson and not kwargs:
+            return dumps_bytes(obj, self.default).decode('utf-8')
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        # Negociação de conteúdo: todas as rotas que usam jsonify respondem em MessagePack se pedido
+        if wants_msgpack():
+            obj = self._prepare_response_obj(args, kwargs)
+            response = self._app.response_class(dumps_msgpack(obj), mimetype=MSGPACK_MIMETYPE)
+        elif orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            response = super().response(*args, **kwargs)
+        else:
+            obj = self._prepare_response_obj(args, kwargs)
+            response = self._app.response_class(dumps_bytes(obj, self.default) + b"\n", mimetype=self.mimetype)
+        if msgpack is not None:
+            response.vary.add('Accept') # O formato depende do cabeçalho Accept
+        return response
@@ -0,0 +1,59 @@
+from flask import abort, current_app, request
+from werkzeug.security import safe_join
+from werkzeug.utils import send_file
+import mimetypes
+import os
+import re
+
+# Nomes endereçados pelo conteúdo ('<sha256>.png', '<sha256>_thumb.webp'): o conteúdo nunca muda
+CONTENT_ADDRESSED_NAME = re.compile(r'^(?P<digest>[0-9a-f]{64})(?P<suffix>_[a-z0-9]+)?\.[a-z0-9]+$')
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+def _etag_for(path, filename):
+    """ETag forte: o próprio hash para arquivos endereçados pelo conteúdo; senão, mtime + tamanho."""
+    match = CONTENT_ADDRESSED_NAME.match(os.path.basename(filename))
+    if match:
+        return match.group('digest') + (match.group('suffix') or ''), True
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}", False
+
+def send_upload(filename):
+    """
+    Serve um arquivo de upload da pasta local.
+
+    Conforme UPLOAD_SERVE_MODE:
+    - 'x-accel': responde só os cabeçalhos com X-Accel-Redirect e o Nginx envia
+      o arquivo (location interna UPLOAD_ACCEL_PREFIX);
+    - 'x-sendfile': idem com X-Sendfile (Apache mod_xsendfile, lighttpd);
+    - 'direct': o próprio Flask envia, com suporte a Range e respostas 304; o
+      corpo usa o wsgi.file_wrapper, que no gunicorn usa sendfile() (zero-copy).
+    Arquivos endereçados pelo conteúdo recebem Cache-Control immutable de um ano.
+    """
+    root = os.path.join(current_app.root_path, current_app.config['UPLOAD_FOLDER'])
+    path = safe_join(root, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    etag, immutable = _etag_for(path, filename)
+    max_age = IMMUTABLE_MAX_AGE if immutable else current_app.config['UPLOAD_CACHE_MAX_AGE']
+    mode = current_app.config['UPLOAD_SERVE_MODE']
+
+    if mode == 'x-accel':
+        response = current_app.response_class(mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = f"{current_app.config['UPLOAD_ACCEL_PREFIX'].rstrip('/')}/{filename}"
+        response.set_etag(etag)
+        # 304 respondido aqui mesmo, sem acionar o Nginx
+        response.make_conditional(request)
+        if response.status_code == 304:
+            del response.headers['X-Accel-Redirect']
+    else:
+        # Em 'x-sendfile', send_file não lê o arquivo: só adiciona o cabeçalho X-Sendfile
+        response = send_file(path, request.environ, conditional=True, etag=etag, max_age=max_age,
+                             use_x_sendfile=mode == 'x-sendfile', response_class=current_app.response_class)
+
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if immutable:
+        response.cache_control.immutable = True
+    return response
@@ -0,0 +1,148 @@
+from app.utils.cache import LRUCache
+import os
+
+try:
+    import boto3 # Opcional: armazenamento dos uploads em um object store compatível com S3
+except ImportError:
+    boto3 = None
+
+
+def content_key(digest, extension, suffix=''):
+    """
+    Chave de um arquivo endereçado pelo conteúdo, distribuída em dois níveis de
+    subdiretórios pelo prefixo do hash ('ab/cd/abcd...png'): cada diretório fica
+    com poucos arquivos mesmo com milhões de uploads.
+    """
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{suffix}.{extension}"
+
+
+class StorageBackend:
+    """
+    Interface de armazenamento dos uploads, por chave. Os arquivos são imutáveis:
+    uma chave nunca muda de conteúdo, só é criada ou removida.
+    """
+
+    def put(self, key, path):
+        """Armazena o arquivo local `path` na chave (o arquivo local é consumido)."""
+        raise NotImplementedError
+
+    def open(self, key):
+        """Abre o conteúdo para leitura (objeto de arquivo binário)."""
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def url(self, key):
+        raise NotImplementedError
+
+    def local_path(self, key):
+        """Caminho no disco local, ou None se o backend não é local."""
+        return None
+
+    @property
+    def temp_dir(self):
+        """Diretório para os arquivos temporários a armazenar (None = o padrão do sistema)."""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Arquivos em disco, sob `root`, servidos pela própria API (ou pelo Nginx) em `url_prefix`."""
+
+    def __init__(self, root, url_prefix):
+        self.root = root
+        self.url_prefix = url_prefix.rstrip('/')
+
+    @property
+    def temp_dir(self):
+        # No mesmo sistema de arquivos que o destino, para o os.replace de put() ser atômico
+        path = os.path.join(self.root, 'tmp')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def local_path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def put(self, key, path):
+        target = self.local_path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target) # Atômico no mesmo sistema de arquivos
+
+    def open(self, key):
+        return open(self.local_path(key), 'rb')
+
+    def exists(self, key):
+        return os.path.exists(self.local_path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self.local_path(key))
+        except FileNotFoundError:
+            pass
+
+    def url(self, key):
+        return f"{self.url_prefix}/{key}"
+
+
+class S3Storage(StorageBackend):
+    """Object store compatível com S3; as URLs apontam para `public_url` (bucket público ou CDN)."""
+
+    def __init__(self, bucket, prefix='', public_url='', endpoint_url=None):
+        if boto3 is None:
+            raise RuntimeError("UPLOAD_STORAGE=s3 requer o pacote boto3.")
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.public_url = public_url.rstrip('/')
+        self._client = boto3.client('s3', endpoint_url=endpoint_url or None)
+        self._known = LRUCache(maxsize=10000) # Chaves confirmadas: conteúdo imutável, só some na coleta
+
+    def _object_key(self, key):
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key, path):
+        extra = {'CacheControl': 'public, max-age=31536000, immutable'}
+        self._client.upload_file(path, self.bucket, self._object_key(key), ExtraArgs=extra)
+        os.remove(path)
+        self._known.set(key, True)
+
+    def open(self, key):
+        return self._client.get_object(Bucket=self.bucket, Key=self._object_key(key))['Body']
+
+    def exists(self, key):
+        if self._known.get(key):
+            return True
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except self._client.exceptions.ClientError:
+            return False
+        self._known.set(key, True)
+        return True
+
+    def delete(self, key):
+        self._known.delete(key)
+        self._client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def url(self, key):
+        return f"{self.public_url}/{self._object_key(key)}"
+
+
+_storage = None
+
+def get_storage():
+    return _storage
+
+def init_storage(app):
+    """Cria o backend de armazenamento configurado (UPLOAD_STORAGE = 'local' ou 's3')."""
+    global _storage
+    config = app.config
+    if config['UPLOAD_STORAGE'] == 's3':
+        _storage = S3Storage(config['UPLOAD_S3_BUCKET'], config['UPLOAD_S3_PREFIX'],
+                             config['UPLOAD_PUBLIC_URL'], config.get('UPLOAD_S3_ENDPOINT'))
+    else:
+        root = os.path.join(app.root_path, config['UPLOAD_FOLDER'])
+        os.makedirs(root, exist_ok=True)
+        _storage = LocalStorage(root, config.get('UPLOAD_PUBLIC_URL') or f"/{config['UPLOAD_FOLDER']}")
+    return _storage
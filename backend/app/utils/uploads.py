@@ -1,45 +1,127 @@
+import hashlib
 import os
-import uuid
-from flask import current_app
-from werkzeug.utils import secure_filename
+import tempfile
+from datetime import datetime, timedelta
 from app.config import Config
+from app.models.stored_file import StoredFile
+from app.services.image_service import ImageService, InvalidImage, parse_sizes
+from app.utils.storage import content_key, get_storage
+
+CHUNK_SIZE = 64 * 1024
 
 def allowed_file(filename):
     """Verifica se a extensão do arquivo é permitida."""
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
 
+def _stream_to_disk(file, path, max_bytes):
+    """
+    Copia o upload para `path` em blocos, sem carregá-lo inteiro na memória,
+    calculando o hash do conteúdo na mesma passada. Retorna (sha256, tamanho).
+    """
+    digest = hashlib.sha256()
+    written = 0
+    with open(path, 'wb') as out:
+        while True:
+            chunk = file.stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > max_bytes:
+                raise InvalidImage(f"Arquivo maior que o limite de {max_bytes // (1024 * 1024)} MB.")
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest(), written
+
 def save_profile_picture(file, user_id):
     """
-    Salva uma foto de perfil no sistema de arquivos.
-    Retorna o nome do arquivo salvo no servidor.
+    Salva uma foto de perfil no armazenamento de uploads.
+    O upload é gravado em disco em blocos, decodificado e verificado, e
+    armazenado pelo hash do conteúdo: a mesma imagem enviada de novo (por
+    qualquer usuário) reaproveita o arquivo e as variantes já existentes,
+    ganhando apenas uma referência. As variantes redimensionadas são geradas
+    em segundo plano. Retorna a chave do arquivo (ex: 'ab/cd/<hash>.png'),
+    com uma referência que deve ser liberada com release_profile_picture.
     """
     if file.filename == '':
         raise ValueError("Nenhum arquivo selecionado.")
-    
+
     if file and allowed_file(file.filename):
-        # Garante que o diretório de upload existe
-        upload_path = os.path.join(current_app.root_path, Config.UPLOAD_FOLDER)
-        os.makedirs(upload_path, exist_ok=True)
-
-        # Gera um nome de arquivo único para evitar colisões
-        filename = secure_filename(file.filename)
-        unique_filename = f"{uuid.uuid4()}_{user_id}_{filename}"
-        file_path = os.path.join(upload_path, unique_filename)
-        file.save(file_path)
-        return unique_filename
+        storage = get_storage()
+        fd, tmp_path = tempfile.mkstemp(suffix='.upload', dir=storage.temp_dir)
+        os.close(fd)
+        try:
+            digest, size = _stream_to_disk(file, tmp_path, Config.PROFILE_PICTURE_MAX_BYTES)
+            # A extensão vem do formato real da imagem, não do nome enviado
+            key = content_key(digest, ImageService.verify(tmp_path))
+
+            # Referência antes de gravar: a coleta de órfãos nunca apaga um arquivo com referências
+            StoredFile.add_reference(key, size)
+            try:
+                if not storage.exists(key):
+                    storage.put(key, tmp_path)
+            except Exception:
+                StoredFile.release(key)
+                raise
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        # Conteúdo novo (ou variantes que falharam antes): gera as variantes
+        if not StoredFile.variants_ready(key):
+            ImageService.build_variants_in_background(key, storage, on_done=StoredFile.mark_variants_ready)
+        return key
     else:
         raise ValueError("Tipo de arquivo não permitido.")
 
-def get_profile_picture_url(filename):
+def release_profile_picture(key):
+    """Libera a referência de uma foto substituída (o arquivo é apagado pela coleta de órfãos)."""
+    StoredFile.release(key)
+
+def get_profile_picture_url(filename, size=None, image_format='webp', variants_ready=False):
     """
-    Retorna a URL completa para uma foto de perfil.
-    Assumindo que o Flask servirá arquivos estáticos do UPLOAD_FOLDER.
+    Retorna a URL de uma foto de perfil: a variante `size` (ex: 'thumb',
+    'medium') no formato pedido, se as variantes já foram geradas
+    (arquivos.variantes_prontas), ou o arquivo original. As chaves das
+    variantes são determinísticas: nenhuma consulta ao armazenamento é feita.
     """
     if filename:
-        # Você precisará configurar o Flask para servir arquivos estáticos
-        # de Config.UPLOAD_FOLDER. Isso geralmente é feito no app.py ou
-        # por um servidor web como Nginx em produção.
-        # Por enquanto, apenas um placeholder ou caminho relativo.
-        return f"/uploads/profile_pics/{filename}"
-    return None
\ No newline at end of file
+        storage = get_storage()
+        if size and variants_ready:
+            return storage.url(ImageService.variant_key(filename, size, image_format))
+        # Original (variantes ainda em processamento ou fotos anteriores ao redimensionamento)
+        return storage.url(filename)
+    return None
+
+def get_profile_picture_urls(filename, variants_ready=False, image_format='webp'):
+    """URLs de todas as variantes configuradas, por tamanho (para o cliente escolher)."""
+    if not filename:
+        return None
+    urls = {size: get_profile_picture_url(filename, size, image_format, variants_ready)
+            for size in parse_sizes(Config.PROFILE_PICTURE_SIZES)}
+    urls['original'] = get_profile_picture_url(filename)
+    return urls
+
+def collect_orphan_files():
+    """
+    Job diário: apaga do armazenamento os arquivos (original e variantes) que
+    estão sem referências há mais de UPLOAD_GC_GRACE_HOURS. Retorna quantos
+    arquivos foram removidos.
+    """
+    storage = get_storage()
+
+    def remove_files(key):
+        for variant in ImageService.variant_keys(key):
+            storage.delete(variant)
+        storage.delete(key)
+
+    older_than = datetime.now() - timedelta(hours=Config.UPLOAD_GC_GRACE_HOURS)
+    removed = 0
+    while True:
+        orphans = StoredFile.get_orphans(older_than, Config.UPLOAD_GC_BATCH_SIZE)
+        for key in orphans:
+            if StoredFile.delete_if_orphan(key, remove_files):
+                removed += 1
+        if len(orphans) < Config.UPLOAD_GC_BATCH_SIZE:
+            break
+    return {'arquivos_removidos': removed}
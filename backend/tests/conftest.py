@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+# Permite importar o pacote `app` rodando `python -m pytest` a partir de backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config
+
+
+@pytest.fixture
+def make_app():
+    """
+    Cria uma aplicação Flask mínima com a configuração do projeto (sem banco de
+    dados, agendador nem serviços de fundo); cada teste registra o que precisa.
+    """
+    def factory(**overrides):
+        app = Flask(__name__)
+        app.config.from_object(Config)
+        app.config.update(TESTING=True, JWT_SECRET_KEY='chave-de-teste-com-mais-de-32-bytes!', **overrides)
+        JWTManager(app)
+        return app
+    return factory
+
+
+@pytest.fixture
+def auth_headers():
+    def factory(app, user_id=1):
+        with app.app_context():
+            token = create_access_token(identity=str(user_id))
+        return {'Authorization': f'Bearer {token}'}
+    return factory
@@ -0,0 +1,60 @@
+from contextlib import nullcontext
+
+from flask import Blueprint, jsonify
+
+from app.routes.batch import batch_bp
+from app.services import batch_service
+from app.utils.admission import AdmissionController, Bulkhead
+
+
+def _app_with_admission(make_app, monkeypatch, bulkheads):
+    monkeypatch.setattr(batch_service, 'shared_connection', nullcontext)
+    app = make_app(ADMISSION_BULKHEADS=bulkheads, ADMISSION_QUEUE_SIZE=0, ADMISSION_QUEUE_TIMEOUT=0)
+
+    report_bp = Blueprint('report', __name__)
+
+    @report_bp.route('/summary')
+    def summary():
+        return jsonify({'ok': True})
+
+    controller = AdmissionController()
+    controller.configure(app.config)
+    app.before_request(controller.before_request)
+    app.teardown_request(controller.teardown_request)
+    app.register_blueprint(report_bp, url_prefix='/api/reports')
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
+    return app, controller
+
+
+def test_bulkhead_rejects_when_full():
+    bulkhead = Bulkhead('report', limit=1, max_waiting=0, timeout=0)
+    assert bulkhead.acquire()
+    assert not bulkhead.acquire()
+    bulkhead.release()
+    assert bulkhead.acquire()
+
+
+def test_batch_sub_request_releases_both_bulkheads(make_app, auth_headers, monkeypatch):
+    app, controller = _app_with_admission(make_app, monkeypatch, 'report=1,batch=1')
+    client = app.test_client()
+    headers = auth_headers(app)
+
+    # Mais chamadas que as vagas: se alguma vaga vazasse, as seguintes receberiam 503
+    for _ in range(5):
+        response = client.post('/api/batch', headers=headers,
+                               json={'requests': [{'id': 'r', 'path': '/api/reports/summary'}]})
+        assert response.status_code == 200
+        assert response.get_json()['responses'][0]['status'] == 200
+
+    for name in ('report', 'batch'):
+        bulkhead = controller._bulkheads[name]
+        assert bulkhead.acquire()
+        bulkhead.release()
+
+
+def test_bulkhead_full_returns_503(make_app, monkeypatch):
+    app, controller = _app_with_admission(make_app, monkeypatch, 'report=1')
+    controller._bulkheads['report'].acquire()
+    response = app.test_client().get('/api/reports/summary')
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
@@ -0,0 +1,41 @@
+import pytest
+
+from app.routes import auth
+from app.routes.auth import auth_bp
+
+
+@pytest.fixture
+def app(make_app, monkeypatch):
+    app = make_app(JWT_TOKEN_LOCATION=['headers', 'cookies'])
+    app.register_blueprint(auth_bp)
+    app.logouts = []
+    monkeypatch.setattr(auth.SessionService, 'record_logout', staticmethod(app.logouts.append))
+    return app
+
+
+def _cleared_cookies(response):
+    return [header for header in response.headers.getlist('Set-Cookie') if header.startswith('access_token_cookie=;')]
+
+
+def test_logout_revokes_token_and_clears_cookie(app, auth_headers, monkeypatch):
+    revoked = []
+    monkeypatch.setattr(auth, 'revoke_token', lambda payload, user_id: revoked.append(user_id))
+
+    response = app.test_client().post('/logout', headers=auth_headers(app))
+
+    assert response.status_code == 200
+    assert revoked == ['1'] and app.logouts == ['1']
+    assert _cleared_cookies(response)
+
+
+def test_logout_still_clears_cookie_when_revocation_fails(app, auth_headers, monkeypatch):
+    def revoke_token(payload, user_id):
+        raise ConnectionError('banco indisponível')
+
+    monkeypatch.setattr(auth, 'revoke_token', revoke_token)
+
+    response = app.test_client().post('/logout', headers=auth_headers(app))
+
+    assert response.status_code == 200
+    assert app.logouts == ['1']
+    assert _cleared_cookies(response)
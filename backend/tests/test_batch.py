@@ -0,0 +1,59 @@
+import itertools
+from contextlib import nullcontext
+
+import pytest
+from flask import Blueprint, Response, jsonify, stream_with_context
+
+from app.routes.batch import batch_bp
+from app.routes.events import events_bp
+from app.services import batch_service
+from app.services.batch_service import BatchService
+from app.services.events import events
+
+
+@pytest.fixture
+def batch_app(make_app, monkeypatch):
+    monkeypatch.setattr(batch_service, 'shared_connection', nullcontext)
+    app = make_app()
+
+    misc_bp = Blueprint('misc', __name__)
+
+    @misc_bp.route('/json')
+    def json_route():
+        return jsonify({'ok': True})
+
+    @misc_bp.route('/infinite')
+    def infinite_route():
+        # Nunca termina: se o lote tentasse ler o corpo, o teste travaria
+        return Response(stream_with_context(str(i) for i in itertools.count()), mimetype='text/plain')
+
+    app.register_blueprint(misc_bp, url_prefix='/api/misc')
+    app.register_blueprint(events_bp, url_prefix='/api/events')
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
+    return app
+
+
+def _run_batch(app, headers, paths):
+    response = app.test_client().post('/api/batch', headers=headers, json={
+        'requests': [{'id': str(i), 'path': path} for i, path in enumerate(paths)]
+    })
+    assert response.status_code == 200
+    return response.get_json()['responses']
+
+
+def test_streaming_sub_requests_are_rejected_per_item(batch_app, auth_headers):
+    responses = _run_batch(batch_app, auth_headers(batch_app),
+                           ['/api/misc/json', '/api/events/stream', '/api/misc/infinite'])
+    assert [r['status'] for r in responses] == [200, 400, 400]
+    assert responses[0]['body'] == {'ok': True}
+    # A rota SSE é barrada antes de rodar: nenhuma assinatura fica aberta
+    assert not events._subscribers
+
+
+def test_validate_rejects_nested_batch():
+    with pytest.raises(ValueError):
+        BatchService.validate([{'path': '/api/batch'}], 10)
+    with pytest.raises(ValueError):
+        BatchService.validate([{'path': '/outside'}], 10)
+    with pytest.raises(ValueError):
+        BatchService.validate([{'path': '/api/habits/'}] * 3, 2)
@@ -0,0 +1,94 @@
+import gzip
+
+import pytest
+from flask import Response, jsonify, request, send_file, stream_with_context
+
+from app.utils import compression
+from app.utils.compression import init_compression
+
+LARGE = {'registros': [{'id': i, 'habito_nome': 'Beber água', 'concluido': True} for i in range(200)]}
+
+
+@pytest.fixture
+def app(make_app, tmp_path):
+    app = make_app(COMPRESSION_ALGORITHMS=['gzip'], COMPRESSION_MIN_SIZE=1024)
+    image = tmp_path / 'foto.png'
+    image.write_bytes(b'\x89PNG' + b'\0' * 4096)
+
+    @app.route('/large')
+    def large():
+        response = jsonify(LARGE)
+        response.set_etag('abc')
+        return response.make_conditional(request)
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/file')
+    def file():
+        return send_file(image)
+
+    @app.route('/encoded')
+    def encoded():
+        return Response(gzip.compress(b'x' * 4096), mimetype='text/plain', headers={'Content-Encoding': 'gzip'})
+
+    @app.route('/stream')
+    def stream():
+        return Response(stream_with_context(f'linha {i}\n' for i in range(1000)), mimetype='application/x-ndjson')
+
+    init_compression(app)
+    return app
+
+
+def _get(app, path, encoding='gzip', **kwargs):
+    return app.test_client().get(path, headers={'Accept-Encoding': encoding}, **kwargs)
+
+
+def test_large_json_is_gzipped_with_distinct_etag(app):
+    response = _get(app, '/large')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    # ETag por codificação: caches não confundem a versão comprimida com a original
+    assert response.get_etag() == ('abc-gzip', False)
+    assert gzip.decompress(response.get_data()) == _get(app, '/large', encoding='identity').get_data()
+
+
+@pytest.mark.parametrize('path', ['/small', '/file'])
+def test_small_bodies_and_files_are_not_compressed(app, path):
+    # Corpo abaixo de COMPRESSION_MIN_SIZE, ou arquivo com send_file (direct_passthrough, PNG)
+    assert 'Content-Encoding' not in _get(app, path).headers
+
+
+def test_already_encoded_response_is_not_compressed_twice(app):
+    response = _get(app, '/encoded')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == b'x' * 4096
+
+
+def test_head_and_not_modified_are_not_compressed(app):
+    head = app.test_client().head('/large', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in head.headers
+    response = app.test_client().get('/large', headers={'Accept-Encoding': 'gzip', 'If-None-Match': '"abc"'})
+    assert response.status_code == 304
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_client_without_accept_encoding_gets_identity(app):
+    response = _get(app, '/large', encoding='identity')
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_json() == LARGE
+
+
+def test_streamed_response_is_compressed_incrementally(app):
+    response = _get(app, '/stream', buffered=False)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    body = b''.join(response.response)
+    assert gzip.decompress(body).decode() == ''.join(f'linha {i}\n' for i in range(1000))
+
+
+def test_encoding_preference_follows_configuration():
+    config = {'COMPRESSION_ALGORITHMS': ['br', 'zstd', 'gzip']}
+    expected = [name for name, lib in (('br', compression.brotli), ('zstd', compression.zstandard)) if lib]
+    assert compression.available_encodings(config) == expected + ['gzip']
@@ -0,0 +1,130 @@
+import pymysql
+import pytest
+
+from app.utils import database
+
+
+class FakeCursor:
+    def __init__(self, connection, cursor_class=None):
+        self.connection = connection
+        self.cursor_class = cursor_class
+        self.rowcount = 0
+        self.lastrowid = 0
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.connection.executed.append((query, params))
+        self._rows = list(self.connection.rows)
+        self.rowcount, self.lastrowid = self.connection.result
+
+    def fetchmany(self, size):
+        self.connection.fetch_sizes.append(size)
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+
+class FakeConnection:
+    def __init__(self, rows=(), result=(0, 0)):
+        self.rows = rows
+        self.result = result
+        self.executed = []
+        self.fetch_sizes = []
+        self.cursor_classes = []
+        self.closed = False
+
+    def cursor(self, cursor_class=None):
+        self.cursor_classes.append(cursor_class)
+        return FakeCursor(self, cursor_class)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """Cada chamada a get_db_connection devolve a próxima conexão falsa da lista."""
+    pool = []
+    opened = []
+
+    def get_db_connection():
+        connection = pool.pop(0)
+        opened.append(connection)
+        return connection
+
+    monkeypatch.setattr(database, 'get_db_connection', get_db_connection)
+    return pool, opened
+
+
+def test_stream_query_reads_server_side_in_batches(connections):
+    pool, _ = connections
+    connection = FakeConnection(rows=[{'id': i} for i in range(5)])
+    pool.append(connection)
+
+    rows = list(database.stream_query("SELECT id FROM registros_habitos", batch_size=2))
+
+    assert rows == [{'id': i} for i in range(5)]
+    assert connection.cursor_classes == [pymysql.cursors.SSDictCursor]
+    assert connection.fetch_sizes == [2, 2, 2, 2] # Até o lote vazio
+    assert connection.closed
+
+
+def test_stream_query_closes_connection_when_consumer_stops(connections):
+    pool, _ = connections
+    connection = FakeConnection(rows=[{'id': i} for i in range(1000)])
+    pool.append(connection)
+
+    stream = database.stream_query("SELECT id FROM registros_habitos", batch_size=10)
+    assert next(stream) == {'id': 0}
+    stream.close() # Ex: cliente desconectou no meio do download
+
+    assert connection.closed
+    assert connection.fetch_sizes == [10] # Nada além do primeiro lote foi lido
+
+
+def test_stream_query_is_lazy(connections):
+    stream = database.stream_query("SELECT 1")
+    pool, opened = connections
+    assert opened == [] # A conexão só é aberta na primeira leitura
+    pool.append(FakeConnection())
+    assert list(stream) == []
+    assert opened[0].closed
+
+
+UPSERT = """INSERT INTO registros_habitos (habito_id, usuario_id, data_registro, concluido)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE concluido = VALUES(concluido), id = LAST_INSERT_ID(id)"""
+
+
+@pytest.mark.parametrize('rowcount, created', [
+    (1, True),  # Linha inserida
+    (2, False), # Linha existente atualizada
+    (0, False), # Linha existente com os mesmos valores
+])
+def test_execute_upsert_reports_whether_the_row_was_created(connections, rowcount, created):
+    pool, _ = connections
+    connection = FakeConnection(result=(rowcount, 42))
+    pool.append(connection)
+
+    assert database.execute_upsert(UPSERT, (1, 1, '2026-03-01', True)) == (42, created)
+    assert connection.closed
+
+
+def test_execute_upsert_uses_the_shared_connection(connections):
+    pool, opened = connections
+    connection = FakeConnection(result=(1, 7))
+    pool.append(connection)
+
+    with database.shared_connection():
+        database.execute_upsert(UPSERT, (1, 1, '2026-03-01', True))
+        database.execute_upsert(UPSERT, (2, 1, '2026-03-01', False))
+        assert not connection.closed
+
+    assert opened == [connection]
+    assert len(connection.executed) == 2
+    assert connection.closed
@@ -0,0 +1,149 @@
+import smtplib
+import uuid
+from contextlib import nullcontext
+
+import pytest
+
+from app.services import email_outbox as outbox_module
+from app.services.email_outbox import EmailOutbox
+
+
+class FakeConnection:
+    def __init__(self, mail, fail_first=False):
+        self.mail = mail
+        self.fail_first = fail_first
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+    def send(self, message):
+        if self.fail_first:
+            self.fail_first = False
+            raise smtplib.SMTPServerDisconnected('conexão encerrada pelo servidor')
+        self.mail.sent.append(message.recipients[0])
+
+
+class FakeMail:
+    """Substitui o flask_mail.Mail: conta as conexões abertas e as mensagens enviadas."""
+
+    def __init__(self):
+        self.connections = []
+        self.sent = []
+
+    def connect(self):
+        connection = FakeConnection(self)
+        self.connections.append(connection)
+        return connection
+
+
+@pytest.fixture
+def outbox(make_app):
+    app = make_app(EMAIL_OUTBOX_ENABLED=False, EMAIL_MAX_ATTEMPTS=3, EMAIL_RETRY_BACKOFF=30,
+                   MAIL_DEFAULT_SENDER='noreply@example.com')
+    box = EmailOutbox()
+    box.init_app(app, FakeMail())
+    with app.app_context():
+        yield box
+
+
+def _email(email_id, attempts=0):
+    return {'id': email_id, 'destinatario': f'u{email_id}@example.com', 'assunto': 'Assunto',
+            'corpo_html': '<p>Olá</p>', 'tentativas': attempts}
+
+
+def test_claim_reserves_batch_with_its_own_uuid(outbox, monkeypatch):
+    queries = []
+
+    def execute_query(query, params=None, fetch=False):
+        queries.append((' '.join(query.split()), params))
+        return [_email(1)] if fetch else 1
+
+    monkeypatch.setattr(outbox_module, 'execute_query', execute_query)
+    assert outbox._claim_batch() == [_email(1)]
+
+    _, (update, update_params), (select, select_params) = queries
+    assert update.startswith("UPDATE emails_pendentes SET tentativas = tentativas + (status = 'enviando'), "
+                             "status = 'enviando', lote = %s")
+    assert 'LIMIT %s' in update and update_params[1:] == (300, 50)
+    batch_id = update_params[0]
+    assert uuid.UUID(batch_id)
+    assert 'WHERE lote = %s' in select and select_params == (batch_id,)
+
+    queries.clear()
+    outbox._claim_batch()
+    assert queries[1][1][0] != batch_id # Cada reserva tem seu próprio lote
+
+
+def test_expired_leases_count_as_attempts_and_fail_at_the_cap(outbox, monkeypatch):
+    queries = []
+    monkeypatch.setattr(outbox_module, 'execute_query',
+                        lambda query, params=None, fetch=False: queries.append((' '.join(query.split()), params)) or 0)
+    outbox._claim_batch()
+
+    # Antes de reservar: reservas vencidas que seriam a última tentativa viram 'falhou'
+    fail, params = queries[0]
+    assert fail.startswith("UPDATE emails_pendentes SET status = 'falhou', lote = NULL, tentativas = tentativas + 1")
+    assert "WHERE status = 'enviando' AND proxima_tentativa <= NOW() AND tentativas + 1 >= %s" in fail
+    assert params == (3,)
+
+
+def test_claim_without_due_messages_skips_select(outbox, monkeypatch):
+    queries = []
+    monkeypatch.setattr(outbox_module, 'execute_query', lambda q, p=None, fetch=False: queries.append(q) or 0)
+    assert outbox._claim_batch() == []
+    assert len(queries) == 2 # Só os dois UPDATEs
+
+
+def test_failures_back_off_exponentially_until_max_attempts(outbox, monkeypatch):
+    updates = []
+    monkeypatch.setattr(outbox_module, 'execute_query',
+                        lambda query, params=None, fetch=False: updates.append(params))
+    error = smtplib.SMTPRecipientsRefused({})
+
+    outbox._mark_results([7, 8], [(_email(1, attempts=0), error), (_email(2, attempts=1), error),
+                                  (_email(3, attempts=2), error)])
+
+    assert updates[0] == (7, 8) # Enviados: um único UPDATE ... IN
+    statuses = [(status, attempts, delay) for status, attempts, _, delay, _ in updates[1:]]
+    assert statuses == [('pendente', 1, 30), ('pendente', 2, 60), ('falhou', 3, 120)]
+
+
+def test_smtp_connection_is_reused_and_reopened_when_dropped(outbox):
+    mail = outbox._mail
+    connection = None
+    for email_id in (1, 2, 3):
+        connection = outbox._send(connection, _email(email_id))
+    assert len(mail.connections) == 1
+    assert mail.sent == ['u1@example.com', 'u2@example.com', 'u3@example.com']
+
+    # O servidor fechou a conexão ociosa: reconecta e reenvia uma vez
+    connection.fail_first = True
+    connection = outbox._send(connection, _email(4))
+    assert len(mail.connections) == 2 and mail.connections[0].closed
+    assert mail.sent[-1] == 'u4@example.com'
+    assert outbox._close(connection) is None and connection.closed
+
+
+def test_sent_and_failed_messages_are_purged_after_retention(monkeypatch):
+    from app.config import Config
+    from app.services import maintenance_service
+
+    queries = []
+
+    def execute_query(query, params=None, fetch=False):
+        queries.append((' '.join(query.split()), params))
+        return [{'id': 1}, {'id': 2}] if fetch else 2
+
+    monkeypatch.setattr(maintenance_service, 'execute_query', execute_query)
+    monkeypatch.setattr(maintenance_service, 'shared_connection', lambda: nullcontext())
+
+    assert maintenance_service.MaintenanceService.cleanup_email_outbox() == {'emails_removidos': 2}
+    (select, params), (delete, ids) = queries
+    assert select.startswith("SELECT id FROM emails_pendentes WHERE status IN ('enviado', 'falhou') "
+                             "AND proxima_tentativa < %s ORDER BY proxima_tentativa")
+    assert params[1] == Config.AUTH_CLEANUP_BATCH_SIZE
+    assert delete == 'DELETE FROM emails_pendentes WHERE id IN (%s, %s)' and ids == (1, 2)
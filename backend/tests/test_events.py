@@ -0,0 +1,58 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.routes.events import events_bp
+from app.services.events import EventBroker, events
+from app.utils.admission import AdmissionController
+
+
+@pytest.fixture
+def events_app(make_app):
+    app = make_app(ADMISSION_BULKHEADS='events=1', ADMISSION_QUEUE_SIZE=0, ADMISSION_QUEUE_TIMEOUT=0,
+                   EVENTS_HEARTBEAT_SECONDS=1)
+    controller = AdmissionController()
+    controller.configure(app.config)
+    app.before_request(controller.before_request)
+    app.teardown_request(controller.teardown_request)
+    app.register_blueprint(events_bp, url_prefix='/api/events')
+    app.controller = controller
+    return app
+
+
+def _token(app):
+    with app.app_context():
+        return create_access_token(identity='1')
+
+
+def test_stream_rejects_token_in_query_string(events_app):
+    response = events_app.test_client().get(f'/api/events/stream?jwt={_token(events_app)}')
+    assert response.status_code == 401
+
+
+def test_stream_uses_cookie_and_is_bounded_by_bulkhead(events_app):
+    client = events_app.test_client()
+    client.set_cookie('access_token_cookie', _token(events_app))
+
+    stream = client.get('/api/events/stream', buffered=False)
+    assert stream.status_code == 200
+    assert next(stream.response) == b'retry: 5000\n\n'
+
+    # Única vaga ocupada pela conexão aberta
+    assert client.get('/api/events/stream').status_code == 503
+
+    stream.close() # Cliente desconectou: a vaga e a assinatura são liberadas
+    assert not events._subscribers
+    bulkhead = events_app.controller._bulkheads['events']
+    assert bulkhead.acquire()
+    bulkhead.release()
+
+
+def test_broker_limits_streams_per_user():
+    broker = EventBroker()
+    broker.configure(queue_size=10, max_per_user=1)
+    subscription = broker.subscribe('1')
+    assert broker.subscribe('1') is None
+    broker.publish('1', {'entidade': 'meta'})
+    assert subscription.get(timeout=0) == {'entidade': 'meta'}
+    broker.unsubscribe(subscription)
+    assert broker.subscribe('1') is not None
@@ -0,0 +1,90 @@
+import sqlite3
+from contextlib import nullcontext
+from datetime import date
+
+import pytest
+
+from app.services import report_service, today_service
+from app.services.report_service import ReportService
+from app.services.today_service import TodayService
+
+SCHEMA = """
+CREATE TABLE usuarios (id INTEGER PRIMARY KEY);
+CREATE TABLE habitos (id INTEGER PRIMARY KEY, usuario_id INT, nome TEXT, descricao TEXT, categoria_id INT,
+                      tipo_medicao TEXT, unidade TEXT, meta_diaria REAL, ativo BOOLEAN);
+CREATE TABLE registros_habitos (id INTEGER PRIMARY KEY, habito_id INT, usuario_id INT, data_registro DATE,
+                                valor REAL, concluido BOOLEAN);
+CREATE TABLE avaliacoes_humor (id INTEGER PRIMARY KEY, usuario_id INT, data_avaliacao DATE, nota_humor INT);
+CREATE TABLE metas (id INTEGER PRIMARY KEY, usuario_id INT, habito_id INT, titulo TEXT, tipo_meta TEXT,
+                    valor_meta REAL, periodo TEXT, data_inicio DATE, data_fim DATE, ativa BOOLEAN);
+"""
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """SQLite em memória no lugar do MySQL, contando as consultas executadas."""
+    connection = sqlite3.connect(':memory:')
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+    queries = []
+
+    def execute_query(query, params=None, fetch=False):
+        queries.append(query)
+        params = tuple(p.isoformat() if isinstance(p, date) else p for p in params or ())
+        cursor = connection.execute(query.replace('%s', '?'), params)
+        return [dict(row) for row in cursor.fetchall()] if fetch else cursor.rowcount
+
+    for module in (report_service, today_service):
+        monkeypatch.setattr(module, 'execute_query', execute_query)
+    monkeypatch.setattr(today_service, 'shared_connection', nullcontext)
+    monkeypatch.setattr(today_service.HabitCategory, 'get_cached_categories', staticmethod(lambda: []))
+    return connection, queries
+
+
+def _seed(connection):
+    connection.executescript("""
+        INSERT INTO usuarios VALUES (1);
+        INSERT INTO habitos VALUES (10, 1, 'Água', NULL, NULL, 'quantitativo', 'copos', 8, 1);
+        INSERT INTO habitos VALUES (11, 1, 'Meditar', NULL, NULL, 'binario', NULL, NULL, 1);
+        -- Quarta-feira 2024-01-10: a semana começa em 2024-01-08
+        INSERT INTO registros_habitos VALUES (1, 10, 1, '2024-01-07', 5, 1);
+        INSERT INTO registros_habitos VALUES (2, 10, 1, '2024-01-08', 4, 1);
+        INSERT INTO registros_habitos VALUES (3, 10, 1, '2024-01-10', 6, 1);
+        INSERT INTO registros_habitos VALUES (4, 11, 1, '2024-01-09', NULL, 1);
+        INSERT INTO registros_habitos VALUES (5, 11, 1, '2024-01-10', NULL, 0);
+        INSERT INTO avaliacoes_humor VALUES (1, 1, '2023-12-31', 1);
+        INSERT INTO avaliacoes_humor VALUES (2, 1, '2024-01-02', 4);
+        INSERT INTO avaliacoes_humor VALUES (3, 1, '2024-01-10', 5);
+        INSERT INTO metas VALUES (1, 1, 10, 'Beber água', 'habito', 20, 'semanal', '2024-01-01', NULL, 1);
+        INSERT INTO metas VALUES (2, 1, 11, 'Meditar', 'habito', 4, 'semanal', '2024-01-01', NULL, 1);
+        INSERT INTO metas VALUES (3, 1, NULL, 'Humor', 'humor', 5, 'mensal', '2024-01-01', NULL, 1);
+        INSERT INTO metas VALUES (4, 1, NULL, 'Ler', 'custom', 10, 'anual', '2024-01-01', NULL, 1);
+        INSERT INTO metas VALUES (5, 1, 10, 'Antiga', 'habito', 10, 'semanal', '2023-01-01', '2023-12-31', 1);
+    """)
+
+
+def test_goal_progress_in_one_query(db):
+    connection, queries = db
+    _seed(connection)
+    progress = {goal['meta_id']: goal for goal in ReportService.get_goal_progress(1, date(2024, 1, 10))}
+
+    assert len(queries) == 1
+    assert set(progress) == {1, 2, 3, 4}
+    assert progress[1]['valor_atual'] == 10.0 # Soma dos valores da semana (o domingo anterior fica de fora)
+    assert progress[1]['percentual'] == 50.0
+    assert progress[1]['periodo_inicio'] == '2024-01-08'
+    assert progress[2]['valor_atual'] == 1.0 # Hábito binário: conta as conclusões
+    assert progress[3]['valor_atual'] == 4.5 # Média do mês
+    assert progress[4]['valor_atual'] is None and progress[4]['percentual'] is None
+
+
+def test_today_does_not_touch_snapshots(db):
+    connection, queries = db
+    _seed(connection)
+    today = TodayService.get_today(1, date(2024, 1, 10))
+
+    assert len(queries) == 2
+    assert not any('snapshots_relatorios' in query for query in queries)
+    assert [habit['nome'] for habit in today['habitos']] == ['Meditar', 'Água']
+    assert today['humor'] == {'id': 3, 'nota_humor': 5}
+    assert len(today['metas']) == 4
@@ -0,0 +1,148 @@
+import threading
+
+import pytest
+from flask import jsonify, request
+from flask_jwt_extended import jwt_required
+
+from app.utils import idempotency
+from app.utils.idempotency import IDEMPOTENCY_HEADER, idempotent, init_idempotency
+
+
+@pytest.fixture
+def app(make_app, monkeypatch):
+    monkeypatch.setattr(idempotency, '_responses', idempotency.LRUCache(maxsize=100))
+    app = make_app()
+    init_idempotency(app)
+    app.writes = []
+    app.release = threading.Event() # /lenta só termina quando o teste liberar
+    app.release.set()
+    app.started = threading.Event()
+
+    @app.route('/registros', methods=['POST'])
+    @jwt_required()
+    @idempotent
+    def create():
+        app.writes.append(request.get_json())
+        return jsonify({'id': len(app.writes)}), 201
+
+    @app.route('/lenta', methods=['POST'])
+    @jwt_required()
+    @idempotent
+    def slow():
+        app.started.set()
+        app.release.wait(5)
+        app.writes.append(request.get_json())
+        return jsonify({'id': len(app.writes)}), 201
+
+    @app.route('/falha', methods=['POST'])
+    @jwt_required()
+    @idempotent
+    def fail():
+        app.writes.append(request.get_json())
+        return jsonify({'error': 'Erro interno'}), 500
+
+    return app
+
+
+def _post(app, headers, path='/registros', body=None, key='chave-1'):
+    headers = dict(headers, **{IDEMPOTENCY_HEADER: key}) if key else headers
+    return app.test_client().post(path, json=body or {'habito_id': 1}, headers=headers)
+
+
+def test_repeated_key_replays_the_first_response(app, auth_headers):
+    headers = auth_headers(app)
+    first = _post(app, headers)
+    second = _post(app, headers)
+
+    assert first.status_code == second.status_code == 201
+    assert second.get_json() == first.get_json() == {'id': 1}
+    assert second.headers['Idempotent-Replayed'] == 'true'
+    assert 'Idempotent-Replayed' not in first.headers
+    assert len(app.writes) == 1
+
+
+def test_same_key_with_another_body_is_rejected(app, auth_headers):
+    headers = auth_headers(app)
+    _post(app, headers)
+    response = _post(app, headers, body={'habito_id': 2})
+
+    assert response.status_code == 422
+    assert len(app.writes) == 1
+
+
+def test_keys_are_scoped_by_user(app, auth_headers):
+    _post(app, auth_headers(app, user_id=1))
+    response = _post(app, auth_headers(app, user_id=2))
+
+    assert response.get_json() == {'id': 2}
+    assert len(app.writes) == 2
+
+
+def test_without_key_every_request_runs(app, auth_headers):
+    headers = auth_headers(app)
+    _post(app, headers, key=None)
+    _post(app, headers, key=None)
+    assert len(app.writes) == 2
+
+
+def test_server_errors_are_not_replayed(app, auth_headers):
+    headers = auth_headers(app)
+    _post(app, headers, path='/falha')
+    response = _post(app, headers, path='/falha')
+
+    assert response.status_code == 500
+    assert len(app.writes) == 2 # A repetição executa de novo
+
+
+def test_overlong_key_is_a_bad_request(app, auth_headers):
+    response = _post(app, auth_headers(app), key='x' * 256)
+    assert response.status_code == 400
+    assert app.writes == []
+
+
+def _start_original(app, headers):
+    """Dispara a requisição original em outra thread e espera ela entrar na rota."""
+    app.release.clear()
+    results = []
+    thread = threading.Thread(target=lambda: results.append(_post(app, headers, path='/lenta')))
+    thread.start()
+    assert app.started.wait(5)
+    return thread, results
+
+
+def test_duplicate_during_original_waits_for_its_response(app, auth_headers, monkeypatch):
+    headers = auth_headers(app)
+    thread, results = _start_original(app, headers)
+
+    lookups = threading.Semaphore(0)
+    cache_get = idempotency._responses.get
+    monkeypatch.setattr(idempotency._responses, 'get', lambda key: lookups.release() or cache_get(key))
+
+    duplicate = []
+    waiting = threading.Thread(target=lambda: duplicate.append(_post(app, headers, path='/lenta')))
+    waiting.start()
+    assert lookups.acquire(timeout=5) # A repetição viu a reserva da original e passou a esperar
+    app.release.set()
+    thread.join(5)
+    waiting.join(5)
+
+    assert results[0].status_code == duplicate[0].status_code == 201
+    assert duplicate[0].get_json() == results[0].get_json()
+    assert duplicate[0].headers['Idempotent-Replayed'] == 'true'
+    assert len(app.writes) == 1
+
+
+def test_duplicate_gets_409_while_original_is_still_running(app, auth_headers, monkeypatch):
+    monkeypatch.setattr(idempotency, '_wait_seconds', 0.05)
+    headers = auth_headers(app)
+    thread, results = _start_original(app, headers)
+
+    duplicate = _post(app, headers, path='/lenta')
+    app.release.set()
+    thread.join(5)
+
+    assert duplicate.status_code == 409
+    assert duplicate.headers['Retry-After'] == '1'
+    assert results[0].status_code == 201
+    assert len(app.writes) == 1
+    assert idempotency._pending == {} # Reserva liberada ao fim da original
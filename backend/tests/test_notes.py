@@ -0,0 +1,54 @@
+import pytest
+
+from app.models import notes
+from app.models.habit import HabitRecord
+from app.models.mood import MoodAssessment
+from app.models.notes import NAO_CARREGADO
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    executed = []
+
+    def execute_query(query, params=None, fetch=False):
+        executed.append((' '.join(query.split()), params))
+        return [{'observacoes': 'lida do banco'}] if fetch else 1
+
+    monkeypatch.setattr(notes, 'execute_query', execute_query)
+    return executed
+
+
+@pytest.mark.parametrize('model, table, key', [
+    (HabitRecord, 'registros_habitos_notas', 'registro_id'),
+    (MoodAssessment, 'avaliacoes_humor_notas', 'avaliacao_id'),
+])
+def test_notes_are_loaded_once_on_first_access(queries, model, table, key):
+    row = model.from_dict({'id': 5}) # Linha sem a coluna observacoes
+
+    assert queries == []
+    assert row.observacoes == row.observacoes == 'lida do banco'
+    assert queries == [(f'SELECT observacoes FROM {table} WHERE {key} = %s', (5,))]
+    assert not hasattr(row, '__dict__') # __slots__ continua valendo com a base comum
+
+
+def test_notes_are_saved_only_when_changed_or_given(queries):
+    record = HabitRecord.from_dict({'id': 5, 'observacoes': None})
+    record._save_notes_after_update()
+    assert queries == []
+
+    record.observacoes = 'nova'
+    record._save_notes_after_update()
+    assert queries[-1][0].startswith('INSERT INTO registros_habitos_notas (registro_id, observacoes)')
+    assert queries[-1][1] == (5, 'nova')
+
+    queries.clear()
+    for value in (None, '', NAO_CARREGADO):
+        MoodAssessment(5, 1, '2026-03-01', 3, observacoes=value)._save_notes_after_insert()
+    assert queries == []
+
+
+def test_empty_notes_delete_the_side_row(queries):
+    assessment = MoodAssessment(5, 1, '2026-03-01', 3)
+    assessment.observacoes = ''
+    assessment._save_notes_after_update()
+    assert queries == [('DELETE FROM avaliacoes_humor_notas WHERE avaliacao_id = %s', (5,))]
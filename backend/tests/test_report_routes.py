@@ -0,0 +1,57 @@
+import gzip
+from datetime import date, timedelta
+
+import pytest
+
+from app.routes import report as report_routes
+from app.routes.report import report_bp
+from app.utils.compression import init_compression
+
+
+@pytest.fixture
+def report_app(make_app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(report_routes.SnapshotService, 'get_or_build',
+                        lambda user_id, tipo, reference_date=None: calls.append(('snapshot', reference_date)) or {})
+    monkeypatch.setattr(report_routes.ReportService, 'get_dashboard_summary',
+                        lambda user_id, start, end: calls.append(('live', start, end)) or {})
+    app = make_app()
+    app.register_blueprint(report_bp, url_prefix='/api/reports')
+    app.calls = calls
+    return app
+
+
+@pytest.mark.parametrize('query', [
+    {},
+    {'start_date': (date.today() - timedelta(days=6)).isoformat(), 'end_date': date.today().isoformat()},
+])
+def test_default_dashboard_range_uses_snapshot(report_app, auth_headers, query):
+    response = report_app.test_client().get('/api/reports/dashboard_summary', query_string=query,
+                                            headers=auth_headers(report_app))
+    assert response.status_code == 200
+    assert report_app.calls == [('snapshot', date.today())]
+
+
+def test_custom_dashboard_range_is_computed(report_app, auth_headers):
+    start, end = date.today() - timedelta(days=30), date.today()
+    response = report_app.test_client().get('/api/reports/dashboard_summary', headers=auth_headers(report_app),
+                                            query_string={'start_date': start.isoformat(), 'end_date': end.isoformat()})
+    assert response.status_code == 200
+    assert report_app.calls == [('live', start, end)]
+
+
+def test_gzip_export_is_a_gz_file_not_a_content_encoding(report_app, auth_headers, monkeypatch):
+    def generate_export(user_id, export_format, compress, start_date, end_date):
+        assert compress
+        yield gzip.compress(b'tipo,id\nhabito,1\n')
+
+    monkeypatch.setattr(report_routes.ExportService, 'generate_export', generate_export)
+    init_compression(report_app)
+    response = report_app.test_client().get('/api/reports/export?format=csv&gzip=true',
+                                            headers={**auth_headers(report_app), 'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/gzip'
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Content-Disposition'].endswith('.csv.gz"')
+    assert gzip.decompress(response.get_data()) == b'tipo,id\nhabito,1\n'
@@ -0,0 +1,108 @@
+from datetime import datetime
+
+import pytest
+
+from app.services import scheduler as scheduler_module
+from app.services.scheduler import ScheduledJob, Scheduler
+
+
+class FakeMySQL:
+    """Simula GET_LOCK e a tabela execucoes_jobs compartilhadas entre os 'workers'."""
+
+    def __init__(self):
+        self.locks = set()
+        self.runs = set()
+
+    def connect(self):
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rowcount = 0
+        self._row = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        if query.startswith('SELECT GET_LOCK'):
+            obtained = params[0] not in self.db.locks
+            self.db.locks.add(params[0])
+            self._row = {'obtido': int(obtained)}
+        elif query.startswith('SELECT RELEASE_LOCK'):
+            self.db.locks.discard(params[0])
+        elif query.startswith('INSERT IGNORE INTO execucoes_jobs'):
+            self.rowcount = 0 if params in self.db.runs else 1
+            self.db.runs.add(params)
+        elif query.startswith('DELETE FROM execucoes_jobs WHERE job = %s AND periodo'):
+            self.db.runs.discard(params)
+
+    def fetchone(self):
+        return self._row
+
+
+@pytest.fixture
+def fake_mysql(monkeypatch):
+    db = FakeMySQL()
+    monkeypatch.setattr(scheduler_module, 'get_db_connection', db.connect)
+    return db
+
+
+def _worker(app):
+    worker = Scheduler()
+    worker._app = app
+    return worker
+
+
+def test_job_runs_once_per_period_across_workers(fake_mysql, make_app):
+    app = make_app()
+    calls = []
+    job = ScheduledJob('resumo_semanal_email', lambda: calls.append(1), hour=8, weekday=0)
+    scheduled_for = datetime(2024, 1, 1, 8, 0)
+
+    # Dois workers cujos timers disparam um depois do outro, sem sobreposição
+    _worker(app).run_job(job, scheduled_for)
+    _worker(app).run_job(job, scheduled_for)
+    assert calls == [1]
+
+    _worker(app).run_job(job, datetime(2024, 1, 8, 8, 0))
+    assert calls == [1, 1]
+
+
+def test_failed_run_releases_the_period(fake_mysql, make_app):
+    app = make_app()
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError('falha')
+        return 'ok'
+
+    job = ScheduledJob('snapshots_relatorios', flaky, hour=3)
+    scheduled_for = datetime(2024, 1, 1, 3, 0)
+    assert _worker(app).run_job(job, scheduled_for) is None
+    assert _worker(app).run_job(job, scheduled_for) == 'ok'
+    assert not fake_mysql.locks
+
+
+def test_interval_period_key_groups_by_window():
+    job = ScheduledJob('limpeza_autenticacao', lambda: None, interval=3600)
+    assert job.period_key(datetime(2024, 1, 1, 10, 5)) == job.period_key(datetime(2024, 1, 1, 10, 55))
+    assert job.period_key(datetime(2024, 1, 1, 10, 5)) != job.period_key(datetime(2024, 1, 1, 11, 5))
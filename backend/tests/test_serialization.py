@@ -0,0 +1,63 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import msgpack
+import pytest
+from flask import jsonify, request
+
+from app.utils.serialization import (MSGPACK_MIMETYPE, ApiRequest, FastJSONProvider, dumps_msgpack,
+                                     loads_msgpack)
+
+ROW = {'data_registro': date(2026, 3, 1), 'valor': Decimal('2.50'), 'criado_em': datetime(2026, 3, 1, 12, 30)}
+
+
+@pytest.fixture
+def app(make_app):
+    app = make_app()
+    app.json = FastJSONProvider(app)
+    app.request_class = ApiRequest
+
+    @app.route('/registro')
+    def registro():
+        return jsonify(ROW)
+
+    @app.route('/eco', methods=['POST'])
+    def eco():
+        return jsonify(request.get_json())
+
+    return app
+
+
+def test_json_is_the_default(app):
+    response = app.test_client().get('/registro')
+    assert response.mimetype == 'application/json'
+    assert 'Accept' in response.vary
+    assert response.get_json() == {'data_registro': '2026-03-01', 'valor': 2.5, 'criado_em': '2026-03-01T12:30:00'}
+
+
+def test_msgpack_when_preferred_in_accept(app):
+    response = app.test_client().get('/registro', headers={'Accept': 'application/msgpack, application/json;q=0.5'})
+    assert response.mimetype == MSGPACK_MIMETYPE
+    assert 'Accept' in response.vary
+    body = msgpack.unpackb(response.get_data(), timestamp=3)
+    assert body['data_registro'] == '2026-03-01'
+    assert body['valor'] == 2.5
+    # datetime vai como Timestamp nativo do MessagePack (mesmo instante)
+    assert body['criado_em'] == ROW['criado_em'].astimezone(timezone.utc)
+
+
+def test_json_wins_when_preferred_over_msgpack(app):
+    response = app.test_client().get('/registro', headers={'Accept': 'application/json, application/msgpack;q=0.5'})
+    assert response.mimetype == 'application/json'
+
+
+def test_msgpack_request_body_is_read_by_get_json(app):
+    payload = {'habito_id': 3, 'notas': 'ok', 1: 'chave inteira'}
+    response = app.test_client().post('/eco', data=dumps_msgpack(payload), content_type='application/x-msgpack',
+                                      headers={'Accept': MSGPACK_MIMETYPE})
+    assert loads_msgpack(response.get_data()) == payload
+
+
+def test_invalid_msgpack_body_is_a_bad_request(app):
+    response = app.test_client().post('/eco', data=b'\xc1', content_type=MSGPACK_MIMETYPE)
+    assert response.status_code == 400
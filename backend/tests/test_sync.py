@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import Config
+from app.models import tombstone
+from app.services import sync_service
+from app.services.sync_service import SyncService
+
+NOW = datetime(2026, 3, 10, 8, 0, 0)
+TOMBSTONE = {'entidade': 'registros_habitos', 'id': 9, 'data_exclusao': NOW - timedelta(hours=1)}
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    """Substitui execute_query: NOW() devolve NOW e a tabela exclusoes devolve TOMBSTONE."""
+    executed = []
+
+    def execute_query(query, params=None, fetch=False):
+        executed.append((query, params))
+        if 'NOW()' in query:
+            return [{'agora': NOW}]
+        if 'FROM exclusoes' in query:
+            return [TOMBSTONE]
+        return []
+
+    monkeypatch.setattr(sync_service, 'execute_query', execute_query)
+    monkeypatch.setattr(tombstone, 'execute_query', execute_query)
+    return executed
+
+
+def _entity_queries(executed):
+    return [(query, params) for query, params in executed if 'usuario_id = %s' in query and 'exclusoes' not in query]
+
+
+def test_cursor_round_trip():
+    cursor = SyncService.encode_cursor(NOW)
+    assert '=' not in cursor # Seguro em query string
+    assert SyncService.decode_cursor(cursor) == NOW
+
+
+@pytest.mark.parametrize('cursor', ['', 'nao-e-um-cursor', '!!!'])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        SyncService.decode_cursor(cursor)
+
+
+def test_without_cursor_returns_full_state(queries):
+    changes = SyncService.get_changes(1)
+
+    assert changes['completo'] is True
+    assert changes['exclusoes'] == [] # Estado completo: o cliente substitui os dados locais
+    assert SyncService.decode_cursor(changes['cursor']) == NOW
+    assert all('data_atualizacao >=' not in query for query, _ in _entity_queries(queries))
+
+
+def test_with_cursor_returns_changes_and_tombstones_since(queries):
+    since = NOW - timedelta(days=1)
+    changes = SyncService.get_changes(1, SyncService.encode_cursor(since))
+
+    assert changes['completo'] is False
+    assert changes['exclusoes'] == [TOMBSTONE]
+    entity_queries = _entity_queries(queries)
+    assert len(entity_queries) == len(SyncService._ENTITIES)
+    for query, params in entity_queries:
+        assert 'data_atualizacao >= %s' in query # Inclusivo: mudanças no mesmo segundo não se perdem
+        assert params == (1, since)
+    tombstone_query, params = next((q, p) for q, p in queries if 'FROM exclusoes' in q)
+    assert 'data_exclusao >= %s' in tombstone_query and params == (1, since)
+
+
+def test_cursor_older_than_tombstone_retention_forces_full_sync(queries):
+    since = NOW - timedelta(days=Config.SYNC_TOMBSTONE_RETENTION_DAYS + 1)
+    changes = SyncService.get_changes(1, SyncService.encode_cursor(since))
+
+    # As exclusões anteriores já podem ter sido apagadas: só o estado completo é confiável
+    assert changes['completo'] is True
+    assert changes['exclusoes'] == []
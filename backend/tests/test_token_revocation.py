@@ -0,0 +1,105 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.utils import jwt_helper
+from app.utils.jwt_helper import BloomFilter, TokenRevocationList
+
+
+class FakeRevokedTable:
+    """Tabela tokens_revogados em memória, no lugar de execute_query."""
+
+    def __init__(self):
+        self.rows = []
+
+    def insert(self, jti, expires_at):
+        self.rows.append({'id': len(self.rows) + 1, 'jti': jti, 'data_expiracao': expires_at})
+
+    def execute_query(self, query, params=None, fetch=False):
+        if query.lstrip().startswith('SELECT'):
+            now = datetime.utcnow()
+            return [row for row in self.rows if row['id'] > params[0] and row['data_expiracao'] > now]
+        jti, _, expires_at = params
+        if all(row['jti'] != jti for row in self.rows):
+            self.insert(jti, expires_at)
+        return 1
+
+
+class EverythingBloom:
+    """Filtro que responde "talvez" para tudo: força a consulta ao conjunto exato."""
+
+    def __contains__(self, key):
+        return True
+
+    def add(self, key):
+        pass
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeRevokedTable()
+    monkeypatch.setattr(jwt_helper, 'execute_query', table.execute_query)
+    return table
+
+
+@pytest.fixture
+def revocations(table):
+    revocations = TokenRevocationList()
+    revocations.configure(sync_seconds=3600, capacity=1000, error_rate=0.01) # Sem sincronização durante o teste
+    return revocations
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f'jti-{i}' for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+
+
+def test_bloom_filter_false_positive_rate_is_near_configured():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f'jti-{i}')
+    false_positives = sum(f'outro-{i}' in bloom for i in range(10000))
+    assert false_positives < 10000 * 0.01 * 3
+
+
+def test_revoked_token_is_rejected_immediately(revocations, table):
+    expires_at = time.time() + 3600
+    revocations.revoke('jti-1', 1, expires_at)
+
+    assert revocations.is_revoked('jti-1')
+    assert not revocations.is_revoked('jti-2')
+    assert [row['jti'] for row in table.rows] == ['jti-1']
+
+
+def test_bloom_false_positive_is_resolved_by_exact_set(revocations):
+    revocations.revoke('jti-1', 1, time.time() + 3600)
+    revocations._bloom = EverythingBloom()
+
+    assert revocations.is_revoked('jti-1')
+    assert not revocations.is_revoked('jti-2')
+
+
+def test_revocations_from_other_workers_arrive_on_sync(revocations, table):
+    table.insert('antigo', datetime.utcnow() + timedelta(hours=1))
+    assert revocations.is_revoked('antigo') # Carga inicial
+
+    table.insert('de-outro-worker', datetime.utcnow() + timedelta(hours=1))
+    assert not revocations.is_revoked('de-outro-worker')
+    revocations._sync()
+    assert revocations.is_revoked('de-outro-worker')
+
+
+def test_sync_drops_expired_tokens(revocations, table):
+    revocations.revoke('expirando', 1, time.time() + 3600)
+    # O token expirou: some da consulta ao banco e deve sair da memória
+    table.rows[0]['data_expiracao'] = datetime.utcnow() - timedelta(seconds=1)
+    revocations._revoked['expirando'] = time.time() - 1
+
+    revocations._sync()
+
+    assert 'expirando' not in revocations._revoked
+    assert 'expirando' not in revocations._bloom # Filtro recriado sem ele
@@ -0,0 +1,263 @@
+import io
+from datetime import datetime, timedelta
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from app.models import stored_file
+from app.models.user import User
+from app.services.image_service import ImageService
+from app.utils import storage as storage_module
+from app.utils import uploads
+from app.utils.storage import LocalStorage, content_key
+
+DIGEST = 'ab' * 32
+
+
+class CountingStorage(LocalStorage):
+    def __init__(self, root):
+        super().__init__(str(root), '/uploads/profile_pics')
+        self.exists_calls = 0
+
+    def exists(self, key):
+        self.exists_calls += 1
+        return super().exists(key)
+
+
+def _use_storage(monkeypatch, tmp_path):
+    storage = CountingStorage(tmp_path)
+    monkeypatch.setattr(storage_module, '_storage', storage)
+    return storage
+
+
+def test_picture_urls_are_built_without_probing_storage(monkeypatch, tmp_path):
+    storage = _use_storage(monkeypatch, tmp_path)
+    key = content_key(DIGEST, 'png')
+
+    ready = User(1, 'Ana', 'ana@example.com', None, foto_perfil=key, foto_variantes_prontas=True).to_dict()
+    assert ready['foto_perfil_urls'] == {
+        'thumb': f'/uploads/profile_pics/ab/ab/{DIGEST}_thumb.webp',
+        'medium': f'/uploads/profile_pics/ab/ab/{DIGEST}_medium.webp',
+        'original': f'/uploads/profile_pics/ab/ab/{DIGEST}.png',
+    }
+
+    pending = User(1, 'Ana', 'ana@example.com', None, foto_perfil=key).to_dict()
+    assert set(pending['foto_perfil_urls'].values()) == {f'/uploads/profile_pics/ab/ab/{DIGEST}.png'}
+    assert User(2, 'Bia', 'bia@example.com', None).to_dict()['foto_perfil_urls'] is None
+    assert storage.exists_calls == 0
+
+
+def test_background_variants_report_completion(monkeypatch, tmp_path):
+    storage = _use_storage(monkeypatch, tmp_path)
+    key = content_key(DIGEST, 'png')
+    source = tmp_path / 'upload.png'
+    Image.new('RGBA', (300, 200), (255, 0, 0, 128)).save(source)
+    storage.put(key, str(source))
+
+    done = []
+    ImageService.build_variants_in_background(key, storage, on_done=done.append).result(timeout=30)
+
+    assert done == [key]
+    for variant in ImageService.variant_keys(key):
+        with Image.open(storage.local_path(variant)) as image:
+            assert image.size[0] == image.size[1]
+
+
+class FakeFilesTable:
+    """Tabela arquivos em memória, no lugar de execute_query e das conexões de StoredFile."""
+
+    def __init__(self):
+        self.rows = {} # chave -> {'referencias', 'variantes_prontas', 'data_atualizacao'}
+        self.variant_builds = []
+
+    def execute_query(self, query, params=None, fetch=False):
+        query = ' '.join(query.split())
+        if query.startswith('INSERT INTO arquivos'):
+            row = self.rows.setdefault(params[0], {'referencias': 0, 'variantes_prontas': False})
+            row['referencias'] += 1
+        elif query.startswith('UPDATE arquivos SET referencias'):
+            row = self.rows.get(params[0])
+            if row and row['referencias'] > 0:
+                row['referencias'] -= 1
+        elif query.startswith('UPDATE arquivos SET variantes_prontas'):
+            self.rows[params[0]]['variantes_prontas'] = True
+        elif query.startswith('SELECT variantes_prontas'):
+            row = self.rows.get(params[0])
+            return [{'variantes_prontas': row['variantes_prontas']}] if row else []
+        elif query.startswith('SELECT chave FROM arquivos'):
+            older_than, limit = params
+            return [{'chave': chave} for chave, row in self.rows.items()
+                    if row['referencias'] == 0 and row['data_atualizacao'] < older_than][:limit]
+        else:
+            raise AssertionError(f'Query inesperada: {query}')
+        if params[0] in self.rows:
+            self.rows[params[0]]['data_atualizacao'] = datetime.now()
+        return 1
+
+    def get_db_connection(self):
+        return FakeFilesConnection(self)
+
+
+class FakeFilesConnection:
+    def __init__(self, table):
+        self.table = table
+        self.committed = False
+
+    def begin(self):
+        pass
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+    def cursor(self):
+        return FakeFilesCursor(self.table)
+
+
+class FakeFilesCursor:
+    def __init__(self, table):
+        self.table = table
+        self._row = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        if query.startswith('SELECT referencias'):
+            assert query.endswith('FOR UPDATE')
+            self._row = self.table.rows.get(params[0])
+        elif query.startswith('DELETE FROM arquivos'):
+            del self.table.rows[params[0]]
+
+    def fetchone(self):
+        return self._row
+
+
+@pytest.fixture
+def files(monkeypatch, tmp_path):
+    """Armazenamento local em tmp_path e tabela arquivos em memória; as variantes são geradas na hora."""
+    table = FakeFilesTable()
+    monkeypatch.setattr(stored_file, 'execute_query', table.execute_query)
+    monkeypatch.setattr(stored_file, 'get_db_connection', table.get_db_connection)
+    storage = _use_storage(monkeypatch, tmp_path / 'uploads')
+
+    def build_now(key, storage, on_done=None):
+        table.variant_builds.append(key)
+        ImageService.build_variants(key, storage)
+        on_done(key)
+
+    monkeypatch.setattr(ImageService, 'build_variants_in_background', staticmethod(build_now))
+    return table, storage
+
+
+def _upload(color=(0, 128, 255)):
+    data = io.BytesIO()
+    Image.new('RGB', (120, 80), color).save(data, 'PNG')
+    data.seek(0)
+    return FileStorage(stream=data, filename='foto.png')
+
+
+def _age(table, key, hours):
+    table.rows[key]['data_atualizacao'] = datetime.now() - timedelta(hours=hours)
+
+
+def test_same_content_is_stored_once_with_one_reference_per_upload(files):
+    table, storage = files
+    first = uploads.save_profile_picture(_upload(), user_id=1)
+    second = uploads.save_profile_picture(_upload(), user_id=2)
+
+    assert first == second
+    assert table.rows[first]['referencias'] == 2
+    assert table.variant_builds == [first] # Variantes geradas só no primeiro envio
+    assert storage.exists(first)
+
+
+def test_referenced_files_survive_collection(files):
+    table, storage = files
+    key = uploads.save_profile_picture(_upload(), user_id=1)
+    uploads.save_profile_picture(_upload(), user_id=2)
+    uploads.release_profile_picture(key)
+    _age(table, key, hours=48)
+
+    assert uploads.collect_orphan_files() == {'arquivos_removidos': 0}
+    assert table.rows[key]['referencias'] == 1
+    assert storage.exists(key)
+
+
+def test_orphans_are_collected_only_after_grace_period(files):
+    table, storage = files
+    key = uploads.save_profile_picture(_upload(), user_id=1)
+    uploads.release_profile_picture(key)
+
+    # Recém-liberado: pode ser um upload do mesmo conteúdo em andamento
+    assert uploads.collect_orphan_files() == {'arquivos_removidos': 0}
+
+    _age(table, key, hours=uploads.Config.UPLOAD_GC_GRACE_HOURS + 1)
+    assert uploads.collect_orphan_files() == {'arquivos_removidos': 1}
+    assert key not in table.rows
+    assert not storage.exists(key)
+    assert not any(storage.exists(variant) for variant in ImageService.variant_keys(key))
+
+
+def test_delete_if_orphan_keeps_file_referenced_again(files):
+    table, storage = files
+    key = uploads.save_profile_picture(_upload(), user_id=1)
+    uploads.release_profile_picture(key)
+    _age(table, key, hours=48)
+    orphans = stored_file.StoredFile.get_orphans(datetime.now(), 10)
+
+    # Entre a listagem e a remoção, outro usuário envia a mesma imagem
+    uploads.save_profile_picture(_upload(), user_id=2)
+    removed = []
+    assert orphans == [key]
+    assert not stored_file.StoredFile.delete_if_orphan(key, removed.append)
+    assert removed == []
+    assert storage.exists(key)
+
+
+@pytest.fixture
+def profile_app(make_app, files, monkeypatch):
+    from app.routes.user import user_bp
+
+    user = User(1, 'Ana', 'ana@example.com', None)
+    monkeypatch.setattr(User, 'get_by_id', staticmethod(lambda user_id: user))
+    monkeypatch.setattr(User, 'save', lambda self: None)
+    app = make_app()
+    app.register_blueprint(user_bp)
+    app.profile_user = user
+    return app
+
+
+def _put_picture(app, headers):
+    return app.test_client().put('/profile', data={'nome': 'Ana', 'foto_perfil': _upload()}, headers=headers,
+                                 content_type='multipart/form-data')
+
+
+def test_uploading_the_same_picture_again_keeps_one_reference(profile_app, files, auth_headers):
+    table, _ = files
+    headers = auth_headers(profile_app)
+
+    assert _put_picture(profile_app, headers).status_code == 200
+    assert _put_picture(profile_app, headers).status_code == 200
+
+    key = profile_app.profile_user.foto_perfil
+    assert table.rows[key]['referencias'] == 1
+
+
+def test_failed_profile_save_releases_the_new_reference(profile_app, files, auth_headers, monkeypatch):
+    table, _ = files
+    monkeypatch.setattr(User, 'save', lambda self: (_ for _ in ()).throw(RuntimeError('banco indisponível')))
+
+    assert _put_picture(profile_app, auth_headers(profile_app)).status_code == 500
+
+    key, = table.rows
+    assert table.rows[key]['referencias'] == 0
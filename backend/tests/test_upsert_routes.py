@@ -0,0 +1,48 @@
+import pytest
+
+from app.models.habit import HabitRecord
+from app.models.mood import MoodAssessment
+from app.routes.habit import habit_bp
+from app.routes.mood import mood_bp
+
+
+class SavedRow:
+    def to_dict(self):
+        return {'id': 1}
+
+
+@pytest.fixture
+def app(make_app, monkeypatch):
+    app = make_app()
+    app.register_blueprint(habit_bp, url_prefix='/habits')
+    app.register_blueprint(mood_bp, url_prefix='/mood')
+    app.upserts = []
+
+    def upsert(*args, **kwargs):
+        app.upserts.append(args)
+        return SavedRow(), True
+
+    monkeypatch.setattr(HabitRecord, 'upsert', staticmethod(upsert))
+    monkeypatch.setattr(MoodAssessment, 'upsert', staticmethod(upsert))
+    return app
+
+
+@pytest.mark.parametrize('nota_humor, status', [(3, 201), (True, 400), (False, 400), (6, 400), ('3', 400)])
+def test_put_mood_requires_integer_score(app, auth_headers, nota_humor, status):
+    response = app.test_client().put('/mood/2026-03-01', json={'nota_humor': nota_humor}, headers=auth_headers(app))
+    assert response.status_code == status
+    assert len(app.upserts) == (status == 201)
+
+
+@pytest.mark.parametrize('valor, expected', [(2, 2.0), (1.5, 1.5), ('2.5', 2.5)])
+def test_put_habit_record_accepts_numeric_value(app, auth_headers, valor, expected):
+    response = app.test_client().put('/habits/1/records/2026-03-01', json={'valor': valor}, headers=auth_headers(app))
+    assert response.status_code == 201
+    assert app.upserts[0][3] == expected
+
+
+@pytest.mark.parametrize('valor', ['muito', True, None, [1], 'nan'])
+def test_put_habit_record_rejects_non_numeric_value(app, auth_headers, valor):
+    response = app.test_client().put('/habits/1/records/2026-03-01', json={'valor': valor}, headers=auth_headers(app))
+    assert response.status_code == 400
+    assert app.upserts == []
@@ -0,0 +1,14 @@
+-- database/migrations/005_create_report_snapshots.sql
+-- Cria a tabela de snapshots de relatórios pré-calculados (dashboard, resumo semanal, progresso de metas).
+
+CREATE TABLE `snapshots_relatorios` (
+    `id` INT AUTO_INCREMENT PRIMARY KEY,
+    `usuario_id` INT NOT NULL,
+    `tipo` VARCHAR(50) NOT NULL,
+    `data_referencia` DATE NOT NULL,
+    `dados` MEDIUMTEXT NOT NULL,
+    `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE,
+    UNIQUE (`usuario_id`, `tipo`, `data_referencia`),
+    INDEX `idx_snapshots_data_referencia` (`data_referencia`)
+);
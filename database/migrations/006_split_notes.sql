@@ -0,0 +1,30 @@
+-- database/migrations/006_split_notes.sql
+-- Move as observações (texto livre) de registros_habitos e avaliacoes_humor para
+-- tabelas laterais, mantendo estreitas as linhas lidas pelas varreduras por período.
+-- As observações são carregadas apenas no detalhe, na exportação ou quando pedidas via ?fields=.
+
+CREATE TABLE `registros_habitos_notas` (
+    `registro_id` INT PRIMARY KEY,
+    `observacoes` TEXT NOT NULL,
+    `data_atualizacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (`registro_id`) REFERENCES `registros_habitos`(`id`) ON DELETE CASCADE
+);
+
+INSERT INTO `registros_habitos_notas` (`registro_id`, `observacoes`)
+SELECT `id`, `observacoes` FROM `registros_habitos`
+WHERE `observacoes` IS NOT NULL AND `observacoes` <> '';
+
+ALTER TABLE `registros_habitos` DROP COLUMN `observacoes`;
+
+CREATE TABLE `avaliacoes_humor_notas` (
+    `avaliacao_id` INT PRIMARY KEY,
+    `observacoes` TEXT NOT NULL,
+    `data_atualizacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (`avaliacao_id`) REFERENCES `avaliacoes_humor`(`id`) ON DELETE CASCADE
+);
+
+INSERT INTO `avaliacoes_humor_notas` (`avaliacao_id`, `observacoes`)
+SELECT `id`, `observacoes` FROM `avaliacoes_humor`
+WHERE `observacoes` IS NOT NULL AND `observacoes` <> '';
+
+ALTER TABLE `avaliacoes_humor` DROP COLUMN `observacoes`;
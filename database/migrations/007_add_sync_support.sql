@@ -0,0 +1,19 @@
+-- database/migrations/007_add_sync_support.sql
+-- Suporte à sincronização incremental (GET /api/sync): índices (usuario_id, data_atualizacao)
+-- e tabela de marcas de exclusão para registros e avaliações apagados fisicamente.
+
+ALTER TABLE `habitos` ADD INDEX `idx_habitos_usuario_atualizacao` (`usuario_id`, `data_atualizacao`);
+ALTER TABLE `registros_habitos` ADD INDEX `idx_registros_usuario_atualizacao` (`usuario_id`, `data_atualizacao`);
+ALTER TABLE `avaliacoes_humor` ADD INDEX `idx_humor_usuario_atualizacao` (`usuario_id`, `data_atualizacao`);
+ALTER TABLE `metas` ADD INDEX `idx_metas_usuario_atualizacao` (`usuario_id`, `data_atualizacao`);
+
+CREATE TABLE `exclusoes` (
+    `id` INT AUTO_INCREMENT PRIMARY KEY,
+    `usuario_id` INT NOT NULL,
+    `entidade` VARCHAR(30) NOT NULL,
+    `entidade_id` INT NOT NULL,
+    `data_exclusao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE,
+    INDEX `idx_exclusoes_usuario_data` (`usuario_id`, `data_exclusao`),
+    INDEX `idx_exclusoes_data` (`data_exclusao`)
+);
@@ -0,0 +1,6 @@
+-- database/migrations/008_mood_unique_per_user.sql
+-- A unicidade de avaliacoes_humor era só por data (global): passa a ser uma avaliação
+-- por dia por usuário, chave natural usada pelo upsert de PUT /api/mood/<data>.
+
+ALTER TABLE `avaliacoes_humor` DROP INDEX `data_avaliacao`;
+ALTER TABLE `avaliacoes_humor` ADD UNIQUE `uq_humor_usuario_data` (`usuario_id`, `data_avaliacao`);
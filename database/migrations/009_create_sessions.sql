@@ -0,0 +1,15 @@
+-- database/migrations/009_create_sessions.sql
+-- Cria a tabela de sessões usada no login/logout (já referenciada pelo backend, mas ausente do schema).
+
+CREATE TABLE IF NOT EXISTS `sessoes` (
+    `id` INT AUTO_INCREMENT PRIMARY KEY,
+    `usuario_id` INT NOT NULL,
+    `token` VARCHAR(255) NOT NULL,
+    `ip_address` VARCHAR(45) DEFAULT NULL,
+    `user_agent` VARCHAR(512) DEFAULT NULL,
+    `data_expiracao` TIMESTAMP NOT NULL,
+    `ativa` BOOLEAN DEFAULT TRUE,
+    `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE,
+    INDEX `idx_sessoes_usuario_ativa` (`usuario_id`, `ativa`)
+);
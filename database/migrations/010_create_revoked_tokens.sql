@@ -0,0 +1,13 @@
+-- database/migrations/010_create_revoked_tokens.sql
+-- Tokens JWT revogados no logout, identificados pelo jti. Cada worker mantém
+-- uma cópia em memória e busca as linhas novas (id maior que o último lido).
+
+CREATE TABLE IF NOT EXISTS `tokens_revogados` (
+    `id` INT AUTO_INCREMENT PRIMARY KEY,
+    `jti` VARCHAR(64) NOT NULL UNIQUE,
+    `usuario_id` INT NOT NULL,
+    `data_expiracao` TIMESTAMP NOT NULL,
+    `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE,
+    INDEX `idx_tokens_revogados_expiracao` (`data_expiracao`)
+);
@@ -0,0 +1,9 @@
+-- database/migrations/011_auth_cleanup_indexes.sql
+-- Índices usados pela limpeza periódica das tabelas de autenticação
+-- (MaintenanceService.cleanup_auth_tables), que apaga as linhas expiradas em lotes.
+
+-- O backend sempre usou `data_expiracao`; o schema criava a coluna como `expiracao`
+ALTER TABLE `tokens_recuperacao` CHANGE `expiracao` `data_expiracao` TIMESTAMP NOT NULL;
+
+CREATE INDEX `idx_tokens_recuperacao_expiracao` ON `tokens_recuperacao` (`data_expiracao`);
+CREATE INDEX `idx_sessoes_expiracao` ON `sessoes` (`data_expiracao`);
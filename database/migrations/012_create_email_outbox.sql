@@ -0,0 +1,20 @@
+-- database/migrations/012_create_email_outbox.sql
+-- Caixa de saída de emails: as rotas gravam a mensagem e respondem; threads de
+-- envio do backend reservam lotes (status/lote/proxima_tentativa) e enviam por
+-- conexões SMTP persistentes, com novas tentativas em caso de falha.
+
+CREATE TABLE IF NOT EXISTS `emails_pendentes` (
+    `id` INT AUTO_INCREMENT PRIMARY KEY,
+    `destinatario` VARCHAR(255) NOT NULL,
+    `assunto` VARCHAR(255) NOT NULL,
+    `corpo_html` MEDIUMTEXT NOT NULL,
+    `status` ENUM('pendente', 'enviando', 'enviado', 'falhou') NOT NULL DEFAULT 'pendente',
+    `lote` CHAR(36) DEFAULT NULL,
+    `tentativas` INT NOT NULL DEFAULT 0,
+    `ultimo_erro` TEXT DEFAULT NULL,
+    `proxima_tentativa` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    `data_envio` TIMESTAMP NULL DEFAULT NULL,
+    INDEX `idx_emails_status_proxima` (`status`, `proxima_tentativa`),
+    INDEX `idx_emails_lote` (`lote`)
+);
@@ -0,0 +1,13 @@
+-- database/migrations/013_create_stored_files.sql
+-- Uploads endereçados pelo hash do conteúdo: uma linha por arquivo, com o número
+-- de usuários que o referenciam. Arquivos sem referências são apagados pela coleta diária.
+-- Fotos enviadas antes desta migração continuam com o nome antigo e não entram na contagem.
+
+CREATE TABLE IF NOT EXISTS `arquivos` (
+    `chave` VARCHAR(255) PRIMARY KEY,
+    `referencias` INT NOT NULL DEFAULT 0,
+    `tamanho` BIGINT NOT NULL DEFAULT 0,
+    `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    `data_atualizacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX `idx_arquivos_orfaos` (`referencias`, `data_atualizacao`)
+);
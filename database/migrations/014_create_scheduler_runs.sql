@@ -0,0 +1,11 @@
+-- database/migrations/014_create_scheduler_runs.sql
+-- Rodadas dos jobs agendados já reivindicadas: cada worker roda o seu agendador,
+-- e a chave única (job, periodo) garante uma única execução por rodada entre todos
+-- (ex: o resumo semanal por email não é enviado duas vezes).
+
+CREATE TABLE IF NOT EXISTS `execucoes_jobs` (
+    `job` VARCHAR(100) NOT NULL,
+    `periodo` VARCHAR(32) NOT NULL,
+    `data_execucao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (`job`, `periodo`)
+);
@@ -0,0 +1,10 @@
+-- database/migrations/015_stored_file_variants.sql
+-- Marca os arquivos cujas variantes redimensionadas já foram geradas: as URLs das
+-- fotos são montadas a partir dessa coluna, sem consultar o armazenamento (no S3,
+-- cada consulta seria uma requisição HEAD).
+
+ALTER TABLE `arquivos`
+    ADD COLUMN `variantes_prontas` BOOLEAN NOT NULL DEFAULT FALSE AFTER `tamanho`;
+
+-- Arquivos já existentes tiveram as variantes geradas no upload
+UPDATE `arquivos` SET `variantes_prontas` = TRUE;
@@ -21,10 +21,78 @@ CREATE TABLE `tokens_recuperacao` (
     `id` INT AUTO_INCREMENT PRIMARY KEY,
     `usuario_id` INT NOT NULL,
     `token` VARCHAR(255) NOT NULL UNIQUE,
-    `expiracao` TIMESTAMP NOT NULL,
+    `data_expiracao` TIMESTAMP NOT NULL,
     `usado` BOOLEAN DEFAULT FALSE,
     `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE
+    FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE,
+    INDEX `idx_tokens_recuperacao_expiracao` (`data_expiracao`) -- Limpeza periódica dos expirados
+);
+
+-- Tabela de Sessões (registro de logins/logouts, gravada em lotes pelo backend)
+DROP TABLE IF EXISTS `sessoes`;
+CREATE TABLE `sessoes` (
+    `id` INT AUTO_INCREMENT PRIMARY KEY,
+    `usuario_id` INT NOT NULL,
+    `token` VARCHAR(255) NOT NULL, -- Identificação parcial do token emitido
+    `ip_address` VARCHAR(45) DEFAULT NULL,
+    `user_agent` VARCHAR(512) DEFAULT NULL,
+    `data_expiracao` TIMESTAMP NOT NULL,
+    `ativa` BOOLEAN DEFAULT TRUE,
+    `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE,
+    INDEX `idx_sessoes_usuario_ativa` (`usuario_id`, `ativa`),
+    INDEX `idx_sessoes_expiracao` (`data_expiracao`) -- Limpeza periódica das expiradas
+);
+
+-- Tabela de Tokens Revogados (JWT invalidados no logout, por jti)
+DROP TABLE IF EXISTS `tokens_revogados`;
+CREATE TABLE `tokens_revogados` (
+    `id` INT AUTO_INCREMENT PRIMARY KEY,
+    `jti` VARCHAR(64) NOT NULL UNIQUE,
+    `usuario_id` INT NOT NULL,
+    `data_expiracao` TIMESTAMP NOT NULL, -- Expiração do token (UTC); depois dela a linha pode ser removida
+    `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE,
+    INDEX `idx_tokens_revogados_expiracao` (`data_expiracao`)
+);
+
+-- Tabela de Emails Pendentes (caixa de saída enviada em segundo plano pelo backend)
+DROP TABLE IF EXISTS `emails_pendentes`;
+CREATE TABLE `emails_pendentes` (
+    `id` INT AUTO_INCREMENT PRIMARY KEY,
+    `destinatario` VARCHAR(255) NOT NULL,
+    `assunto` VARCHAR(255) NOT NULL,
+    `corpo_html` MEDIUMTEXT NOT NULL,
+    `status` ENUM('pendente', 'enviando', 'enviado', 'falhou') NOT NULL DEFAULT 'pendente',
+    `lote` CHAR(36) DEFAULT NULL, -- Reserva do worker que está enviando
+    `tentativas` INT NOT NULL DEFAULT 0,
+    `ultimo_erro` TEXT DEFAULT NULL,
+    `proxima_tentativa` TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, -- Ou fim da reserva, quando 'enviando'
+    `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    `data_envio` TIMESTAMP NULL DEFAULT NULL,
+    INDEX `idx_emails_status_proxima` (`status`, `proxima_tentativa`),
+    INDEX `idx_emails_lote` (`lote`)
+);
+
+-- Tabela de Arquivos (uploads endereçados pelo hash do conteúdo, com contagem de referências)
+DROP TABLE IF EXISTS `arquivos`;
+CREATE TABLE `arquivos` (
+    `chave` VARCHAR(255) PRIMARY KEY, -- Ex: 'ab/cd/<sha256>.png'
+    `referencias` INT NOT NULL DEFAULT 0,
+    `tamanho` BIGINT NOT NULL DEFAULT 0, -- Bytes do original
+    `variantes_prontas` BOOLEAN NOT NULL DEFAULT FALSE, -- Variantes redimensionadas já geradas
+    `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    `data_atualizacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX `idx_arquivos_orfaos` (`referencias`, `data_atualizacao`) -- Coleta de arquivos sem referências
+);
+
+-- Tabela de Execuções de Jobs Agendados (uma execução por rodada entre todos os workers)
+DROP TABLE IF EXISTS `execucoes_jobs`;
+CREATE TABLE `execucoes_jobs` (
+    `job` VARCHAR(100) NOT NULL, -- Ex: 'snapshots_relatorios', 'resumo_semanal_email'
+    `periodo` VARCHAR(32) NOT NULL, -- Rodada: horário previsto ('2024-01-01 03:00') ou janela do intervalo
+    `data_execucao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (`job`, `periodo`)
 );
 
 -- Tabela de Categorias de Hábitos (Para organizar hábitos, conforme `HabitCategory` no `habit.py`)
@@ -54,7 +122,8 @@ CREATE TABLE `habitos` (
     `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     `data_atualizacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE,
-    FOREIGN KEY (`categoria_id`) REFERENCES `categorias_habitos`(`id`) ON DELETE SET NULL
+    FOREIGN KEY (`categoria_id`) REFERENCES `categorias_habitos`(`id`) ON DELETE SET NULL,
+    INDEX `idx_habitos_usuario_atualizacao` (`usuario_id`, `data_atualizacao`) -- Sincronização incremental
 );
 
 -- Tabela de Registros de Hábitos (HU06 - Registro de Progresso)
@@ -66,12 +135,21 @@ CREATE TABLE `registros_habitos` (
     `data_registro` DATE NOT NULL,
     `valor` DECIMAL(10, 2) DEFAULT NULL, -- Para hábitos quantitativos
     `concluido` BOOLEAN DEFAULT FALSE, -- Para hábitos binários ou indicação de meta atingida
-    `observacoes` TEXT,
     `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     `data_atualizacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (`habito_id`) REFERENCES `habitos`(`id`) ON DELETE CASCADE,
     FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE,
-    UNIQUE (`habito_id`, `data_registro`) -- Garante apenas um registro por hábito por dia
+    UNIQUE (`habito_id`, `data_registro`), -- Garante apenas um registro por hábito por dia
+    INDEX `idx_registros_usuario_atualizacao` (`usuario_id`, `data_atualizacao`)
+);
+
+-- Observações dos registros de hábitos (texto livre, fora da tabela principal)
+DROP TABLE IF EXISTS `registros_habitos_notas`;
+CREATE TABLE `registros_habitos_notas` (
+    `registro_id` INT PRIMARY KEY,
+    `observacoes` TEXT NOT NULL,
+    `data_atualizacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (`registro_id`) REFERENCES `registros_habitos`(`id`) ON DELETE CASCADE
 );
 
 -- Tabela de Avaliações de Humor (HU07 - Avaliar Humor Diário)
@@ -79,13 +157,23 @@ DROP TABLE IF EXISTS `avaliacoes_humor`;
 CREATE TABLE `avaliacoes_humor` (
     `id` INT AUTO_INCREMENT PRIMARY KEY,
     `usuario_id` INT NOT NULL,
-    `data_avaliacao` DATE NOT NULL UNIQUE, -- Uma avaliação por dia por usuário
+    `data_avaliacao` DATE NOT NULL,
     `nota_humor` INT NOT NULL, -- Escala de 1 a 5 (conforme `mood.py`)
-    `observacoes` TEXT,
     `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     `data_atualizacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE,
-    CHECK (`nota_humor` >= 1 AND `nota_humor` <= 5)
+    CHECK (`nota_humor` >= 1 AND `nota_humor` <= 5),
+    UNIQUE `uq_humor_usuario_data` (`usuario_id`, `data_avaliacao`), -- Uma avaliação por dia por usuário
+    INDEX `idx_humor_usuario_atualizacao` (`usuario_id`, `data_atualizacao`)
+);
+
+-- Observações das avaliações de humor (texto livre, fora da tabela principal)
+DROP TABLE IF EXISTS `avaliacoes_humor_notas`;
+CREATE TABLE `avaliacoes_humor_notas` (
+    `avaliacao_id` INT PRIMARY KEY,
+    `observacoes` TEXT NOT NULL,
+    `data_atualizacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (`avaliacao_id`) REFERENCES `avaliacoes_humor`(`id`) ON DELETE CASCADE
 );
 
 -- Tabela de Metas (HU09 - Definir Metas)
@@ -106,9 +194,38 @@ CREATE TABLE `metas` (
     `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     `data_atualizacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE,
-    FOREIGN KEY (`habito_id`) REFERENCES `habitos`(`id`) ON DELETE SET NULL
+    FOREIGN KEY (`habito_id`) REFERENCES `habitos`(`id`) ON DELETE SET NULL,
+    INDEX `idx_metas_usuario_atualizacao` (`usuario_id`, `data_atualizacao`)
 );
 
 
+-- Tabela de Snapshots de Relatórios (HU08 - relatórios pré-calculados fora do horário de pico)
+DROP TABLE IF EXISTS `snapshots_relatorios`;
+CREATE TABLE `snapshots_relatorios` (
+    `id` INT AUTO_INCREMENT PRIMARY KEY,
+    `usuario_id` INT NOT NULL,
+    `tipo` VARCHAR(50) NOT NULL, -- Ex: 'dashboard', 'resumo_semanal', 'progresso_metas'
+    `data_referencia` DATE NOT NULL, -- Dia para o qual o relatório foi calculado
+    `dados` MEDIUMTEXT NOT NULL, -- Relatório serializado em JSON
+    `data_criacao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE,
+    UNIQUE (`usuario_id`, `tipo`, `data_referencia`),
+    INDEX `idx_snapshots_data_referencia` (`data_referencia`)
+);
+
+
+-- Marcas de exclusão física (registros de hábitos e avaliações de humor) para a sincronização incremental
+DROP TABLE IF EXISTS `exclusoes`;
+CREATE TABLE `exclusoes` (
+    `id` INT AUTO_INCREMENT PRIMARY KEY,
+    `usuario_id` INT NOT NULL,
+    `entidade` VARCHAR(30) NOT NULL, -- Ex: 'registro_habito', 'avaliacao_humor'
+    `entidade_id` INT NOT NULL,
+    `data_exclusao` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (`usuario_id`) REFERENCES `usuarios`(`id`) ON DELETE CASCADE,
+    INDEX `idx_exclusoes_usuario_data` (`usuario_id`, `data_exclusao`),
+    INDEX `idx_exclusoes_data` (`data_exclusao`)
+);
+
 -- Habilitar verificações de chave estrangeira novamente
 SET FOREIGN_KEY_CHECKS = 1;
\ No newline at end of file
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import { useAuth } from '../context/AuthContext';
 import api from '../services/api';
 import LoadingSpinner from '../components/LoadingSpinner';
@@ -35,36 +35,47 @@ const Dashboard = () => {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
 
-  useEffect(() => {
-    const fetchDashboardData = async () => {
-      setLoading(true);
-      setError('');
-      try {
-        const today = new Date();
-        const oneWeekAgo = subDays(today, 6); // Últimos 7 dias, incluindo hoje
-
-        const startDate = format(oneWeekAgo, 'yyyy-MM-dd');
-        const endDate = format(today, 'yyyy-MM-dd');
-
-        const response = await api.get('/reports/dashboard_summary', {
-          params: { start_date: startDate, end_date: endDate }
-        });
-
-        if (response.status === 200) {
-          setSummaryData(response.data);
-        }
-      } catch (err) {
-        console.error('Erro ao buscar dados do dashboard:', err.response?.data || err.message);
-        setError(err.response?.data?.error || 'Erro ao carregar dados do dashboard.');
-      } finally {
-        setLoading(false);
+  const fetchDashboardData = useCallback(async (showSpinner = true) => {
+    if (showSpinner) setLoading(true);
+    setError('');
+    try {
+      const today = new Date();
+      const oneWeekAgo = subDays(today, 6); // Últimos 7 dias, incluindo hoje
+
+      const startDate = format(oneWeekAgo, 'yyyy-MM-dd');
+      const endDate = format(today, 'yyyy-MM-dd');
+
+      const response = await api.get('/reports/dashboard_summary', {
+        params: { start_date: startDate, end_date: endDate }
+      });
+
+      if (response.status === 200) {
+        setSummaryData(response.data);
       }
-    };
+    } catch (err) {
+      console.error('Erro ao buscar dados do dashboard:', err.response?.data || err.message);
+      setError(err.response?.data?.error || 'Erro ao carregar dados do dashboard.');
+    } finally {
+      setLoading(false);
+    }
+  }, []);
 
+  useEffect(() => {
     if (user) {
       fetchDashboardData();
     }
-  }, [user]);
+  }, [user, fetchDashboardData]);
+
+  // Atualização em tempo real: o servidor avisa (SSE) quando registros, humor ou metas mudam,
+  // inclusive a partir de outros dispositivos, e só então o resumo é recarregado
+  useEffect(() => {
+    if (!user || typeof EventSource === 'undefined') return undefined;
+    // Autenticado pelo cookie HTTP-only do login: o token não vai na URL (logs, histórico)
+    const source = new EventSource(`${api.defaults.baseURL}/events/stream`, { withCredentials: true });
+    const refresh = () => fetchDashboardData(false);
+    ['registro_habito', 'avaliacao_humor', 'meta', 'resync'].forEach((name) => source.addEventListener(name, refresh));
+    return () => source.close();
+  }, [user, fetchDashboardData]);
 
   // Preparar dados para o gráfico de humor (linha)
   const moodChartData = {
@@ -15,7 +15,6 @@ const MoodTracker = () => {
   const [moodNote, setMoodNote] = useState('');
   const [observations, setObservations] = useState('');
   const [isEditing, setIsEditing] = useState(false);
-  const [currentAssessmentId, setCurrentAssessmentId] = useState(null);
 
   const fetchMoodAssessments = async () => {
     setLoading(true);
@@ -28,7 +27,8 @@ const MoodTracker = () => {
       const endDate = format(today, 'yyyy-MM-dd');
 
       const response = await api.get('/mood/by_date_range', {
-        params: { start_date: startDate, end_date: endDate }
+        // As observações não vêm por padrão (ficam em tabela separada); este histórico as exibe
+        params: { start_date: startDate, end_date: endDate, fields: 'data_avaliacao,nota_humor,observacoes' }
       });
 
       if (response.status === 200) {
@@ -53,7 +53,6 @@ const MoodTracker = () => {
     );
     if (existing) {
       setIsEditing(true);
-      setCurrentAssessmentId(existing.id);
       setMoodNote(existing.nota_humor);
       setObservations(existing.observacoes || '');
     } else {
@@ -64,7 +63,6 @@ const MoodTracker = () => {
 
   const resetForm = () => {
     setIsEditing(false);
-    setCurrentAssessmentId(null);
     setMoodNote('');
     setObservations('');
     setError('');
@@ -89,12 +87,8 @@ const MoodTracker = () => {
         observacoes: observations.trim() || null,
       };
 
-      let response;
-      if (isEditing) {
-        response = await api.put(`/mood/${currentAssessmentId}`, moodData);
-      } else {
-        response = await api.post('/mood', moodData);
-      }
+      // Upsert pela data: cria ou atualiza em uma única chamada (seguro para repetir)
+      const response = await api.put(`/mood/${selectedDate}`, moodData);
 
       if (response.status === 200 || response.status === 201) {
         setSuccessMessage(response.data.message);
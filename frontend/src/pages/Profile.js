@@ -4,6 +4,18 @@ import { useAuth } from '../context/AuthContext';
 import LoadingSpinner from '../components/LoadingSpinner';
 import { validateEmail, isNotEmpty } from '../utils/validation';
 
+const NO_PICTURE_URL = 'https://placehold.co/150x150/e0e0e0/ffffff?text=Sem+Foto';
+
+// URL da foto (variante média). Com armazenamento local a API devolve caminhos relativos ao
+// servidor do backend; com S3/CDN as URLs já são absolutas e são usadas como vieram.
+const getProfilePictureUrl = (user) => {
+  if (!user?.foto_perfil) {
+    return NO_PICTURE_URL;
+  }
+  const url = user.foto_perfil_urls?.medium || `/uploads/profile_pics/${user.foto_perfil}`;
+  return /^(https?:)?\/\//.test(url) ? url : `http://127.0.0.1:5000${url}`;
+};
+
 const Profile = () => {
   const { user, setUser, loading: authLoading, verifyToken } = useAuth(); // Obtém o usuário e funções do AuthContext
   const [name, setName] = useState('');
@@ -18,7 +30,7 @@ const Profile = () => {
     if (user) {
       setName(user.nome || '');
       setEmail(user.email || '');
-      setProfilePicturePreview(user.foto_perfil ? `http://127.0.0.1:5000/uploads/profile_pics/${user.foto_perfil}` : 'https://placehold.co/150x150/e0e0e0/ffffff?text=Sem+Foto');
+      setProfilePicturePreview(getProfilePictureUrl(user));
     }
   }, [user]);
 
@@ -29,7 +41,7 @@ const Profile = () => {
       setProfilePicturePreview(URL.createObjectURL(file)); // Cria URL para pré-visualização
     } else {
       setProfilePicture(null);
-      setProfilePicturePreview(user?.foto_perfil ? `http://127.0.0.1:5000/uploads/profile_pics/${user.foto_perfil}` : 'https://placehold.co/150x150/e0e0e0/ffffff?text=Sem+Foto');
+      setProfilePicturePreview(getProfilePictureUrl(user));
     }
   };
 